@@ -0,0 +1,63 @@
+import json
+import os
+import time
+
+import quality
+import timetable
+from schedule import load_schedule
+
+# Seconds between checkpoints while the search runs; the last state is always written when the budget runs out.
+CHECKPOINT_EVERY = 5.0
+
+
+def write_checkpoint(path, schedule, state):
+    # The best schedule as schedule JSON plus the search state under "search"; replaced atomically, so a run killed
+    # mid-write leaves the previous checkpoint.
+    d = schedule.to_dict()
+    d["search"] = state
+    tmp = path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(d, f, separators=(",", ":"))
+    os.replace(tmp, path)
+
+
+def read_checkpoint(path):
+    with open(path) as f:
+        state = json.load(f).get("search")
+    return load_schedule(path), state
+
+
+def solve(ds, time_limit, seed, checkpoint, resume=False, manifest_path=None, improve_seconds=0, workers=1, every=CHECKPOINT_EVERY,
+          **opts):
+    """Solve consecutive seeds from `seed` for time_limit seconds and return (best schedule, search state).
+
+    Schedules are compared by quality.Scorer's objective. The best one and the next seed to try are checkpointed
+    every `every` seconds; with resume=True a checkpoint written with the same options is picked up where it
+    stopped and gets a fresh time_limit. The run in flight when the budget runs out is cut short: greedy retries,
+    backjumping, CP-SAT and the improvement pass all stop at the deadline. It still ends with a complete schedule,
+    with whatever it had no time to place in its report, so even a budget shorter than one run returns a timetable.
+    """
+    deadline = time.time() + time_limit
+    options = dict(opts, manifest=manifest_path, improve_seconds=improve_seconds)
+    best, state = None, {"next_seed": seed, "tried": 0, "best_seed": None, "score": None, "options": options}
+    if resume and os.path.exists(checkpoint):
+        best, saved = read_checkpoint(checkpoint)
+        if saved is None or saved["options"] != json.loads(json.dumps(options)):
+            raise ValueError(f"{checkpoint} was written with other options: {saved and saved['options']}")
+        state = saved
+    written = time.time()
+    while True:
+        s = state["next_seed"]
+        _, _, _, schedule = timetable.run(s, render=False, manifest_path=manifest_path, ds=ds, workers=workers, improve_seconds=improve_seconds,
+                                          deadline=deadline, **opts)
+        score = round(float(quality.Scorer.of(ds, schedule).objective()), 2)
+        state.update(next_seed=s + 1, tried=state["tried"] + 1)
+        if state["score"] is None or score < state["score"]:
+            best = schedule
+            state.update(best_seed=s, score=score)
+        done = time.time() >= deadline
+        if done or time.time() - written >= every:
+            write_checkpoint(checkpoint, best, state)
+            written = time.time()
+        if done:
+            return best, state
@@ -0,0 +1,223 @@
+import time
+
+from timetable import alloc_specific, chunks, course_layers, days, lab_prefix_for_class_prefix, ltp, room_candidates, s
+
+DEFAULT_NODE_BUDGET = 20000
+
+# A candidate blocked by something the search cannot undo (earlier sections, electives, combined classes).
+EXTERNAL = frozenset()
+
+
+def start_positions(tt, slot_dur, hours):
+    # (first slot, end slot, mask, uses excluded) for every run that starts at a slot and holds `hours` within the day.
+    keys = tt.slot_keys
+    out = []
+    for i in range(len(keys)):
+        acc = 0.0
+        for j in range(i, len(keys)):
+            acc += slot_dur[keys[j]]
+            if acc + 1e-9 >= hours:
+                m = (1 << (j + 1)) - (1 << i)
+                out.append((i, j + 1, m, bool(m & tt.excluded_mask)))
+                break
+    return out
+
+
+class Chunk:
+    __slots__ = ("course", "code", "faculty", "typ", "hours", "layers", "fac_keys")
+
+    def __init__(self, course, code, faculty, typ, hours, layers, fac_keys):
+        self.course, self.code, self.faculty, self.typ, self.hours = course, code, faculty, typ, hours
+        self.layers, self.fac_keys = layers, fac_keys
+
+
+class Decision:
+    __slots__ = ("chunk", "index", "day", "mask", "omask", "room", "rm_key", "undo")
+
+
+class Backtracker:
+    """Depth-first placement of one half-section's courses with conflict-directed backjumping.
+
+    Every placement goes through alloc_specific() and keeps what it needs to be undone exactly: the day's grid
+    row and free runs, the faculty and room bits it reserved, the course's daily usage, labsd, a room it fixed
+    in rm and the room rotation. When a chunk has no feasible start the search jumps back to the latest
+    placement among those that blocked one of its starts (its section slots, a faculty member, a room or its
+    course's one-per-day cap). A chunk blocked only by what was there before the search is left unplaced.
+    Past node_budget placements, or the deadline (a time.time() value), the remaining chunks take their first
+    feasible start without backtracking.
+    """
+
+    def __init__(self, ds, tt, busy, rm, room_busy, labsd, course_usage, room_prefix=None, rr_state=None, hide_c004=False,
+                 half=None, start_idx=0, node_budget=DEFAULT_NODE_BUDGET, stats=None, deadline=None, pinned=False):
+        self.ds, self.tt, self.busy, self.rm, self.room_busy = ds, tt, busy, rm, room_busy
+        self.labsd, self.course_usage, self.room_prefix = labsd, course_usage, room_prefix
+        self.rr_state = rr_state if rr_state is not None else {}
+        self.hide_c004, self.half, self.start_idx = hide_c004, half, start_idx
+        self.node_budget, self.stats, self.deadline, self.pinned = node_budget, stats, deadline, pinned
+        self.stack = []
+        self.nodes = 0
+        self.backjumps = 0
+        self.positions = {}
+
+    def chunks_of(self, courses):
+        out = []
+        for c in courses:
+            f = s(c.get("Faculty", ""))
+            L, T, P, _, _ = ltp(c.get("L-T-P-S-C", "0-0-0-0-0"))
+            for hours, typ in chunks(L, T, P):
+                out.append(Chunk(c, s(c.get("Course_Code", "UNKNOWN")), f, typ, hours, course_layers(c, self.half, self.pinned), set(self.busy.keys(f)) if f else set()))
+        return out
+
+    def candidates(self, i, ch):
+        # Rotated day order per chunk, as place_course_list() spreads courses; starts using an excluded slot last.
+        k = (self.start_idx + i) % len(days)
+        order = days[k:] + days[:k]
+        if ch.hours not in self.positions:
+            self.positions[ch.hours] = start_positions(self.tt, self.ds.slot_dur, ch.hours)
+        pos = self.positions[ch.hours]
+        return [(d, a, b, m) for ex in (False, True) for d in order for a, b, m, x in pos if x == ex]
+
+    def blame(self, hit, match):
+        # Placements in the stack that hold some of `hit`; EXTERNAL when part of it was held before the search.
+        own, culprits = 0, set()
+        for k, dec in enumerate(self.stack):
+            bits = match(dec) & hit
+            if bits:
+                own |= bits
+                culprits.add(k)
+        return culprits if not hit & ~own else EXTERNAL
+
+    def check(self, ch, d, m):
+        """None when the chunk fits at (d, m); otherwise the stack indices of the placements that block it."""
+        tt = self.tt
+        culprits = set()
+        hit = tt.busy[d] & m
+        if hit:
+            found = self.blame(hit, lambda dec: dec.mask if dec.day == d else 0)
+            if not found:
+                return EXTERNAL
+            culprits |= found
+        usage = self.course_usage[d].get(ch.code)
+        lt = ch.typ != "P"
+        if usage and ((usage["L"] + usage["T"]) if lt else usage["P"]) >= 1:
+            found = {k for k, dec in enumerate(self.stack) if dec.day == d and dec.chunk.code == ch.code and (dec.chunk.typ != "P") == lt}
+            if not found:
+                return EXTERNAL
+            culprits |= found
+        om = tt.layered(m, ch.layers)
+        for key in ch.fac_keys:
+            hit = self.busy.busy.get(key, {}).get(d, 0) & om
+            if hit:
+                found = self.blame(hit, lambda dec: dec.omask if dec.day == d and key in dec.chunk.fac_keys else 0)
+                if not found:
+                    return EXTERNAL
+                culprits |= found
+        day_rooms = self.room_busy.get(d, {})
+        key = (ch.code, ch.typ)
+        if key in self.rm:
+            r = self.rm[key]
+            hit = day_rooms.get(r, 0) & om
+            if hit:
+                # Undoing the placement that fixed the room frees the choice of room as well.
+                fixed = {k for k, dec in enumerate(self.stack) if dec.rm_key == key}
+                found = self.blame(hit, lambda dec: dec.omask if dec.day == d and dec.room == r else 0)
+                if not found and not fixed:
+                    return EXTERNAL
+                culprits |= found | fixed
+        else:
+            rooms = self.rooms(ch)
+            blocked = set()
+            for r in rooms:
+                hit = day_rooms.get(r, 0) & om
+                if not hit:
+                    break
+                blocked |= self.blame(hit, lambda dec: dec.omask if dec.day == d and dec.room == r else 0)
+            else:
+                if not blocked:
+                    return EXTERNAL
+                culprits |= blocked
+        return culprits or None
+
+    def rooms(self, ch):
+        if ch.typ == "P":
+            return room_candidates(self.ds, lab=True, lab_prefix=lab_prefix_for_class_prefix.get(self.room_prefix, None))
+        return room_candidates(self.ds, lab=False, prefix=self.room_prefix)
+
+    def apply(self, ch, i, d, a, b, m):
+        tt = self.tt
+        key = (ch.code, ch.typ)
+        undo = (tt.busy[d], list(tt.labels[d]), tt.free_runs[False][d], tt.free_runs[True][d], len(tt.placements),
+                key in self.rm, d in self.labsd, dict(self.rr_state))
+        if not alloc_specific(self.ds, tt, self.busy, self.rm, self.room_busy, d, tt.slot_keys[a:b], ch.faculty, ch.code, ch.typ, False,
+                              self.labsd, self.course_usage, class_prefix=self.room_prefix, rr_state=self.rr_state,
+                              hide_c004=self.hide_c004, layers=ch.layers, stats=self.stats):
+            return False
+        dec = Decision()
+        dec.chunk, dec.index, dec.day, dec.mask, dec.omask = ch, i, d, m, tt.layered(m, ch.layers)
+        dec.room = tt.placements[-1].room
+        dec.rm_key = None if undo[5] else key
+        dec.undo = undo
+        self.stack.append(dec)
+        self.nodes += 1
+        return True
+
+    def pop(self):
+        dec = self.stack.pop()
+        tt, d, ch = self.tt, dec.day, dec.chunk
+        busy, labels, runs, runs_ex, n, had_rm, had_lab, rr = dec.undo
+        tt.busy[d], tt.labels[d], tt.free_runs[False][d], tt.free_runs[True][d] = busy, labels, runs, runs_ex
+        del tt.placements[n:]
+        # Every bit in omask was free before this placement reserved it.
+        for key in ch.fac_keys:
+            self.busy.busy[key][d] &= ~dec.omask
+        if dec.room:
+            self.room_busy[d][dec.room] &= ~dec.omask
+        self.course_usage[d][ch.code][ch.typ] -= 1
+        if not had_lab:
+            self.labsd.discard(d)
+        if not had_rm:
+            self.rm.pop((ch.code, ch.typ), None)
+        self.rr_state.clear()
+        self.rr_state.update(rr)
+
+    def place(self, courses):
+        """Place every chunk of courses; returns the chunks left unplaced."""
+        chs = self.chunks_of(courses)
+        n = len(chs)
+        cands, ptr, conflicts = [None] * n, [0] * n, [set() for _ in range(n)]
+        unplaced = set()
+        i = 0
+        if n:
+            cands[0] = self.candidates(0, chs[0])
+        while i < n:
+            ch = chs[i]
+            placed = False
+            while ptr[i] < len(cands[i]):
+                d, a, b, m = cands[i][ptr[i]]
+                ptr[i] += 1
+                found = self.check(ch, d, m)
+                if found is None and self.apply(ch, i, d, a, b, m):
+                    placed = True
+                    break
+                if found:
+                    conflicts[i] |= found
+            if not placed:
+                if conflicts[i] and self.nodes < self.node_budget and (self.deadline is None or time.time() < self.deadline):
+                    # Jump to the latest placement that blocked this chunk; the rest of its blockers go with it.
+                    h = max(conflicts[i])
+                    target = self.stack[h].index
+                    conflicts[target] |= {k for k in conflicts[i] if k < h}
+                    while len(self.stack) > h:
+                        self.pop()
+                    unplaced = {j for j in unplaced if j < target}
+                    self.backjumps += 1
+                    i = target
+                    continue
+                unplaced.add(i)
+            i += 1
+            if i < n:
+                cands[i], ptr[i], conflicts[i] = self.candidates(i, chs[i]), 0, set()
+        if self.stats is not None:
+            self.stats.calls["backtrack_nodes"] += self.nodes
+            self.stats.calls["backjumps"] += self.backjumps
+        return [chs[j] for j in sorted(unplaced)]
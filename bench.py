@@ -0,0 +1,245 @@
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from functools import partial
+
+import timetable
+from manifest import load_manifest
+from occupancy import FacultyLedger
+from synth import make_dataset
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Each case takes (data_dir, work_dir) and returns (prepare, items): prepare() does the unmeasured setup and
+# returns the callable that is timed. items is how many units (sections, exams, ...) one call covers.
+
+
+def sections_of(ds):
+    return [sec for sh in load_manifest(ds.manifest_path) for sec in sh["sections"]]
+
+
+def case_generate_section(data_dir, work_dir):
+    ds = timetable.load_dataset(data_dir)
+    secs = sections_of(ds)
+
+    def prepare():
+        halves = [(sec, timetable.split(ds.courses(sec["courses"]))[0]) for sec in secs]
+
+        def target():
+            # Every section on its own ledgers, so this is per-section solver cost without cross-section contention.
+            for sec, courses in halves:
+                timetable.generate(ds, courses, None, f"{sec['label']} First Half", 1, {}, room_prefix=sec["room_prefix"],
+                                   faculty_busy_global=FacultyLedger(), hide_c004=sec["hide_c004"], half="1")
+        return target
+    return prepare, len(secs)
+
+
+def case_timetable_run(data_dir, work_dir):
+    ds = timetable.load_dataset(data_dir)
+
+    def prepare():
+        def target():
+            wb, _, _, _ = timetable.run(1, ds=ds)
+            wb.save(os.path.join(work_dir, "Balanced_Timetable_latest.xlsx"))
+        return target
+    return prepare, len(sections_of(ds))
+
+
+def case_merge_and_color(data_dir, work_dir):
+    ds = timetable.load_dataset(data_dir)
+    _, _, _, schedule = timetable.run(1, render=False, ds=ds)
+    from openpyxl import Workbook
+
+    def prepare():
+        color_of = timetable.color_picker()
+        wb = Workbook()
+        sheets = []
+        for sh in schedule.sheets:
+            ws = wb.create_sheet(sh["title"])
+            sheets.append((ws, [(timetable.write_half(ds, ws, half), half) for sec in sh["sections"] for half in sec["halves"]]))
+
+        def target():
+            for ws, grids in sheets:
+                timetable.merge_and_color(ds, ws, grids, color_of)
+        return target
+    return prepare, len(sections_of(ds))
+
+
+def case_render(writer, data_dir, work_dir):
+    # Rendering and saving only: the schedule is solved once, outside the measured target.
+    ds = timetable.load_dataset(data_dir)
+    _, _, _, schedule = timetable.run(1, render=False, ds=ds)
+
+    def prepare():
+        def target():
+            timetable.render_with(writer, ds, schedule).save(os.path.join(work_dir, "Balanced_Timetable_latest.xlsx"))
+        return target
+    return prepare, len(sections_of(ds))
+
+
+def exam_scheduler(data_dir):
+    import exam
+    ds = timetable.load_dataset(data_dir)
+    departments = {sec["label"]: ds.course_csv(sec["courses"]) for sec in sections_of(ds)}
+    return exam.ExamScheduler(os.path.join(data_dir, "rooms.csv"), departments,
+                              os.path.join(data_dir, "faculty.csv"), os.path.join(data_dir, "students.csv"))
+
+
+def case_exam_generate(data_dir, work_dir):
+    def prepare():
+        s = exam_scheduler(data_dir)
+        return s.generate
+    return prepare, len(exam_scheduler(data_dir).groups)
+
+
+def case_exam_export(data_dir, work_dir):
+    def prepare():
+        s = exam_scheduler(data_dir)
+        s.generate()
+
+        def target():
+            with contextlib.redirect_stdout(io.StringIO()):
+                s.export(os.path.join(work_dir, "final_exam_schedule_with_seating.xlsx"))
+        return target
+    return prepare, len(exam_scheduler(data_dir).groups)
+
+
+def case_faculty(data_dir, work_dir):
+    # The workbook fallback: parse the rendered timetable back and write the faculty workbook.
+    import faculty
+    ds = timetable.load_dataset(data_dir)
+    wb, _, _, _ = timetable.run(1, ds=ds)
+    path = os.path.join(work_dir, "Balanced_Timetable_latest.xlsx")
+    wb.save(path)
+
+    def prepare():
+        def target():
+            slot_keys = faculty.load_slot_keys(data_dir)
+            course_faculty, _, baskets = faculty.load_all_course_info(data_dir)
+            slots = faculty.parse_timetable_xlsx(path, slot_keys, course_faculty, baskets)
+            faculty.write_faculty_workbook(slots, slot_keys, os.path.join(work_dir, "Faculty_Timetable.xlsx"))
+        return target
+    return prepare, len(sections_of(ds))
+
+
+def case_faculty_schedule(data_dir, work_dir):
+    import faculty
+    ds = timetable.load_dataset(data_dir)
+    _, _, _, schedule = timetable.run(1, render=False, ds=ds)
+
+    def prepare():
+        return lambda: faculty.build_faculty_timetables(schedule)
+    return prepare, len(sections_of(ds))
+
+
+CASES = {
+    "timetable.generate_section": case_generate_section,
+    "timetable.run": case_timetable_run,
+    "timetable.merge_and_color": case_merge_and_color,
+    "timetable.render": partial(case_render, "openpyxl"),
+    "timetable.render_fast": partial(case_render, "fast"),
+    "exam.generate": case_exam_generate,
+    "exam.export": case_exam_export,
+    "faculty.parse_write": case_faculty,
+    "faculty.build_from_schedule": case_faculty_schedule,
+}
+
+
+def measure(case, data_dir, repeat):
+    """Run one case in this process and return its measurements; meant to run in a fresh child process."""
+    work_dir = tempfile.mkdtemp(prefix="bench-")
+    try:
+        prepare, items = CASES[case](data_dir, work_dir)
+        walls = []
+        for _ in range(repeat):
+            target = prepare()
+            gc.collect()
+            t = time.perf_counter()
+            target()
+            walls.append(time.perf_counter() - t)
+        # One extra traced run: tracemalloc slows the target down, so it is kept out of the timings.
+        target = prepare()
+        gc.collect()
+        tracemalloc.start()
+        target()
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+    walls.sort()
+    return {
+        "items": items,
+        "wall_s": [round(w, 4) for w in walls],
+        "wall_min_s": round(walls[0], 4),
+        "wall_median_s": round(walls[len(walls) // 2], 4),
+        "alloc_peak_mb": round(peak / 2**20, 2),
+        "alloc_retained_mb": round(current / 2**20, 2),
+        # ru_maxrss is KiB on Linux and bytes on macOS; the child's high-water mark includes setup.
+        "peak_rss_mb": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (2**20 if sys.platform == "darwin" else 2**10), 1),
+    }
+
+
+def git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True).stdout.strip()
+    except OSError:
+        return ""
+
+
+def run_suite(scales, cases, repeat, out, baseline=None):
+    base = {}
+    if baseline:
+        with open(baseline) as f:
+            base = {(r["case"], r["scale"]): r for r in json.load(f)["results"]}
+    results = []
+    with tempfile.TemporaryDirectory(prefix="bench-data-") as tmp:
+        for k in scales:
+            data_dir = os.path.join(tmp, f"x{k}")
+            summary = make_dataset(data_dir, sections=12 * k, students=660 * k, classrooms_per_prefix=6 * k, labs_per_prefix=3 * k, seed=0)
+            for case in cases:
+                proc = subprocess.run([sys.executable, os.path.join(ROOT, "bench.py"), "--one", case, data_dir, "--repeat", str(repeat)],
+                                      capture_output=True, text=True)
+                if proc.returncode:
+                    print(f"{case} x{k}: failed\n{proc.stderr}", file=sys.stderr)
+                    continue
+                row = {"case": case, "scale": k, "sections": summary["sections"], "students": summary["students"]}
+                row.update(json.loads(proc.stdout.strip().splitlines()[-1]))
+                results.append(row)
+                prev = base.get((case, k))
+                vs = f"  ({row['wall_min_s'] / prev['wall_min_s']:.2f}x baseline)" if prev and prev["wall_min_s"] else ""
+                print(f"{case:28s} x{k:<3d} {row['wall_min_s']:9.3f}s  {row['alloc_peak_mb']:8.1f} MB alloc  {row['peak_rss_mb']:7.1f} MB rss{vs}")
+    doc = {
+        "meta": {"git": git_rev(), "python": platform.python_version(), "platform": platform.platform(),
+                 "time": time.strftime("%Y-%m-%dT%H:%M:%S"), "repeat": repeat, "scales": scales},
+        "results": results,
+    }
+    with open(out, "w") as f:
+        json.dump(doc, f, indent=2)
+    print(f"Results in {out}")
+    return doc
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the timetable, exam and faculty generators on synthetic data")
+    parser.add_argument("--scales", default="1,2,4", help="dataset sizes as multiples of data/ (12 sections, 660 students)")
+    parser.add_argument("--cases", default=",".join(CASES), help="comma-separated subset of: " + ", ".join(CASES))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", default="bench_results.json")
+    parser.add_argument("--baseline", default=None, help="earlier results JSON to compare wall times against")
+    parser.add_argument("--one", nargs=2, metavar=("CASE", "DATA_DIR"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.one:
+        print(json.dumps(measure(args.one[0], args.one[1], args.repeat)))
+    else:
+        run_suite([int(x) for x in args.scales.split(",")], args.cases.split(","), args.repeat, args.out, args.baseline)
@@ -0,0 +1,71 @@
+import json
+from collections import Counter
+
+
+class SectionCounters:
+    """Solver call, rejection and attempt counts for one generate() call."""
+
+    __slots__ = ("calls", "rejects", "attempts", "course_rejects")
+
+    def __init__(self):
+        self.calls = Counter()
+        self.rejects = Counter()
+        self.attempts = Counter()
+        self.course_rejects = Counter()
+
+    def reject(self, reason, code):
+        self.rejects[reason] += 1
+        self.course_rejects[code] += 1
+
+    def to_dict(self):
+        courses = sorted(set(self.attempts) | set(self.course_rejects))
+        return {
+            "calls": dict(self.calls),
+            "rejects": dict(self.rejects),
+            "courses": {c: {"attempts": self.attempts[c], "rejects": self.course_rejects[c]} for c in courses},
+        }
+
+
+class Counters:
+    """SectionCounters per section label, in the order the sections were generated."""
+
+    def __init__(self):
+        self.sections = {}
+
+    def section(self, label):
+        sc = self.sections.get(label)
+        if sc is None:
+            sc = self.sections[label] = SectionCounters()
+        return sc
+
+    def totals(self):
+        calls, rejects = Counter(), Counter()
+        for sc in self.sections.values():
+            calls.update(sc.calls)
+            rejects.update(sc.rejects)
+        return {"calls": dict(calls), "rejects": dict(rejects)}
+
+    def to_dict(self):
+        return {"sections": {label: sc.to_dict() for label, sc in self.sections.items()}, "totals": self.totals()}
+
+    def save_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def write_sheet(self, wb, title="Counters"):
+        ws = wb.create_sheet(title)
+        for col, w in zip("ABCD", (28, 16, 16, 10)):
+            ws.column_dimensions[col].width = w
+        ws.append(["Section", "Kind", "Name", "Count"])
+        for label, sc in self.sections.items():
+            for kind, counts in (("call", sc.calls), ("reject", sc.rejects)):
+                for name, n in sorted(counts.items()):
+                    ws.append([label, kind, name, n])
+        ws.append([])
+        ws.append(["Section", "Course", "Attempts", "Rejects"])
+        # Hottest courses first: these are the ones worth reordering or indexing for.
+        rows = [(label, c, sc.attempts[c], sc.course_rejects[c]) for label, sc in self.sections.items()
+                for c in set(sc.attempts) | set(sc.course_rejects)]
+        for row in sorted(rows, key=lambda r: (-r[3], -r[2], r[0], r[1])):
+            ws.append(list(row))
+        return ws
@@ -0,0 +1,232 @@
+from occupancy import Placement, faculty_key, split_faculty
+from timetable import (basket_half, cell_text, chunks, days, excluded, half_layers, lab_prefix_for_class_prefix, ltp, room_candidates, s,
+                       split, valid)
+
+# OR-Tools is optional: it is imported only when a model is solved, so the rest of this module (chunking, units,
+# start tables) works without it.
+
+HALF_NAMES = {"1": "First Half", "2": "Second Half"}
+
+
+def start_table(ds, dur):
+    """Every place a chunk of dur hours can start: (t, size, day index, excluded), t = day * slots + first slot.
+
+    A chunk takes slots from its start until it has dur hours, as alloc() does, and never runs past the day.
+    """
+    keys = ds.slot_keys
+    n = len(keys)
+    out = []
+    for di in range(len(days)):
+        for i in range(n):
+            acc = 0.0
+            for j in range(i, n):
+                acc += ds.slot_dur[keys[j]]
+                if acc + 1e-9 >= dur:
+                    ex = any(k in excluded for k in keys[i:j + 1])
+                    out.append((di * n + i, j + 1 - i, di, int(ex)))
+                    break
+    return out
+
+
+class Unit:
+    """One thing to place: a course of a section, a combined course (shared by every section listing it, held in
+    C004) or an elective basket or elective (shared by the sections of a sync group).
+
+    Full-semester units belong to both halves of their sections, so they take the same slots in both.
+    """
+
+    __slots__ = ("key", "code", "kind", "faculty", "fac_keys", "layers", "chunks", "rooms", "labs", "members")
+
+    def __init__(self, key, code, kind, faculty, layers, ltp_value):
+        self.key, self.code, self.kind, self.faculty, self.layers = key, code, kind, faculty, layers
+        self.fac_keys = set()
+        self.chunks = chunks(*ltp(ltp_value)[:3])
+        self.rooms = self.labs = ()
+        # (half label, section) pairs the unit is shown in.
+        self.members = []
+
+
+def build_units(ds, secs):
+    """Units for the given manifest sections, plus {half label: (section, half)} for every half that is solved.
+
+    A half whose course list fails valid() is left out, as generate() leaves it out.
+    """
+    units = {}
+    halves = {}
+
+    def unit(key, code, kind, c, half):
+        u = units.get(key)
+        if u is None:
+            u = units[key] = Unit(key, code, kind, s(c.get("Faculty", "")), half_layers.get(half, 0b11), c.get("L-T-P-S-C", "0-0-0-0-0"))
+        return u
+
+    for sec in secs:
+        first, second = split(ds.courses(sec["courses"]))
+        lab_pref = lab_prefix_for_class_prefix.get(sec["room_prefix"], None)
+        for half, courses in (("1", first), ("2", second)):
+            if valid(courses):
+                continue
+            label = f"{sec['label']} {HALF_NAMES[half]}"
+            halves[label] = (sec, half)
+            baskets = {}
+            for c in courses:
+                code = s(c.get("Course_Code", ""))
+                h = s(c.get("Semester_Half", ""))
+                if s(c.get("Elective", "")) == "1":
+                    b = s(c.get("ElectiveBasket", "0"))
+                    if b and b != "0":
+                        baskets.setdefault(b, []).append(c)
+                        continue
+                    u = unit(("elective", sec["sync"], code, h), code, "elective", c, h)
+                elif s(c.get("Is_Combined", "0")) == "1":
+                    u = unit(("combined", code, h), code, "combined", c, h)
+                else:
+                    u = unit(("regular", sec["label"], code, h), code, "regular", c, h)
+                    u.rooms = room_candidates(ds, lab=False, prefix=sec["room_prefix"])
+                    u.labs = room_candidates(ds, lab=True, lab_prefix=lab_pref)
+                u.fac_keys.update(faculty_key(x) for x in split_faculty(s(c.get("Faculty", ""))))
+                if (label, sec) not in u.members:
+                    u.members.append((label, sec))
+            for b, group in sorted(baskets.items(), key=lambda x: int(x[0]) if x[0].isdigit() else 0):
+                bh = basket_half(group)
+                u = unit(("elective", sec["sync"], f"Elective{b}", bh), f"Elective{b}", "elective", group[0], bh)
+                # Every course of the basket runs in the basket's slots, so all of their faculty are busy then.
+                for c in group:
+                    u.fac_keys.update(faculty_key(x) for x in split_faculty(s(c.get("Faculty", ""))))
+                if (label, sec) not in u.members:
+                    u.members.append((label, sec))
+    return list(units.values()), halves
+
+
+def solve(ds, secs, seed=0, time_limit=60.0, workers=8):
+    """Place every unit with OR-Tools CP-SAT; returns ({section label: (failed, halves)}, {half label: SectionGrid})
+    in the shapes solve_group() returns, so run() merges and renders them the same way.
+
+    Chunks are optional and the objective maximizes placed hours (weighted by the halves a unit is shown in), then
+    avoids the excluded slots. Sections, rooms and faculty each get a no-overlap constraint on a time axis with one
+    copy of the week per semester half; one L/T and one P chunk per course per day.
+    """
+    try:
+        from ortools.sat.python import cp_model
+    except ImportError:
+        raise ImportError("--engine cpsat needs OR-Tools: pip install ortools") from None
+
+    units, halves = build_units(ds, secs)
+    n = len(ds.slot_keys)
+    week = len(days) * n
+    tables = {}
+    m = cp_model.CpModel()
+    placed_hours, excluded_use = [], []
+    by_half, by_fac, by_room, hall = {}, {}, {}, []
+    picks = []
+
+    for ui, u in enumerate(units):
+        prev = None
+        on_day = {"LT": [], "P": []}
+        # A regular course keeps one room per chunk type for the whole half, as alloc() records it in rm.
+        room_of = {}
+        for ci, (dur, typ) in enumerate(u.chunks):
+            table = tables.get(dur) or tables.setdefault(dur, start_table(ds, dur))
+            name = f"u{ui}c{ci}"
+            p = m.NewBoolVar(f"{name}p")
+            t = m.NewIntVar(0, week - 1, f"{name}t")
+            size = m.NewIntVar(1, n, f"{name}n")
+            day = m.NewIntVar(0, len(days) - 1, f"{name}d")
+            ex = m.NewBoolVar(f"{name}x")
+            end = m.NewIntVar(1, week, f"{name}e")
+            m.Add(end == t + size)
+            m.AddAllowedAssignments([t, size, day, ex], table)
+            # Identical chunks of a unit are interchangeable: keep them in start order.
+            if prev is not None and prev[0] == (dur, typ):
+                m.AddImplication(p, prev[1])
+                m.Add(t > prev[2]).OnlyEnforceIf(p)
+            prev = ((dur, typ), p, t)
+            days_on = [m.NewBoolVar(f"{name}on{d}") for d in range(len(days))]
+            for d, b in enumerate(days_on):
+                m.Add(day == d).OnlyEnforceIf(b)
+            m.Add(sum(days_on) == p)
+            on_day["P" if typ == "P" else "LT"].append(days_on)
+
+            plain = m.NewOptionalIntervalVar(t, size, end, p, f"{name}i")
+            for label, _ in u.members:
+                by_half.setdefault(label, []).append(plain)
+            layered = [m.NewOptionalIntervalVar(t + layer * week, size, end + layer * week, p, f"{name}l{layer}")
+                       for layer in (0, 1) if u.layers & (1 << layer)]
+            for k in u.fac_keys:
+                by_fac.setdefault(k, []).extend(layered)
+            if u.kind == "combined":
+                hall.extend(layered)
+            rooms = u.labs if typ == "P" else u.rooms
+            chosen = {}
+            if u.kind == "regular":
+                if typ not in room_of:
+                    room_of[typ] = {r: m.NewBoolVar(f"u{ui}{typ}r{r}") for r in rooms}
+                    m.Add(sum(room_of[typ].values()) <= 1)
+                for r, y in room_of[typ].items():
+                    z = chosen[r] = m.NewBoolVar(f"{name}r{r}")
+                    m.AddImplication(z, y)
+                    for layer in (0, 1):
+                        if u.layers & (1 << layer):
+                            by_room.setdefault(r, []).append(
+                                m.NewOptionalIntervalVar(t + layer * week, size, end + layer * week, z, f"{name}r{r}l{layer}"))
+                # With no room of the right kind in the pool the sum is empty and the chunk stays unplaced.
+                m.Add(sum(chosen.values()) == p)
+            placed_hours.append(p * int(round(dur * 2)) * len(u.members))
+            # An absent chunk can always sit on a non-excluded start, so ex only costs when the chunk is placed.
+            excluded_use.append(ex)
+            picks.append((u, dur, typ, p, t, size, chosen))
+        for group in on_day.values():
+            for d in range(len(days)):
+                if len(group) > 1:
+                    m.Add(sum(b[d] for b in group) <= 1)
+
+    for intervals in list(by_half.values()) + list(by_fac.values()) + list(by_room.values()) + [hall]:
+        if len(intervals) > 1:
+            m.AddNoOverlap(intervals)
+    m.Maximize(1000 * sum(placed_hours) - sum(excluded_use))
+
+    solver = cp_model.CpSolver()
+    solver.parameters.max_time_in_seconds = float(time_limit)
+    solver.parameters.num_workers = workers
+    solver.parameters.random_seed = seed % (2 ** 31)
+    status = solver.Solve(m)
+    solved = status in (cp_model.OPTIMAL, cp_model.FEASIBLE)
+    return collect(ds, secs, halves, [(u, dur, typ, solved and solver.Value(p), solver.Value(t) if solved else 0,
+                                 solver.Value(size) if solved else 0, next((r for r, y in chosen.items() if solved and solver.Value(y)), None))
+                                for u, dur, typ, p, t, size, chosen in picks])
+
+
+def collect(ds, secs, halves, chunk_values):
+    """Turn solved chunks (unit, dur, typ, present, t, size, room) into section results and grids."""
+    n = len(ds.slot_keys)
+    placements = {label: [] for label in halves}
+    missing = {}
+    for u, dur, typ, present, t, size, room in chunk_values:
+        # A section's halves share one Placement per chunk, as --pin-full-semester shares a full-semester course's.
+        shared = {}
+        for label, sec in u.members:
+            if present:
+                if sec["label"] not in shared:
+                    start = t % n
+                    shared[sec["label"]] = Placement(days[t // n], start, start + size, u.code, typ, room if u.kind == "regular" else
+                                                     ("C004" if u.kind == "combined" else None), u.faculty or None,
+                                                     cell_text(u.code, typ, room, u.kind == "elective", u.kind == "combined", sec["hide_c004"]))
+                placements[label].append(shared[sec["label"]])
+            else:
+                key = (label, u.code, typ)
+                if key not in missing:
+                    missing[key] = {"Label": label, "Course_Code": u.code, "Type": typ, "Hours_Remaining": 0.0, "Faculty": u.faculty}
+                missing[key]["Hours_Remaining"] = round(missing[key]["Hours_Remaining"] + dur, 2)
+
+    out, grids = {sec["label"]: ([], []) for sec in secs}, {}
+    for label, (sec, half) in halves.items():
+        tt = ds.new_grid()
+        for p in sorted(placements[label], key=lambda p: (days.index(p.day), p.start)):
+            tt.put(p.day, ds.slot_keys[p.start:p.end], p.text)
+            tt.placements.append(p)
+        grids[label] = tt
+        failed = [r for (lb, _, _), r in missing.items() if lb == label]
+        codes = list(dict.fromkeys(p.code for p in tt.placements))
+        out[sec["label"]][0].extend(failed)
+        out[sec["label"]][1].append({"label": label, "half": half, "codes": codes, "placements": tt.placements})
+    return out, grids
@@ -1,38 +1,38 @@
-import pandas as pd
-import openpyxl
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font, Border, Side, PatternFill
+import argparse
 import json
-import glob
+import os
 import re
 import random
+from occupancy import split_faculty
+from manifest import load_manifest, course_files
+from schedule import LEGEND_HEADERS
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
 # -------------------- Styling --------------------
-thin = Border(
-    left=Side(style='thin'),
-    right=Side(style='thin'),
-    top=Side(style='thin'),
-    bottom=Side(style='thin')
-)
+def thin_border():
+    from openpyxl.styles import Border, Side
+    return Border(
+        left=Side(style='thin'),
+        right=Side(style='thin'),
+        top=Side(style='thin'),
+        bottom=Side(style='thin')
+    )
 
 # -------------------- Time Slots --------------------
-with open("data/time_slots.json") as f:
-    slots = json.load(f)["time_slots"]
-
 def t2m(x):
     h, m = map(int, x.split(":"))
     return h * 60 + m
 
-slots_sorted = sorted(slots, key=lambda z: t2m(z["start"]))
-slot_keys = [f"{s['start']}-{s['end']}" for s in slots_sorted]
-slot_dur = {
-    f"{s['start']}-{s['end']}":
-    (t2m(s["end"]) - t2m(s["start"])) / 60.0
-    for s in slots_sorted
-}
+def load_slot_keys(data_dir=DATA_DIR):
+    with open(os.path.join(data_dir, "time_slots.json")) as f:
+        slots = json.load(f)["time_slots"]
+    slots_sorted = sorted(slots, key=lambda z: t2m(z["start"]))
+    return [f"{s['start']}-{s['end']}" for s in slots_sorted]
 
 days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
 HALVES = ["First Half", "Second Half"]
+HALF_NAMES = {"1": "First Half", "2": "Second Half"}
 
 # -------------------- Helpers --------------------
 def extract_code(x):
@@ -43,24 +43,46 @@ def extract_code(x):
         return ""
     return x.split()[0].upper()
 
-def split_faculty(fac):
-    if fac is None:
-        return []
-    fac = str(fac)
-    return [x.strip() for x in re.split(r"[\\/;,&]| and ", fac) if x.strip()]
-
 def add_section(cell_value, section):
     cell_value = str(cell_value)
     if "(" in cell_value and cell_value.endswith(")"):
         return cell_value
     return f"{cell_value} ({section})"
 
+def cell_code(text, faculty_of):
+    # Course code of a grid cell: "CS101T (C101)" is CS101's tutorial, "Elective2(Lab)" basket 2's lab.
+    code = extract_code(text).split("(")[0]
+    m = re.match(r"ELECTIVE\s*([0-9]+)", code)
+    if m:
+        return f"ELECTIVE{m.group(1)}"
+    if code not in faculty_of and code.endswith("T") and code[:-1] in faculty_of:
+        return code[:-1]
+    return code
+
+def section_faculty(legend):
+    """Code -> faculty list from one section's legend rows (LEGEND_HEADERS).
+
+    ElectiveN maps to the faculty of every elective in basket N of that section, so baskets of different
+    semesters are not mixed.
+    """
+    faculty_of = {}
+    for row in legend:
+        facs = split_faculty(row[3])
+        faculty_of[str(row[0]).strip().upper()] = facs
+        if row[5] == "Yes" and row[6] and row[6] != "0":
+            faculty_of.setdefault(f"ELECTIVE{row[6]}", []).extend(facs)
+    return faculty_of
+
 def safe_title(x):
     return re.sub(r'[:\\/*?\[\]]', '_', x)[:30]
 
+def empty_week(slot_keys):
+    return {h: {d: {s: "" for s in slot_keys} for d in days} for h in HALVES}
+
 # -------------------- Load Course Info --------------------
-def load_all_course_info():
-    files = glob.glob("data/*.csv")
+def load_all_course_info(data_dir=DATA_DIR):
+    import pandas as pd
+    files = [os.path.join(data_dir, f) for f in course_files(load_manifest(os.path.join(data_dir, "sections.json")))]
     fac_map = {}
     p_map = {}
     elective_by_basket = {}
@@ -107,8 +129,6 @@ def load_all_course_info():
 
     return fac_map, p_map, elective_by_basket
 
-course_faculty, course_P, elective_baskets = load_all_course_info()
-
 # -------------------- Colors --------------------
 colors = [
     "FFB3BA","BAE1FF","BAFFC9","FFFFBA","FFD8BA","E3BAFF","D0BAFF","FFCBA4",
@@ -120,6 +140,7 @@ color_map = {}
 fill_map = {}
 
 def get_fill(code):
+    from openpyxl.styles import PatternFill
     if not code:
         return None
     if code not in color_map:
@@ -129,115 +150,174 @@ def get_fill(code):
         fill_map[col] = PatternFill(start_color=col, end_color=col, fill_type="solid")
     return fill_map[col]
 
-# -------------------- Read Input Timetable --------------------
-wb_in = openpyxl.load_workbook("Balanced_Timetable_latest.xlsx")
-faculty_slots = {}
-
-for sheet in wb_in.sheetnames:
-    ws = wb_in[sheet]
-    current_half = None
-
-    rows = list(ws.values)
-    if not rows:
-        continue
-
-    header_index = None
-    for i, row in enumerate(rows):
-        if row and row[0] == "Day":
-            header_index = i
-            break
-
-    if header_index is None:
-        continue
-
-    header = rows[header_index]
-    col_map = {name: idx for idx, name in enumerate(header) if name in slot_keys}
-
-    for r in range(1, ws.max_row + 1):
-        first_cell = str(ws.cell(r, 1).value).strip()
-
-        if "First Half" in first_cell:
-            current_half = "First Half"
-            continue
-        if "Second Half" in first_cell:
-            current_half = "Second Half"
+# -------------------- From the schedule model --------------------
+def build_faculty_timetables(schedule):
+    """Faculty name -> half -> day -> slot -> cell text, straight from a timetable.Schedule's placements.
+
+    Elective basket slots (ElectiveN) go to the faculty of every course in that basket, as section_faculty()
+    reads them from the section's own legend.
+    """
+    faculty_slots = {}
+    day_order = {d: i for i, d in enumerate(days)}
+    for sec, half in schedule.halves():
+        half_name = HALF_NAMES.get(half["half"])
+        if half_name is None:
             continue
-        if first_cell not in days or not current_half:
-            continue
-
-        day = first_cell
-
-        for sk, col in col_map.items():
-            cell = ws.cell(r, col + 1).value
-            if not cell:
+        faculty_of = section_faculty(sec["legend"])
+        for p in sorted(half["placements"], key=lambda p: (day_order.get(p.day, len(days)), p.start)):
+            if p.day not in day_order:
                 continue
-            code = extract_code(cell)
-
-# ---------- ELECTIVES ----------
-            if code.startswith("ELECTIVE"):
-                m = re.search(r"ELECTIVE\s*([0-9]+)", code)
-                val_with_section = cell  # keep cell text as-is
-
-    # Case 1: Elective with basket number
-                if m:
-                    basket = m.group(1)
-                    reps = elective_baskets.get(basket, [])
-                else:
-        # fallback: all electives
-                    reps = [c for lst in elective_baskets.values() for c in lst]
-
-                for c_up in reps:
-                    facs = course_faculty.get(c_up, [])
+            code = p.code.upper()
+            facs = faculty_of.get(code, []) if code.startswith("ELECTIVE") else split_faculty(p.faculty)
+            for fac in facs:
+                if not fac:
+                    continue
+                table = faculty_slots.setdefault(fac, empty_week(schedule.slot_keys))[half_name][p.day]
+                for sk in schedule.slot_keys[p.start:p.end]:
+                    table[sk] = p.text
+    return faculty_slots
+
+# -------------------- Read Input Timetable --------------------
+def merged_spans(ws):
+    # (row, column) of each merge's first cell -> its last column. A sheet's merges are stored after its cell
+    # data, so a read-only worksheet only gets them from a second streaming read of the sheet XML.
+    from xml.etree.ElementTree import iterparse
+    from openpyxl.utils.cell import range_boundaries
+    spans = {}
+    with ws._get_source() as src:
+        for _, el in iterparse(src):
+            if el.tag.endswith("}mergeCell"):
+                c0, r0, c1, _ = range_boundaries(el.get("ref"))
+                spans[(r0, c0)] = c1
+            el.clear()
+    return spans
+
+def parse_timetable_xlsx(path, slot_keys, course_faculty, elective_baskets):
+    """Faculty name -> half -> day -> slot -> cell text from a timetable workbook, as build_faculty_timetables()
+    builds it from the schedule: a merged class fills every slot it spans, and each section's cells are read
+    against that section's legend. course_faculty and elective_baskets (load_all_course_info()) stand in for
+    a section whose legend is not in the sheet.
+    """
+    # One streaming pass per sheet: the half marker and the "Day" header row are tracked as rows go by, and a
+    # section's cells wait for its legend, which follows them.
+    import openpyxl
+    wb_in = openpyxl.load_workbook(path, read_only=True)
+    faculty_slots = {}
+    day_set = set(days)
+    legend_header = [h.upper() for h in LEGEND_HEADERS]
+    fallback = {c: list(f) for c, f in course_faculty.items()}
+    for basket, members in elective_baskets.items():
+        fallback[f"ELECTIVE{basket}"] = [fac for c in members for fac in course_faculty.get(c, [])]
+
+    try:
+        for ws in wb_in.worksheets:
+            current_half = None
+            col_map = None
+            sections = []
+            cells = []
+            legend = None
+
+            for r, row in enumerate(ws.iter_rows(values_only=True), start=ws.min_row):
+                if not row:
+                    continue
+                first_cell = "" if row[0] is None else str(row[0]).strip()
+
+                if legend is not None:
+                    if first_cell:
+                        legend.append(["" if v is None else str(v).strip() for v in row[:len(LEGEND_HEADERS)]])
+                        continue
+                    sections.append((cells, legend))
+                    cells, legend = [], None
+                if [str(v).strip().upper() for v in row[:len(LEGEND_HEADERS)]] == legend_header:
+                    legend = []
+                    continue
+                if "First Half" in first_cell:
+                    current_half = "First Half"
+                    continue
+                if "Second Half" in first_cell:
+                    current_half = "Second Half"
+                    continue
+                if first_cell == "Day":
+                    if col_map is None:
+                        col_map = {idx: name for idx, name in enumerate(row) if name in slot_keys}
+                    continue
+                if first_cell not in day_set or not current_half or col_map is None:
+                    continue
+
+                for col in col_map:
+                    cell = row[col] if col < len(row) else None
+                    if cell:
+                        cells.append((current_half, first_cell, r, col, cell))
+            sections.append((cells, legend))
+
+            spans = merged_spans(ws) if any(c for c, _ in sections) else {}
+            for cells, legend in sections:
+                faculty_of = fallback if legend is None else section_faculty(legend)
+                for half, day, r, col, cell in cells:
+                    facs = faculty_of.get(cell_code(cell, faculty_of), [])
+                    last = spans.get((r, col + ws.min_column), col + ws.min_column) - ws.min_column
                     for fac in facs:
                         if not fac:
                             continue
-                        faculty_slots.setdefault(
-                            fac,
-                            {h: {d: {s: "" for s in slot_keys} for d in days} for h in HALVES}
-                        )
-                        faculty_slots[fac][current_half][day][sk] = val_with_section
-
-# ---------- NORMAL COURSES ----------
-            else:
-                facs = course_faculty.get(code, [])
-                for fac in facs:
-                    if not fac:
-                        continue
-                    faculty_slots.setdefault(
-                        fac,
-                        {h: {d: {s: "" for s in slot_keys} for d in days} for h in HALVES}
-                    )
-                    faculty_slots[fac][current_half][day][sk] = cell
-
+                        table = faculty_slots.setdefault(fac, empty_week(slot_keys))[half][day]
+                        for c in range(col, last + 1):
+                            if c in col_map:
+                                table[col_map[c]] = cell
+    finally:
+        wb_in.close()
+    return faculty_slots
 
 # -------------------- Write Output --------------------
-wb_out = Workbook()
-first_sheet = True
-
-for fac, halves in faculty_slots.items():
-    ws = wb_out.active if first_sheet else wb_out.create_sheet()
-    ws.title = safe_title(fac)
-    first_sheet = False
-
-    for half in HALVES:
-        ws.append([f"{fac} | {half}"])
-        ws.append(["Day"] + slot_keys)
-
-        table = halves[half]
-        for d in days:
-            ws.append([d] + [table[d][s] for s in slot_keys])
-
-        ws.append([])
-
-    # formatting
-    for row in ws.iter_rows():
-        for cell in row:
-            cell.border = thin
-            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-
-    for col in ws.columns:
-        width = max(len(str(c.value)) if c.value else 0 for c in col)
-        ws.column_dimensions[col[0].column_letter].width = min(width + 2, 60)
-
-wb_out.save("Faculty_Timetable.xlsx")
-print("Faculty_Timetable.xlsx generated successfully.")
+def write_faculty_workbook(faculty_slots, slot_keys, path):
+    from openpyxl import Workbook
+    from openpyxl.styles import Alignment
+    thin = thin_border()
+    wb_out = Workbook()
+    first_sheet = True
+
+    for fac, halves in faculty_slots.items():
+        ws = wb_out.active if first_sheet else wb_out.create_sheet()
+        ws.title = safe_title(fac)
+        first_sheet = False
+
+        for half in HALVES:
+            ws.append([f"{fac} | {half}"])
+            ws.append(["Day"] + slot_keys)
+
+            table = halves[half]
+            for d in days:
+                ws.append([d] + [table[d][s] for s in slot_keys])
+
+            ws.append([])
+
+        # formatting
+        for row in ws.iter_rows():
+            for cell in row:
+                cell.border = thin
+                cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+
+        for col in ws.columns:
+            width = max(len(str(c.value)) if c.value else 0 for c in col)
+            ws.column_dimensions[col[0].column_letter].width = min(width + 2, 60)
+
+    wb_out.save(path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-faculty timetables from the generated timetable")
+    parser.add_argument("--schedule", default="Balanced_Timetable_latest.schedule.json", help="schedule JSON written by timetable.py")
+    parser.add_argument("--xlsx", default="Balanced_Timetable_latest.xlsx", help="timetable workbook, read only when the schedule JSON is missing")
+    parser.add_argument("--data-dir", default="data", help="time slots and course CSVs for the workbook fallback")
+    parser.add_argument("--out", default="Faculty_Timetable.xlsx")
+    args = parser.parse_args()
+
+    if os.path.exists(args.schedule):
+        from schedule import load_schedule
+        schedule = load_schedule(args.schedule)
+        slot_keys = schedule.slot_keys
+        faculty_slots = build_faculty_timetables(schedule)
+    else:
+        slot_keys = load_slot_keys(args.data_dir)
+        course_faculty, course_P, elective_baskets = load_all_course_info(args.data_dir)
+        faculty_slots = parse_timetable_xlsx(args.xlsx, slot_keys, course_faculty, elective_baskets)
+    write_faculty_workbook(faculty_slots, slot_keys, args.out)
+    print(f"{args.out} generated successfully.")
@@ -0,0 +1,151 @@
+from schedule import LEGEND_HEADERS, grid_row
+
+# Cell styles are small dicts of symbolic parts; each distinct combination is built once per workbook.
+FONTS = {"bold": dict(bold=True), "bold12": dict(bold=True, size=12), "bold13": dict(bold=True, size=13)}
+ALIGNS = {"center": dict(horizontal="center", vertical="center"),
+          "center_wrap": dict(horizontal="center", vertical="center", wrap_text=True),
+          "left": dict(horizontal="left", vertical="center")}
+LEGEND_FILL = "D9D9D9"
+
+
+class StyleCache:
+    """One registered named style per distinct style, so a write-only cell takes its font, alignment, border and
+    fill in a single assignment, as timetable.named_style() does for the openpyxl writer."""
+
+    def __init__(self):
+        self.styles = {}
+
+    def cell(self, ws, value, style):
+        from openpyxl.cell import WriteOnlyCell
+        c = WriteOnlyCell(ws, value)
+        if style:
+            key = tuple(sorted(style.items()))
+            name = self.styles.get(key)
+            if name is None:
+                name = self.styles[key] = self.build(ws.parent, key)
+            c.style = name
+        return c
+
+    @staticmethod
+    def build(wb, key):
+        from openpyxl.styles import Alignment, Border, Font, NamedStyle, PatternFill, Side
+        from openpyxl.styles.borders import DEFAULT_BORDER
+        from openpyxl.styles.fills import DEFAULT_EMPTY_FILL
+        from openpyxl.styles.fonts import DEFAULT_FONT
+        style = dict(key)
+        # Parts the style leaves out keep the workbook defaults, as on an unstyled cell.
+        st = NamedStyle(name="Fast " + " ".join(f"{k}={v}" for k, v in key), font=DEFAULT_FONT, border=DEFAULT_BORDER, fill=DEFAULT_EMPTY_FILL)
+        if "font" in style:
+            st.font = Font(**FONTS[style["font"]])
+        if "align" in style:
+            st.alignment = Alignment(**ALIGNS[style["align"]])
+        if "border" in style:
+            thin = Side(style="thin")
+            st.border = Border(left=thin, right=thin, top=thin, bottom=thin)
+        if "fill" in style:
+            st.fill = PatternFill(start_color=style["fill"], end_color=style["fill"], fill_type="solid")
+        wb.add_named_style(st)
+        return st.name
+
+
+def timetable_rows(schedule, sheet):
+    """The rows render_workbook() writes for one sheet as (values, styles), plus [(header_row, half)] for the
+    grids; row indices are 0-based."""
+    rows = []
+    grids = []
+    n = len(schedule.slot_keys)
+    for sec in sheet["sections"]:
+        for half in sec["halves"]:
+            rows.append(([""], [None]))
+            rows.append(([half["label"]], [{"font": "bold12"}]))
+            grids.append((len(rows), half))
+            rows.append((["Day"] + schedule.slot_keys, [None] + [{"font": "bold", "align": "center_wrap"}] * n))
+            for d in schedule.days:
+                rows.append(([d] + grid_row(half["placements"], d, n), [None] * (n + 1)))
+            rows.append(([""], [None]))
+        rows.append(([""], [None]))
+        rows.append(([""], [None]))
+        rows.append(([f"Legend - {sec['legend_title']}"], [{"font": "bold13", "align": "left"}]))
+        rows.append((list(LEGEND_HEADERS), [{"font": "bold", "align": "center_wrap" if i else "center", "border": "thin", "fill": LEGEND_FILL}
+                                            for i in range(len(LEGEND_HEADERS))]))
+        for r in sec["legend"]:
+            st = []
+            for i, v in enumerate(r):
+                s = {"border": "thin"}
+                if i < 7 or v:
+                    s["align"] = "center_wrap"
+                if i and v:
+                    s["font"] = "bold"
+                st.append(s)
+            rows.append((list(r), st))
+        rows.append(([""], [None]))
+    return rows, grids
+
+
+def style_grids(rows, grids, days, color_of):
+    """Borders, merges and fills as timetable.merge_and_color() sets them, from the placement spans."""
+    mc = max(len(v) for v, _ in rows)
+    for v, st in rows:
+        v.extend([None] * (mc - len(v)))
+        st.extend([None] * (mc - len(st)))
+    for _, st in rows[1:]:
+        for col in range(1, mc):
+            st[col] = dict(st[col] or {}, border="thin")
+    merges = []
+    day_row = {d: i + 1 for i, d in enumerate(days)}
+    for top, half in grids:
+        for p in sorted(half["placements"], key=lambda p: (day_row[p.day], p.start)):
+            r = top + day_row[p.day]
+            vals, st = rows[r]
+            if p.end - p.start > 1:
+                merges.append((r, p.start + 1, p.end))
+                for col in range(p.start + 2, p.end + 1):
+                    vals[col] = None
+            color = color_of(p.code)
+            for col in range(p.start + 1, p.end + 1):
+                s = dict(st[col], font="bold", align="center_wrap")
+                if color:
+                    s["fill"] = color
+                st[col] = s
+    return merges
+
+
+def widths_of(rows):
+    mc = max((len(v) for v, _ in rows), default=0)
+    out = []
+    for col in range(mc):
+        maxl = max((len(str(v[col])) for v, _ in rows if col < len(v) and v[col] is not None), default=0)
+        out.append(min(maxl + 2 if maxl else 8, 60))
+    return out
+
+
+def write_sheet(wb, styles, title, rows, widths, merges=()):
+    from openpyxl.utils import get_column_letter
+    from openpyxl.worksheet.cell_range import CellRange
+    ws = wb.create_sheet(title)
+    # Column widths go out with the sheet header, so they have to be set before the first row.
+    for i, w in enumerate(widths, start=1):
+        ws.column_dimensions[get_column_letter(i)].width = w
+    for r, c0, c1 in merges:
+        ws.merged_cells.add(CellRange(min_col=c0 + 1, min_row=r + 1, max_col=c1 + 1, max_row=r + 1))
+    for vals, st in rows:
+        ws.append([styles.cell(ws, v, s) if s else v for v, s in zip(vals, st)])
+    return ws
+
+
+def render_workbook(ds, schedule, color_of, timings=None):
+    """Write-only counterpart of timetable.render_workbook(): the same sheets, streamed out with cached styles."""
+    from openpyxl import Workbook
+    from timings import phase
+    wb = Workbook(write_only=True)
+    styles = StyleCache()
+    for sheet in schedule.sheets:
+        with phase(timings, sheet["title"], "render_sheet"):
+            rows, grids = timetable_rows(schedule, sheet)
+            merges = style_grids(rows, grids, schedule.days, color_of)
+            write_sheet(wb, styles, sheet["title"], rows, widths_of(rows), merges)
+
+    from timetable import report_rows
+    rows = [(row, [None] * len(row)) for row in report_rows(ds, schedule, timings)]
+    write_sheet(wb, styles, "Report", rows, widths_of(rows))
+    return wb
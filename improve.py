@@ -0,0 +1,369 @@
+import math
+import random
+import time
+
+from backtrack import start_positions
+from occupancy import Placement, faculty_key, split_faculty
+from quality import WEIGHTS
+from timetable import cell_text, chunks, course_layers, days, lab_prefix_for_class_prefix, room_candidates, s
+
+
+def chunk_hours(typ, hours):
+    # The first chunk chunks() cuts from `hours` of this type.
+    return chunks(*(round(hours, 6) if t == typ else 0 for t in "LTP"))[0][0]
+
+
+class Unit:
+    """One movable chunk: a regular course's placement and the halves showing it (two when both halves share the
+    Placement, as --pin-full-semester and the CP-SAT engine do for full-semester courses)."""
+
+    __slots__ = ("p", "halves", "layers", "keys", "section", "hours")
+
+    def __init__(self, p, halves, layers, keys, section, hours):
+        self.p, self.halves, self.layers, self.keys, self.section, self.hours = p, halves, layers, keys, section, hours
+
+
+class Improver:
+    """Simulated annealing over finished section grids.
+
+    Only regular courses move: electives follow their sync group and combined courses share C004, so both stay
+    where generation put them and only block slots. The moves are: move a chunk to another start, swap two
+    chunks of one section, swap the rooms of two courses, and place a chunk the generator left unplaced. Every
+    move updates the section grids and the faculty, room and per-day usage ledgers in place, and its cost is the
+    change in the terms of the (half, day) pairs it touches: quality.Scorer's objective, kept on the grids' bitmasks.
+    """
+
+    def __init__(self, ds, schedule, grids, secs, pin_full=False, rng=None):
+        self.ds, self.grids, self.failed = ds, grids, schedule.failed
+        self.rng = rng or random.Random(0)
+        self.tt = next(iter(grids.values())) if grids else ds.new_grid()
+        self.dur = [ds.slot_dur[k] for k in ds.slot_keys]
+        self.lists = {}
+        self.fac = {}
+        self.rooms = {d: {} for d in days}
+        self.usage = {}
+        self.labs = {}
+        self.units = []
+        self.by_section = {}
+        self.cands = {}
+        self.positions = {}
+        self.pending = []
+        self.half_of = {}
+        prefix = {sec["label"]: sec["room_prefix"] for sec in secs}
+        seen = {}
+        courses_of = {}
+        for sec, half in schedule.halves():
+            label = half["label"]
+            self.lists[label] = half["placements"]
+            courses = courses_of.get(sec["label"])
+            if courses is None:
+                courses = courses_of[sec["label"]] = {s(c.get("Course_Code", "")): c for c in ds.courses(sec["courses"])}
+                for lab in (False, True):
+                    p = prefix.get(sec["label"])
+                    self.cands[(sec["label"], lab)] = (room_candidates(ds, lab=True, lab_prefix=lab_prefix_for_class_prefix.get(p, None)) if lab
+                                                       else room_candidates(ds, lab=False, prefix=p))
+            self.half_of[label] = half["half"]
+            for p in half["placements"]:
+                self.count(label, p, 1)
+                c = courses.get(p.code)
+                # A full-semester chunk holds its own half's layer, and both when the halves share the Placement.
+                layers = course_layers(c, half["half"]) if c else 0b11
+                u = seen.get(id(p))
+                if u is not None:
+                    u.halves.append(label)
+                    layers &= ~u.layers
+                    u.layers |= layers
+                keys = u.keys if u else {faculty_key(x) for x in split_faculty(p.faculty or "")}
+                om = self.tt.layered(self.mask(p), layers)
+                for k in keys:
+                    by_day = self.fac.setdefault(k, {})
+                    by_day[p.day] = by_day.get(p.day, 0) | om
+                if p.room and p.room != "C004":
+                    self.rooms[p.day][p.room] = self.rooms[p.day].get(p.room, 0) | om
+                if u is not None:
+                    continue
+                u = seen[id(p)] = Unit(p, [label], layers, keys, sec["label"], chunk_hours(p.type, self.hours(self.mask(p))))
+                if c and self.movable(c, p):
+                    self.units.append(u)
+                    self.by_section.setdefault(sec["label"], []).append(u)
+
+        # Unplaced regular chunks; a pinned full-semester course is missing from both halves at once.
+        rows = {}
+        for r in self.failed:
+            sec = r["Label"].rsplit(" ", 2)[0]
+            c = courses_of.get(sec, {}).get(r["Course_Code"])
+            if c is None or not self.movable(c) or r["Label"] not in self.lists:
+                continue
+            layers = course_layers(c, self.half_of[r["Label"]], pin_full)
+            key = (sec, r["Course_Code"], r["Type"]) if pin_full and layers == 0b11 else (r["Label"], r["Course_Code"], r["Type"])
+            if key not in rows:
+                rows[key] = [], layers, c, sec
+                self.pending.append(key)
+            rows[key][0].append(r)
+        self.rows = rows
+
+    @staticmethod
+    def movable(c, p=None):
+        return (s(c.get("Elective", "")) != "1" and s(c.get("Is_Combined", "0")) != "1"
+                and (p is None or (p.room and p.room != "C004")))
+
+    @staticmethod
+    def mask(p):
+        return (1 << p.end) - (1 << p.start)
+
+    def hours(self, m):
+        return sum(self.dur[i] for i in range(len(self.dur)) if m >> i & 1)
+
+    def count(self, label, p, n):
+        key = (label, p.day, p.code, "P" if p.type == "P" else "LT")
+        self.usage[key] = self.usage.get(key, 0) + n
+        if p.type == "P":
+            self.labs[(label, p.day)] = self.labs.get((label, p.day), 0) + n
+
+    def starts(self, hours):
+        # {start slot: (start, end, mask)} for a chunk of these hours.
+        if hours not in self.positions:
+            self.positions[hours] = {a: (a, b, m) for a, b, m, _ in start_positions(self.tt, self.ds.slot_dur, hours)}
+        return self.positions[hours]
+
+    # Ledgers
+
+    def take(self, u):
+        p, om = u.p, self.tt.layered(self.mask(u.p), u.layers)
+        for label in u.halves:
+            pl = self.lists[label]
+            del pl[next(i for i, q in enumerate(pl) if q is p)]
+            self.grids[label].release(p.day, self.mask(p))
+            self.count(label, p, -1)
+        for k in u.keys:
+            self.fac[k][p.day] &= ~om
+        self.rooms[p.day][p.room] &= ~om
+
+    def fits(self, u, p):
+        m = self.mask(p)
+        om = self.tt.layered(m, u.layers)
+        kind = "P" if p.type == "P" else "LT"
+        for label in u.halves:
+            if self.grids[label].busy[p.day] & m or self.usage.get((label, p.day, p.code, kind)):
+                return False
+        if any(self.fac.get(k, {}).get(p.day, 0) & om for k in u.keys):
+            return False
+        return not self.rooms[p.day].get(p.room, 0) & om
+
+    def give(self, u, p):
+        om = self.tt.layered(self.mask(p), u.layers)
+        for label in u.halves:
+            self.lists[label].append(p)
+            self.grids[label].put(p.day, self.ds.slot_keys[p.start:p.end], p.text)
+            self.count(label, p, 1)
+        for k in u.keys:
+            by_day = self.fac.setdefault(k, {})
+            by_day[p.day] = by_day.get(p.day, 0) | om
+        self.rooms[p.day][p.room] = self.rooms[p.day].get(p.room, 0) | om
+        u.p = p
+
+    def apply(self, changes):
+        """Move every unit to its new placement, or leave them all as they were; returns the old placements."""
+        old = [(u, u.p) for u, _ in changes]
+        for u, _ in changes:
+            self.take(u)
+        done = []
+        for u, p in changes:
+            if not self.fits(u, p):
+                for v, _ in reversed(done):
+                    self.take(v)
+                for v, q in old:
+                    self.give(v, q)
+                return None
+            self.give(u, p)
+            done.append((u, p))
+        return old
+
+    def undo(self, old):
+        for u, _ in old:
+            self.take(u)
+        for u, p in old:
+            self.give(u, p)
+
+    # Objective
+
+    def day_cost(self, label, d):
+        tt = self.grids[label]
+        busy = tt.busy[d]
+        cost = WEIGHTS["lab_crowding"] * max(0, self.labs.get((label, d), 0) - 1)
+        if busy:
+            cost += WEIGHTS["excluded_hours"] * self.hours(busy & tt.excluded_mask)
+            span = (1 << busy.bit_length()) - (busy & -busy)
+            cost += WEIGHTS["idle_hours"] * self.hours(span & ~busy & ~tt.excluded_mask)
+        return cost
+
+    def unplaced(self):
+        return sum(r.get("Hours_Remaining", 0) for r in self.failed)
+
+    def total(self):
+        return WEIGHTS["unplaced_hours"] * self.unplaced() + sum(self.day_cost(label, d) for label in self.lists for d in days)
+
+    def touched(self, changes):
+        return {(label, d) for u, p in changes for label in u.halves for d in (u.p.day, p.day)}
+
+    # Moves
+
+    def placed_at(self, u, d, a, room=None):
+        hit = self.starts(u.hours).get(a)
+        if hit is None:
+            return None
+        _, b, _ = hit
+        p = u.p
+        room = room or p.room
+        return Placement(d, a, b, p.code, p.type, room, p.faculty, cell_text(p.code, p.type, room))
+
+    def propose(self):
+        rng = self.rng
+        pending = [k for k in self.pending if any(r["Hours_Remaining"] > 1e-9 for r in self.rows[k][0])]
+        roll = rng.random()
+        if pending and roll < 0.2:
+            return "insert", rng.choice(pending)
+        if not self.units:
+            return None
+        u = rng.choice(self.units)
+        if roll < 0.6:
+            p = self.placed_at(u, rng.choice(days), rng.choice(list(self.starts(u.hours))))
+            return ("move", [(u, p)]) if p else None
+        if roll < 0.85:
+            v = rng.choice(self.by_section[u.section])
+            if v is u or v.halves != u.halves:
+                return None
+            p, q = self.placed_at(u, v.p.day, v.p.start), self.placed_at(v, u.p.day, u.p.start)
+            return ("swap", [(u, p), (v, q)]) if p and q else None
+        v = rng.choice(self.units)
+        lab = u.p.type == "P"
+        if v.p.room == u.p.room or (v.p.type == "P") != lab:
+            return None
+        if v.p.room not in self.cands[(u.section, lab)] or u.p.room not in self.cands[(v.section, lab)]:
+            return None
+        # A course keeps one room per type, so every chunk of both courses in those rooms changes room.
+        mine = [w for w in self.by_section[u.section] if (w.p.code, w.p.type, w.p.room) == (u.p.code, u.p.type, u.p.room)]
+        theirs = [w for w in self.by_section[v.section] if (w.p.code, w.p.type, w.p.room) == (v.p.code, v.p.type, v.p.room)]
+        return "rooms", [(w, self.placed_at(w, w.p.day, w.p.start, v.p.room)) for w in mine] + \
+                        [(w, self.placed_at(w, w.p.day, w.p.start, u.p.room)) for w in theirs]
+
+    def insert(self, key):
+        """A new unit and placement for one unplaced chunk of a pending row group, or None; add() places it."""
+        rows, layers, c, sec = self.rows[key]
+        code, typ = s(c.get("Course_Code", "")), key[2]
+        hours = chunk_hours(typ, max(r["Hours_Remaining"] for r in rows))
+        halves = sorted({r["Label"] for r in rows})
+        f = s(c.get("Faculty", ""))
+        u = Unit(None, halves, layers, {faculty_key(x) for x in split_faculty(f)}, sec, hours)
+        same = [w.p.room for w in self.by_section.get(sec, []) if (w.p.code, w.p.type) == (code, typ) and set(w.halves) & set(halves)]
+        rooms = same[:1] or self.cands[(sec, typ == "P")]
+        if not rooms:
+            return None
+        d, a = self.rng.choice(days), self.rng.choice(list(self.starts(hours)))
+        _, b, _ = self.starts(hours)[a]
+        room = self.rng.choice(rooms)
+        p = Placement(d, a, b, code, typ, room, f or None, cell_text(code, typ, room))
+        if not self.fits(u, p):
+            return None
+        return u, p, rows
+
+    def add(self, u, p, rows):
+        """Place an inserted chunk; returns what drop() needs to take it out again, ending with the hours placed."""
+        old = [(r, r["Hours_Remaining"]) for r in rows], list(self.failed)
+        self.give(u, p)
+        self.units.append(u)
+        self.by_section.setdefault(u.section, []).append(u)
+        for r in rows:
+            r["Hours_Remaining"] = round(max(0.0, r["Hours_Remaining"] - u.hours), 2)
+        self.failed[:] = [r for r in self.failed if r["Hours_Remaining"] > 1e-9]
+        return u, old, sum(h - r["Hours_Remaining"] for r, h in old[0])
+
+    def drop(self, added):
+        u, (hours, failed), _ = added
+        self.take(u)
+        self.units.remove(u)
+        self.by_section[u.section].remove(u)
+        for r, h in hours:
+            r["Hours_Remaining"] = h
+        self.failed[:] = failed
+
+    # Search
+
+    def snapshot(self):
+        return ({label: list(pl) for label, pl in self.lists.items()}, [(r, r["Hours_Remaining"]) for r in self.failed], list(self.failed),
+                [(u, u.p) for u in self.units], {sec: list(us) for sec, us in self.by_section.items()},
+                {k: dict(v) for k, v in self.fac.items()}, {d: dict(v) for d, v in self.rooms.items()}, dict(self.usage), dict(self.labs))
+
+    def restore(self, snap):
+        lists, hours, failed, units, by_section, self.fac, self.rooms, self.usage, self.labs = snap
+        for r, h in hours:
+            r["Hours_Remaining"] = h
+        self.failed[:] = failed
+        for u, p in units:
+            u.p = p
+        self.units = [u for u, _ in units]
+        self.by_section = by_section
+        for label, pl in lists.items():
+            self.lists[label][:] = pl
+            tt = self.grids[label]
+            for d in days:
+                tt.release(d, tt.busy[d])
+            for p in pl:
+                tt.put(p.day, self.ds.slot_keys[p.start:p.end], p.text)
+
+    def run(self, seconds, max_moves=None, t0=2.0, t1=0.05):
+        """Anneal for `seconds` of wall clock (or max_moves proposals) from temperature t0 down to t1; ends on the
+        best state seen. Returns the counts and the objective before and after."""
+        start = time.perf_counter()
+        score = best = first = self.total()
+        saved = None
+        moves = accepted = 0
+        while True:
+            frac = (moves / max_moves) if max_moves else (time.perf_counter() - start) / seconds if seconds > 0 else 1.0
+            if frac >= 1.0 or (max_moves and time.perf_counter() - start >= seconds):
+                break
+            moves += 1
+            temp = t0 * (t1 / t0) ** frac
+            move = self.propose()
+            if move is None:
+                continue
+            kind, arg = move
+            if kind == "insert":
+                new = self.insert(arg)
+                if new is None:
+                    continue
+                pairs = {(label, new[1].day) for label in new[0].halves}
+                do, undo = (lambda: self.add(*new)), self.drop
+            else:
+                if any(p is None for _, p in arg):
+                    continue
+                pairs = self.touched(arg)
+                do, undo = (lambda: self.apply(arg)), self.undo
+            before = sum(self.day_cost(label, d) for label, d in pairs)
+            old = do()
+            if old is None:
+                continue
+            delta = sum(self.day_cost(label, d) for label, d in pairs) - before
+            if kind == "insert":
+                delta -= WEIGHTS["unplaced_hours"] * old[2]
+            if delta > 0 and self.rng.random() >= math.exp(-delta / temp):
+                undo(old)
+                continue
+            if delta > 0 and saved is None and score <= best + 1e-9:
+                # Leaving the best state seen: keep a copy to come back to.
+                undo(old)
+                saved = self.snapshot()
+                do()
+            accepted += 1
+            score += delta
+            if score < best - 1e-9:
+                best, saved = score, None
+        if score > best + 1e-9 and saved is not None:
+            self.restore(saved)
+            score = best
+        return {"moves": moves, "accepted": accepted, "before": round(first, 2), "after": round(score, 2)}
+
+
+def improve(ds, schedule, grids, secs, seconds, seed=0, pin_full=False, max_moves=None):
+    """Improve a finished schedule in place (its placements, failed rows and the section grids)."""
+    return Improver(ds, schedule, grids, secs, pin_full, random.Random(f"{seed}/improve")).run(seconds, max_moves)
@@ -0,0 +1,39 @@
+import json
+import os
+
+DEFAULT_MANIFEST = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "sections.json")
+
+
+def load_manifest(path=DEFAULT_MANIFEST):
+    """Read a section manifest: a list of sheets, each listing the sections rendered on it in order.
+
+    Every section needs a label and a course CSV; legend defaults to the label, sync (the elective
+    sync group shared by sections of one semester) to the label, and seed_offset to twice the
+    section's position so each half gets its own seed.
+    """
+    with open(path) as f:
+        data = json.load(f)
+    sheets = []
+    labels = set()
+    n = 0
+    for sh in data.get("sheets", []):
+        if "title" not in sh:
+            raise ValueError(f"{path}: sheet without a title")
+        sections = []
+        for sec in sh.get("sections", []):
+            for k in ("label", "courses"):
+                if k not in sec:
+                    raise ValueError(f"{path}: section on '{sh['title']}' has no '{k}'")
+            if sec["label"] in labels:
+                raise ValueError(f"{path}: duplicate section label '{sec['label']}'")
+            labels.add(sec["label"])
+            d = {"legend": sec["label"], "room_prefix": None, "seed_offset": 2 * n, "sync": sec["label"], "hide_c004": False}
+            d.update(sec)
+            sections.append(d)
+            n += 1
+        sheets.append({"title": sh["title"], "sections": sections})
+    return sheets
+
+
+def course_files(sheets):
+    return [sec["courses"] for sh in sheets for sec in sh["sections"]]
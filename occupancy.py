@@ -0,0 +1,213 @@
+import re
+from collections import namedtuple
+
+# One contiguous run of slots [start, end) given to a course on a day; text is what the grid cell shows.
+Placement = namedtuple("Placement", "day start end code type room faculty text")
+
+
+class SectionGrid:
+    """Occupancy of one section: an int bitmask per day over slot indices plus the label shown in each slot.
+
+    Free runs of slots are kept per day, with and without the excluded slots, and are split in
+    place on every put() so block queries never rescan the day.
+    """
+
+    def __init__(self, days, slot_keys, excluded=(), slot_dur=None):
+        self.days = list(days)
+        self.slot_keys = list(slot_keys)
+        self.index = {k: i for i, k in enumerate(self.slot_keys)}
+        self.full = (1 << len(self.slot_keys)) - 1
+        self.excluded_mask = self.mask_of(k for k in excluded if k in self.index)
+        self.busy = {d: 0 for d in self.days}
+        self.labels = {d: [""] * len(self.slot_keys) for d in self.days}
+        self.placements = []
+        self.cum = [0.0]
+        for k in self.slot_keys:
+            self.cum.append(self.cum[-1] + (slot_dur[k] if slot_dur else 1.0))
+        self.free_runs = {
+            False: {d: self._runs(self.full & ~self.excluded_mask) for d in self.days},
+            True: {d: self._runs(self.full) for d in self.days},
+        }
+
+    def mask_of(self, keys):
+        m = 0
+        for k in keys:
+            m |= 1 << self.index[k]
+        return m
+
+    def is_free(self, day, mask):
+        return not (self.busy[day] & mask)
+
+    def layered(self, mask, layers=0b11):
+        # Room and faculty masks hold one layer of slot bits per semester half (bit 0 of layers is the
+        # first half), so a full-semester course pinned across the halves blocks both and any other only its own.
+        out = 0
+        if layers & 0b01:
+            out |= mask
+        if layers & 0b10:
+            out |= mask << len(self.slot_keys)
+        return out
+
+    def get(self, day, key):
+        return self.labels[day][self.index[key]]
+
+    def put(self, day, keys, label):
+        row = self.labels[day]
+        m = 0
+        for k in keys:
+            i = self.index[k]
+            row[i] = label
+            m |= 1 << i
+        self.busy[day] |= m
+        for ex in (False, True):
+            self.free_runs[ex][day] = self._split(self.free_runs[ex][day], m)
+
+    def release(self, day, mask):
+        # Inverse of put(): frees the slots in mask and rebuilds the day's free runs.
+        self.busy[day] &= ~mask
+        row = self.labels[day]
+        for i in range(len(row)):
+            if mask >> i & 1:
+                row[i] = ""
+        free = self.full & ~self.busy[day]
+        self.free_runs[False][day] = self._runs(free & ~self.excluded_mask)
+        self.free_runs[True][day] = self._runs(free)
+
+    def record(self, day, keys, text, code, typ, room=None, faculty=None):
+        idx = sorted(self.index[k] for k in keys)
+        start = idx[0]
+        for prev, i in zip(idx, idx[1:] + [None]):
+            if i != prev + 1:
+                self.placements.append(Placement(day, start, prev + 1, code, typ, room, faculty, text))
+                start = i
+
+    def row(self, day):
+        return list(self.labels[day])
+
+    def free_mask(self, day, ex=False):
+        m = ~self.busy[day] & self.full
+        if not ex:
+            m &= ~self.excluded_mask
+        return m
+
+    def keys_of(self, mask):
+        out = []
+        while mask:
+            low = mask & -mask
+            out.append(self.slot_keys[low.bit_length() - 1])
+            mask ^= low
+        return out
+
+    def blocks(self, day, ex=False):
+        return [self.slot_keys[a:b] for a, b in self.free_runs[ex][day]]
+
+    def blocks_at_least(self, day, h, ex=False):
+        cum = self.cum
+        for a, b in self.free_runs[ex][day]:
+            if cum[b] - cum[a] + 1e-9 >= h:
+                yield self.slot_keys[a:b]
+
+    @staticmethod
+    def _runs(mask):
+        # (start, end) index pairs of the runs of set bits, lowest first.
+        out = []
+        while mask:
+            low = mask & -mask
+            t = mask | (low - 1)
+            run = ((t + 1) & ~t) - low
+            out.append((low.bit_length() - 1, run.bit_length()))
+            mask &= ~run
+        return out
+
+    def _split(self, runs, mask):
+        out = []
+        for a, b in runs:
+            span = (1 << b) - (1 << a)
+            if span & mask:
+                out.extend(self._runs(span & ~mask))
+            else:
+                out.append((a, b))
+        return out
+
+
+class RoomCatalog:
+    """Room ids from rooms.csv with memoized candidate lists.
+
+    Room occupancy itself stays in the shared room_busy map (day -> room -> slot bitmask) so it can be
+    passed between generate() calls; first_free() scans it in rotation order.
+    """
+
+    def __init__(self, room_ids):
+        ids = [str(r).strip() for r in room_ids]
+        self.classrooms = [r for r in ids if r.startswith('C')]
+        self.labs = [r for r in ids if r.startswith('L')]
+        self._candidates = {}
+
+    def candidates(self, lab=False, prefix=None, lab_prefix=None):
+        key = (lab, prefix, lab_prefix)
+        if key not in self._candidates:
+            pool = self.labs if lab else self.classrooms
+            cand = pool
+            if prefix:
+                cand = [r for r in pool if r.upper().startswith(prefix.upper())] or pool
+            if lab and lab_prefix:
+                cand = [r for r in cand if r.upper().startswith(lab_prefix.upper())] or cand
+            self._candidates[key] = list(cand)
+        return self._candidates[key]
+
+    @staticmethod
+    def first_free(candidates, day_busy, mask, rr_state_key=None, rr_state=None):
+        return RoomCatalog.first_free_at(candidates, day_busy, mask, rr_state_key, rr_state)[0]
+
+    @staticmethod
+    def first_free_at(candidates, day_busy, mask, rr_state_key=None, rr_state=None):
+        # (room, candidates probed busy before it); (None, len(candidates)) when none is free.
+        n = len(candidates)
+        rotate = rr_state is not None and rr_state_key is not None
+        start = rr_state.get(rr_state_key, 0) % n if rotate and n else 0
+        for k in range(n):
+            cand = candidates[(start + k) % n]
+            if not (day_busy.get(cand, 0) & mask):
+                if rotate:
+                    rr_state[rr_state_key] = (rr_state.get(rr_state_key, 0) + 1) % n
+                return cand, k
+        return None, n
+
+
+def split_faculty(fac):
+    if fac is None:
+        return []
+    fac = str(fac)
+    return [x.strip() for x in re.split(r"[\\/;,&]| and ", fac) if x.strip()]
+
+
+def faculty_key(name):
+    # "Dr Sandesh P" and "Dr. Sandesh P" are the same person.
+    return " ".join(str(name).replace(".", " ").split()).casefold()
+
+
+class FacultyLedger:
+    """Institute-wide faculty occupancy: normalized faculty name -> day -> slot bitmask.
+
+    A Faculty cell naming several people ("Dr. A/Dr. B") checks and reserves every one of them.
+    """
+
+    def __init__(self):
+        self.busy = {}
+        self._keys = {}
+
+    def keys(self, fac):
+        if fac not in self._keys:
+            self._keys[fac] = [faculty_key(x) for x in split_faculty(fac)]
+        return self._keys[fac]
+
+    def is_free(self, fac, day, mask):
+        for k in self.keys(fac):
+            if self.busy.get(k, {}).get(day, 0) & mask:
+                return False
+        return True
+
+    def reserve(self, fac, day, mask):
+        for k in self.keys(fac):
+            days = self.busy.setdefault(k, {})
+            days[day] = days.get(day, 0) | mask
@@ -0,0 +1,161 @@
+import numpy as np
+
+from occupancy import faculty_key, split_faculty
+
+# Rows of the Report sheet's quality block: metric key and label.
+METRICS = [
+    ("unplaced_hours", "Unplaced hours"),
+    ("idle_hours", "Idle hours between classes"),
+    ("excluded_hours", "Hours in excluded slots"),
+    ("lab_crowding", "Labs beyond one a day"),
+    ("lab_days", "Days with labs per half"),
+    ("faculty_peak", "Busiest faculty day (hours)"),
+    ("faculty_mean_peak", "Mean faculty daily peak (hours)"),
+    ("room_utilization", "Room utilization (%)"),
+]
+
+# Weights of objective(): the section terms improve.py anneals on, in the same proportions.
+WEIGHTS = {"unplaced_hours": 100.0, "excluded_hours": 4.0, "lab_crowding": 2.0, "idle_hours": 1.0}
+
+
+def section_terms(occ, labs, excl, dur):
+    """Idle hours, excluded-slot hours and labs beyond the first, per section-day.
+
+    occ is a bool array (..., days, slots) and labs the lab counts (..., days); any leading axes (halves,
+    candidates) are kept, so one call scores a whole batch.
+    """
+    left = np.logical_or.accumulate(occ, axis=-1)
+    right = np.logical_or.accumulate(occ[..., ::-1], axis=-1)[..., ::-1]
+    idle = left & right & ~occ & ~excl
+    return idle @ dur, (occ & excl) @ dur, np.maximum(labs - 1, 0)
+
+
+class Scorer:
+    """Quality of a schedule held as NumPy arrays: halves x days x slots for the sections, and faculty x half x
+    days x slots and rooms x half x days x slots for the people and rooms they share. The last two count the
+    placements holding each slot, so moving one of several classes that share a slot keeps it held.
+
+    A placement counts in the half it is shown in, so a combined class or a pinned full-semester course seen by
+    several halves loads its faculty member and room once per half.
+    """
+
+    def __init__(self, schedule, slot_dur, excluded=(), rooms=()):
+        keys, days = schedule.slot_keys, schedule.days
+        self.dur = np.array([slot_dur[k] for k in keys], dtype=float)
+        self.excl = np.array([k in excluded for k in keys])
+        self.day_index = {d: i for i, d in enumerate(days)}
+        halves = [half for _, half in schedule.halves()]
+        self.index = {half["label"]: i for i, half in enumerate(halves)}
+        self.layer = {half["label"]: 1 if half["half"] == "2" else 0 for half in halves}
+        shape = (len(days), len(keys))
+        self.occ = np.zeros((len(halves),) + shape, dtype=bool)
+        self.labs = np.zeros((len(halves), len(days)), dtype=int)
+        fac, room = {}, {r: None for r in rooms}
+        spans_f, spans_r = [], []
+        for h, half in enumerate(halves):
+            layer = self.layer[half["label"]]
+            for p in half["placements"]:
+                d = self.day_index[p.day]
+                self.occ[h, d, p.start:p.end] = True
+                if p.type == "P":
+                    self.labs[h, d] += 1
+                for k in {faculty_key(x) for x in split_faculty(p.faculty or "")}:
+                    spans_f.append((fac.setdefault(k, len(fac)), layer, d, p.start, p.end))
+                if p.room:
+                    room.setdefault(p.room, None)
+                    spans_r.append((p.room, layer, d, p.start, p.end))
+        self.fac_index = fac
+        self.faculty = np.zeros((len(fac), 2) + shape, dtype=np.int16)
+        for f, layer, d, a, b in spans_f:
+            self.faculty[f, layer, d, a:b] += 1
+        self.room_index = {r: i for i, r in enumerate(room)}
+        self.rooms = np.zeros((len(room), 2) + shape, dtype=np.int16)
+        for r, layer, d, a, b in spans_r:
+            self.rooms[self.room_index[r], layer, d, a:b] += 1
+        self.unplaced = float(sum(r.get("Hours_Remaining", 0) for r in schedule.failed))
+        self.idle, self.excluded, self.crowding = section_terms(self.occ, self.labs, self.excl, self.dur)
+
+    @classmethod
+    def of(cls, ds, schedule):
+        from timetable import excluded
+        return cls(schedule, ds.slot_dur, excluded, ds.room_catalog.classrooms + ds.room_catalog.labs)
+
+    def metrics(self):
+        load = (self.faculty > 0) @ self.dur
+        peak = load.max(axis=(1, 2)) if len(load) else np.zeros(1)
+        open_hours = self.dur[~self.excl].sum() * 2 * self.occ.shape[1]
+        used = ((self.rooms > 0) & ~self.excl) @ self.dur
+        return {
+            "unplaced_hours": round(self.unplaced, 2),
+            "idle_hours": round(float(self.idle.sum()), 2),
+            "excluded_hours": round(float(self.excluded.sum()), 2),
+            "lab_crowding": int(self.crowding.sum()),
+            "lab_days": round(float((self.labs > 0).sum(axis=1).mean()), 2) if len(self.labs) else 0.0,
+            "faculty_peak": round(float(peak.max()), 2),
+            "faculty_mean_peak": round(float(peak.mean()), 2),
+            "room_utilization": round(float(100 * used.sum(axis=(1, 2)).mean() / open_hours), 1) if len(used) and open_hours else 0.0,
+        }
+
+    def objective(self):
+        return (WEIGHTS["unplaced_hours"] * self.unplaced + WEIGHTS["idle_hours"] * self.idle.sum()
+                + WEIGHTS["excluded_hours"] * self.excluded.sum() + WEIGHTS["lab_crowding"] * self.crowding.sum())
+
+    def score_batch(self, occ, labs):
+        """objective() of many candidates at once, from occ (n, halves, days, slots) and labs (n, halves, days);
+        unplaced hours are taken as this schedule's."""
+        idle, excl, crowding = section_terms(occ, labs, self.excl, self.dur)
+        return (WEIGHTS["unplaced_hours"] * self.unplaced + WEIGHTS["idle_hours"] * idle.sum(axis=(1, 2))
+                + WEIGHTS["excluded_hours"] * excl.sum(axis=(1, 2)) + WEIGHTS["lab_crowding"] * crowding.sum(axis=(1, 2)))
+
+    def rows_of(self, changes):
+        # Copies of the section-day rows the changes touch, with the changes applied.
+        cells = sorted({(self.index[label], self.day_index[p.day]) for label, p, _ in changes})
+        at = {c: i for i, c in enumerate(cells)}
+        h, d = (np.array(x) for x in zip(*cells))
+        occ, labs = self.occ[h, d].copy(), self.labs[h, d].copy()
+        for label, p, n in changes:
+            i = at[(self.index[label], self.day_index[p.day])]
+            occ[i, p.start:p.end] = n > 0
+            if p.type == "P":
+                labs[i] += n
+        return h, d, occ, labs
+
+    def delta(self, changes, unplaced=0.0):
+        """Change in objective() if the changes were made: (half label, placement, +1 to add / -1 to remove), in
+        order, so a move lists its removals first.
+
+        Only the section-days the changes touch are rescored; unplaced is the change in unplaced hours.
+        """
+        if not changes:
+            return WEIGHTS["unplaced_hours"] * unplaced
+        h, d, occ, labs = self.rows_of(changes)
+        idle, excl, crowding = section_terms(occ, labs, self.excl, self.dur)
+        return float(WEIGHTS["unplaced_hours"] * unplaced
+                     + WEIGHTS["idle_hours"] * (idle.sum() - self.idle[h, d].sum())
+                     + WEIGHTS["excluded_hours"] * (excl.sum() - self.excluded[h, d].sum())
+                     + WEIGHTS["lab_crowding"] * (crowding.sum() - self.crowding[h, d].sum()))
+
+    def apply(self, changes, unplaced=0.0):
+        """Make the changes delta() priced; faculty and room arrays follow the placements."""
+        self.unplaced += unplaced
+        if not changes:
+            return
+        h, d, occ, labs = self.rows_of(changes)
+        self.occ[h, d], self.labs[h, d] = occ, labs
+        self.idle[h, d], self.excluded[h, d], self.crowding[h, d] = section_terms(occ, labs, self.excl, self.dur)
+        for label, p, n in changes:
+            layer, di = self.layer[label], self.day_index[p.day]
+            for k in {faculty_key(x) for x in split_faculty(p.faculty or "")}:
+                if k not in self.fac_index:
+                    self.fac_index[k] = len(self.fac_index)
+                    self.faculty = np.concatenate([self.faculty, np.zeros((1,) + self.faculty.shape[1:], dtype=np.int16)])
+                self.faculty[self.fac_index[k], layer, di, p.start:p.end] += n
+            if p.room:
+                if p.room not in self.room_index:
+                    self.room_index[p.room] = len(self.room_index)
+                    self.rooms = np.concatenate([self.rooms, np.zeros((1,) + self.rooms.shape[1:], dtype=np.int16)])
+                self.rooms[self.room_index[p.room], layer, di, p.start:p.end] += n
+
+    def report_rows(self):
+        m = self.metrics()
+        return [["Quality"], ["Metric", "Value"]] + [[label, m[key]] for key, label in METRICS]
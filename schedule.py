@@ -0,0 +1,65 @@
+import json
+
+from occupancy import Placement
+
+LEGEND_HEADERS = ["Course Code", "Course Title", "L-T-P-S-C", "Faculty", "Semester Half", "Elective", "Elective Basket", "Elective Room"]
+
+
+class Schedule:
+    """What a timetable run decided, independent of the workbook it is rendered to.
+
+    sheets follows the manifest: each sheet has a title and sections, each section its label, legend title,
+    course CSV, legend rows (LEGEND_HEADERS) and halves. A half is what generate() returned for it: label,
+    half ("1"/"2"), codes of the courses it placed and a list of Placements.
+    """
+
+    def __init__(self, seed, days, slot_keys):
+        self.seed = seed
+        self.days = list(days)
+        self.slot_keys = list(slot_keys)
+        self.sheets = []
+        self.failed = []
+        self.elective_rooms = {}
+
+    def halves(self):
+        for sheet in self.sheets:
+            for sec in sheet["sections"]:
+                for half in sec["halves"]:
+                    yield sec, half
+
+    def to_dict(self):
+        return {
+            "seed": self.seed,
+            "days": self.days,
+            "slots": self.slot_keys,
+            "sheets": [dict(sh, sections=[dict(sec, halves=[dict(h, placements=[p._asdict() for p in h["placements"]]) for h in sec["halves"]])
+                                          for sec in sh["sections"]]) for sh in self.sheets],
+            "failed": self.failed,
+            "elective_rooms": self.elective_rooms,
+        }
+
+    def save_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+
+
+def grid_row(placements, day, width):
+    out = [""] * width
+    for p in placements:
+        if p.day == day:
+            out[p.start:p.end] = [p.text] * (p.end - p.start)
+    return out
+
+
+def load_schedule(path):
+    with open(path) as f:
+        d = json.load(f)
+    sc = Schedule(d["seed"], d["days"], d["slots"])
+    for sh in d["sheets"]:
+        for sec in sh["sections"]:
+            for h in sec["halves"]:
+                h["placements"] = [Placement(**p) for p in h["placements"]]
+    sc.sheets = d["sheets"]
+    sc.failed = d["failed"]
+    sc.elective_rooms = d["elective_rooms"]
+    return sc
@@ -0,0 +1,163 @@
+import argparse
+import csv
+import json
+import os
+import random
+
+# The real data/ as of 2025: the same slot grid, and course shapes weighted roughly as they occur there.
+TIME_SLOTS = [
+    ("07:30", "09:00"), ("09:00", "10:00"), ("10:00", "10:30"), ("10:30", "10:45"), ("10:45", "11:00"),
+    ("11:00", "12:00"), ("12:00", "12:15"), ("12:15", "12:30"), ("12:30", "12:45"), ("12:45", "13:15"),
+    ("13:15", "14:00"), ("14:00", "14:30"), ("14:30", "15:30"), ("15:30", "15:40"), ("15:40", "16:00"),
+    ("16:00", "16:30"), ("16:30", "17:10"), ("17:10", "17:30"), ("17:30", "18:30"),
+]
+LTP_MIX = {"3-1-0-0-2": 57, "3-1-0-0-4": 38, "3-0-2-0-4": 23, "3-0-0-0-2": 10, "3-0-2-0-2": 6, "3-1-2-0-5": 2, "2-1-0-0-3": 1}
+SEMESTERS = ["1", "3", "5", "7"]
+PREFIXES = ["C1", "C2", "C3", "C4"]
+COURSE_COLUMNS = ["Course_Code", "Course_Title", "L-T-P-S-C", "Faculty", "Is_Combined", "Semester_Half", "Elective", "Students", "ElectiveBasket"]
+
+
+def letters(i):
+    # 0 -> A, 25 -> Z, 26 -> AA: short alphabetic tags so course codes stay within timetable.valid()'s pattern.
+    out = ""
+    i += 1
+    while i:
+        i, r = divmod(i - 1, 26)
+        out = chr(65 + r) + out
+    return out
+
+
+def write_csv(path, header, rows):
+    with open(path, "w", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(header)
+        w.writerows(rows)
+
+
+def make_dataset(out_dir, sections=12, courses_per_section=8, ltp_mix=None, baskets=2, basket_size=3,
+                 combined_ratio=0.25, half_ratio=0.45, classrooms_per_prefix=6, labs_per_prefix=3, halls=3,
+                 faculty_load=3, students=660, seed=0, semester_faculty=False):
+    """Write a data/-compatible institute into out_dir and return a summary dict.
+
+    Sections are spread round-robin over semesters 1/3/5/7 and room prefixes C1..C4. Each section has
+    courses_per_section core courses, of which combined_ratio are combined lectures shared by every section
+    of its semester (held in C004), and each semester has `baskets` elective baskets of basket_size courses
+    offered to all of its sections. Faculty are sized so nobody teaches more than faculty_load courses; with
+    semester_faculty they only teach within one semester, so the semesters share nothing and solve independently.
+    """
+    rng = random.Random(seed)
+    ltp_mix = ltp_mix or LTP_MIX
+    shapes, weights = list(ltp_mix), list(ltp_mix.values())
+    os.makedirs(out_dir, exist_ok=True)
+
+    with open(os.path.join(out_dir, "time_slots.json"), "w") as f:
+        json.dump({"time_slots": [{"start": a, "end": b} for a, b in TIME_SLOTS]}, f, indent=2)
+
+    rooms = [("C004", 240, "240-Seater Hall", "Projector")]
+    rooms += [(f"C00{i}", 120, "120-Seater Hall", "Projector") for i in range(2, 2 + min(halls - 1, 7))]
+    for p in PREFIXES:
+        rooms += [(f"{p}{i:02d}", 48 if i % 2 else 96, "Classroom", "Whiteboard") for i in range(1, classrooms_per_prefix + 1)]
+        rooms += [(f"L{p[1:]}{i:02d}", 48, "Lab", "Computers") for i in range(1, labs_per_prefix + 1)]
+    write_csv(os.path.join(out_dir, "rooms.csv"), ["Room_ID", "Capacity", "Type", "Facilities"], rooms)
+
+    labels = [f"SEM{SEMESTERS[i % len(SEMESTERS)]}-{letters(i // len(SEMESTERS))}" for i in range(sections)]
+    sem_of = {lab: lab[3:lab.index("-")] for lab in labels}
+    size = {lab: students // sections + (1 if i < students % sections else 0) for i, lab in enumerate(labels)}
+
+    n_combined = round(courses_per_section * combined_ratio)
+    combined = {}
+    electives = {}
+    unit_sem = {}
+    for sem in SEMESTERS:
+        members = [lab for lab in labels if sem_of[lab] == sem]
+        if not members:
+            continue
+        combined[sem] = [(f"M{sem}{k:02d}", rng.choices(shapes, weights)[0]) for k in range(n_combined)]
+        electives[sem] = [[(f"E{letters(b)}{sem}{k:02d}", rng.choices(shapes, weights)[0]) for k in range(basket_size)]
+                          for b in range(baskets)]
+
+    courses = {}
+    for i, lab in enumerate(labels):
+        sem = sem_of[lab]
+        tag = letters(i)
+        rows = [[code, f"Combined {code}", sh, None, 1, "0", 0, sum(size[x] for x in labels if sem_of[x] == sem), 0]
+                for code, sh in combined[sem]]
+        for k in range(courses_per_section - n_combined):
+            r = rng.random()
+            half = "0" if r >= half_ratio else ("1" if r < half_ratio / 2 else "2")
+            code = f"C{tag}{sem}{k:02d}"
+            rows.append([code, f"Course {code}", rng.choices(shapes, weights)[0], None, 0, half, 0, size[lab], 0])
+        for b, basket in enumerate(electives[sem], start=1):
+            rows += [[code, f"Elective {code}", sh, None, 0, "0", 1, 0, b] for code, sh in basket]
+        unit_sem.update((r[0], sem) for r in rows)
+        courses[lab] = rows
+
+    # Shared courses (combined lectures, electives) get one instructor however many sections list them.
+    units = sorted({r[0] for rows in courses.values() for r in rows})
+    n_fac = max(1, -(-len(units) // max(1, faculty_load)))
+    faculty = [f"Dr. Synth {letters(i)}" for i in range(n_fac)]
+    order = units[:]
+    rng.shuffle(order)
+    teacher = {code: faculty[j % n_fac] for j, code in enumerate(order)}
+    if semester_faculty:
+        # Each semester gets its own block of faculty instead.
+        faculty, teacher = [], {}
+        for sem in SEMESTERS:
+            mine = [u for u in order if unit_sem[u] == sem]
+            n = -(-len(mine) // max(1, faculty_load))
+            names = [f"Dr. Synth {letters(len(faculty) + i)}" for i in range(n)]
+            teacher.update((code, names[j % n]) for j, code in enumerate(mine))
+            faculty += names
+        n_fac = len(faculty)
+    write_csv(os.path.join(out_dir, "faculty.csv"), ["Faculty_ID", "Name"], [(f"F{i + 1:03d}", n) for i, n in enumerate(faculty)])
+
+    student_rows = []
+    takers = {}
+    for lab in labels:
+        core = [r[0] for r in courses[lab] if r[6] == 0]
+        for j in range(size[lab]):
+            picks = [rng.choice(basket)[0] for basket in electives[sem_of[lab]]]
+            for code in picks:
+                takers[code] = takers.get(code, 0) + 1
+            student_rows.append((f"S{labels.index(lab):03d}{j:04d}", lab, ";".join(core + picks)))
+    write_csv(os.path.join(out_dir, "students.csv"), ["Student_ID", "Group", "Courses"], student_rows)
+
+    for lab, rows in courses.items():
+        for r in rows:
+            r[3] = teacher[r[0]]
+            if r[6] == 1:
+                r[7] = takers.get(r[0], 0)
+        write_csv(os.path.join(out_dir, f"courses{lab}.csv"), COURSE_COLUMNS, rows)
+
+    manifest = {"sheets": [{"title": f"{lab} Timetable", "sections": [
+        {"label": lab, "courses": f"courses{lab}.csv", "room_prefix": PREFIXES[i % len(PREFIXES)], "sync": f"sem{sem_of[lab]}"}]}
+        for i, lab in enumerate(labels)]}
+    with open(os.path.join(out_dir, "sections.json"), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+    return {"sections": sections, "courses": sum(len(r) for r in courses.values()), "rooms": len(rooms),
+            "faculty": n_fac, "students": len(student_rows)}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic data/ directory for scale testing")
+    parser.add_argument("out_dir")
+    parser.add_argument("--sections", type=int, default=12)
+    parser.add_argument("--courses", type=int, default=8, help="core courses per section")
+    parser.add_argument("--ltp-mix", default=None, help='JSON object of L-T-P-S-C -> weight, e.g. \'{"3-1-0-0-4": 3, "3-0-2-0-4": 1}\'')
+    parser.add_argument("--baskets", type=int, default=2, help="elective baskets per semester")
+    parser.add_argument("--basket-size", type=int, default=3)
+    parser.add_argument("--combined-ratio", type=float, default=0.25)
+    parser.add_argument("--half-ratio", type=float, default=0.45, help="share of core courses that run for one semester half")
+    parser.add_argument("--classrooms", type=int, default=6, help="classrooms per room prefix (C1..C4)")
+    parser.add_argument("--labs", type=int, default=3, help="labs per room prefix (L1..L4)")
+    parser.add_argument("--halls", type=int, default=3)
+    parser.add_argument("--faculty-load", type=int, default=3, help="courses per faculty member")
+    parser.add_argument("--students", type=int, default=660)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--semester-faculty", action="store_true", help="faculty teach within one semester, so semesters are independent")
+    args = parser.parse_args()
+    summary = make_dataset(args.out_dir, args.sections, args.courses, json.loads(args.ltp_mix) if args.ltp_mix else None,
+                           args.baskets, args.basket_size, args.combined_ratio, args.half_ratio, args.classrooms,
+                           args.labs, args.halls, args.faculty_load, args.students, args.seed, args.semester_faculty)
+    print(f"Wrote {args.out_dir}: " + ", ".join(f"{v} {k}" for k, v in summary.items()))
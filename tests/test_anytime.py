@@ -0,0 +1,67 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+
+import anytime
+import quality
+import timetable
+from schedule import load_schedule
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def hours(schedule):
+    return sum(r["Hours_Remaining"] for r in schedule.failed)
+
+
+class TestAnytime(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, "run.checkpoint.json")
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_keeps_the_best_and_checkpoints_it(self):
+        best, state = anytime.solve(self.ds, 2, 1, self.path)
+        self.assertGreater(state["tried"], 1)
+        self.assertEqual(state["next_seed"], 1 + state["tried"])
+        scores = [quality.Scorer.of(self.ds, timetable.run(s, render=False, ds=self.ds)[3]).objective() for s in range(1, state["next_seed"])]
+        self.assertEqual(state["score"], round(min(scores), 2))
+        self.assertEqual(state["best_seed"], 1 + scores.index(min(scores)))
+        saved, saved_state = anytime.read_checkpoint(self.path)
+        self.assertEqual(saved_state, json.loads(json.dumps(state)))
+        self.assertEqual(json.dumps(load_schedule(self.path).to_dict()), json.dumps(json.loads(json.dumps(best.to_dict()))))
+        self.assertFalse(os.path.exists(self.path + ".tmp"))
+
+    def test_seeds_do_not_repeat_with_the_day_rotation(self):
+        # Seeds len(days) apart used to start every half on the same day and give the same schedule.
+        a, b = (json.dumps(timetable.run(s, render=False, ds=self.ds)[3].sheets, default=str) for s in (1, 1 + len(timetable.days)))
+        self.assertNotEqual(a, b)
+
+    def test_resume_continues_from_the_checkpoint(self):
+        _, first = anytime.solve(self.ds, 0, 5, self.path, search="backtrack")
+        self.assertEqual((first["tried"], first["next_seed"]), (1, 6))
+        _, state = anytime.solve(self.ds, 0, 5, self.path, resume=True, search="backtrack")
+        self.assertEqual((state["tried"], state["next_seed"]), (2, 7))
+        self.assertLessEqual(state["score"], first["score"])
+        with self.assertRaises(ValueError):
+            anytime.solve(self.ds, 0, 5, self.path, resume=True)
+
+    def test_deadline_still_gives_a_complete_schedule(self):
+        _, _, grids, cut = timetable.run(1, render=False, ds=self.ds, deadline=time.time() - 1)
+        _, _, _, full = timetable.run(1, render=False, ds=self.ds)
+        self.assertEqual([h["label"] for _, h in cut.halves()], [h["label"] for _, h in full.halves()])
+        self.assertEqual(len(grids), 24)
+        self.assertGreaterEqual(hours(cut), hours(full))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import unittest
+
+import backtrack
+import timetable
+from counters import Counters
+from occupancy import FacultyLedger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def hours(schedule):
+    return sum(r["Hours_Remaining"] for r in schedule.failed)
+
+
+class TestBacktracker(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+        cls.sec = timetable.load_manifest(cls.ds.manifest_path)[0]["sections"][0]
+
+    def test_start_positions_hold_the_hours(self):
+        tt = self.ds.new_grid()
+        for dur in (1.0, 1.5, 2.0):
+            for a, b, m, ex in backtrack.start_positions(tt, self.ds.slot_dur, dur):
+                keys = tt.slot_keys[a:b]
+                self.assertEqual(m, tt.mask_of(keys))
+                self.assertGreaterEqual(sum(self.ds.slot_dur[k] for k in keys) + 1e-9, dur)
+                self.assertEqual(ex, bool(m & tt.excluded_mask))
+
+    def test_undo_restores_every_ledger(self):
+        first, _ = timetable.split(self.ds.courses(self.sec["courses"]))
+        regular = [c for c in first if timetable.s(c.get("Elective", "")) != "1" and timetable.s(c.get("Is_Combined", "0")) != "1"]
+        tt, busy, rm, labsd = self.ds.new_grid(), FacultyLedger(), {}, set()
+        room_busy = {d: {} for d in timetable.days}
+        usage = {d: {} for d in timetable.days}
+        bt = backtrack.Backtracker(self.ds, tt, busy, rm, room_busy, labsd, usage, room_prefix=self.sec["room_prefix"], half="1")
+        self.assertEqual(bt.place(regular), [])
+        self.assertTrue(tt.placements)
+        while bt.stack:
+            bt.pop()
+        fresh = self.ds.new_grid()
+        self.assertEqual((tt.busy, tt.labels, tt.free_runs, tt.placements), (fresh.busy, fresh.labels, fresh.free_runs, []))
+        self.assertEqual([m for days in busy.busy.values() for m in days.values() if m], [])
+        self.assertEqual([m for rooms in room_busy.values() for m in rooms.values() if m], [])
+        self.assertEqual((rm, labsd, bt.rr_state), ({}, set(), {}))
+        self.assertEqual([n for d in usage.values() for u in d.values() for n in u.values() if n], [])
+
+
+class TestSearch(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+
+    def test_places_at_least_what_greedy_places(self):
+        for seed in (6, 8):
+            _, _, _, greedy = timetable.run(seed, render=False, ds=self.ds)
+            counters = Counters()
+            _, _, _, found = timetable.run(seed, render=False, ds=self.ds, search="backtrack", counters=counters)
+            self.assertLess(hours(found), hours(greedy))
+            calls = counters.to_dict()
+            self.assertTrue(any(sec["calls"].get("backtrack_nodes") for sec in calls["sections"].values()))
+            for _, half in found.halves():
+                taken = [(p.day, i) for p in half["placements"] for i in range(p.start, p.end)]
+                self.assertEqual(len(taken), len(set(taken)))
+
+    def test_pinned_halves_share_full_semester_slots(self):
+        _, failed, _, schedule = timetable.run(1, render=False, ds=self.ds, search="backtrack", pin_full=True)
+        self.assertEqual(failed, [])
+        sec = schedule.sheets[0]["sections"][0]
+        full = {timetable.s(c.get("Course_Code")) for c in self.ds.courses(sec["courses"]) if timetable.s(c.get("Semester_Half")) == "0"}
+        first, second = ([(p.day, p.start, p.end, p.code) for p in h["placements"] if p.code in full] for h in sec["halves"])
+        self.assertTrue(first)
+        self.assertEqual(sorted(first), sorted(second))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,25 @@
+import tempfile
+import unittest
+
+import bench
+from synth import make_dataset
+
+
+class TestBench(unittest.TestCase):
+
+    def test_measure(self):
+        with tempfile.TemporaryDirectory() as d:
+            make_dataset(d, sections=4, students=80)
+            row = bench.measure("timetable.generate_section", d, repeat=2)
+        self.assertEqual(row["items"], 4)
+        self.assertEqual(len(row["wall_s"]), 2)
+        self.assertLessEqual(row["wall_min_s"], row["wall_median_s"])
+        for k in ("alloc_peak_mb", "alloc_retained_mb", "peak_rss_mb"):
+            self.assertGreaterEqual(row[k], 0)
+
+    def test_cases_cover_the_generators(self):
+        self.assertEqual(sorted({c.split(".")[0] for c in bench.CASES}), ["exam", "faculty", "timetable"])
+
+
+if __name__ == "__main__":
+    unittest.main()
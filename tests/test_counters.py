@@ -0,0 +1,53 @@
+import os
+import unittest
+
+import timetable
+from counters import Counters
+from occupancy import FacultyLedger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestCounters(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+
+    def test_section_counts(self):
+        first, _ = timetable.split(self.ds.courses("coursesCSE-V.csv"))
+        counters = Counters()
+        timetable.generate(self.ds, first, None, "CSE-V First Half", 1, {}, room_prefix="C3",
+                           faculty_busy_global=FacultyLedger(), half="1", counters=counters)
+        sc = counters.sections["CSE-V First Half"]
+        self.assertGreater(sc.calls["alloc"], 0)
+        self.assertGreaterEqual(sc.calls["free_blocks_scanned"], sc.rejects["faculty_busy"])
+        self.assertTrue(sc.attempts)
+        self.assertEqual(sum(sc.course_rejects.values()), sum(sc.rejects.values()))
+        d = counters.to_dict()
+        self.assertEqual(list(d["sections"]), ["CSE-V First Half"])
+        self.assertEqual(d["totals"]["calls"], dict(sc.calls))
+
+    def test_counting_does_not_change_the_result(self):
+        plain = timetable.run(3, render=False, ds=self.ds)
+        counters = Counters()
+        counted = timetable.run(3, render=False, ds=self.ds, counters=counters)
+        self.assertEqual(plain[1], counted[1])
+        self.assertEqual({k: tt.labels for k, tt in plain[2].items()}, {k: tt.labels for k, tt in counted[2].items()})
+        self.assertEqual(len(counters.sections), len(counted[2]))
+
+    def test_write_sheet(self):
+        from openpyxl import Workbook
+        c = Counters()
+        sc = c.section("A")
+        sc.calls["alloc"] += 2
+        sc.attempts["X101"] += 2
+        sc.reject("faculty_busy", "X101")
+        rows = list(c.write_sheet(Workbook()).values)
+        self.assertEqual(rows[0], ("Section", "Kind", "Name", "Count"))
+        self.assertIn(("A", "reject", "faculty_busy", 1), rows)
+        self.assertIn(("A", "X101", 2, 1), rows)
+
+
+if __name__ == "__main__":
+    unittest.main()
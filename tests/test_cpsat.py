@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import unittest
+
+import cpsat
+import timetable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    import ortools  # noqa: F401
+    HAVE_ORTOOLS = True
+except ImportError:
+    HAVE_ORTOOLS = False
+
+
+class TestModelInputs(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+        cls.secs = [sec for sh in timetable.load_manifest(cls.ds.manifest_path) for sec in sh["sections"]]
+
+    def test_chunks_follow_greedy_splits(self):
+        self.assertEqual(cpsat.chunks(3, 1, 2), [(1.5, "L"), (1.5, "L"), (1.0, "T"), (2.0, "P")])
+        self.assertEqual(cpsat.chunks(2, 0, 3), [(1.5, "L"), (1.0, "L"), (2.0, "P"), (1.0, "P")])
+        self.assertEqual(cpsat.chunks(0, 0, 0), [])
+
+    def test_start_table(self):
+        n = len(self.ds.slot_keys)
+        for dur in (1.0, 1.5, 2.0):
+            table = cpsat.start_table(self.ds, dur)
+            self.assertTrue(table)
+            for t, size, day, ex in table:
+                self.assertEqual(t // n, day)
+                keys = self.ds.slot_keys[t % n:t % n + size]
+                self.assertEqual(len(keys), size)
+                hours = sum(self.ds.slot_dur[k] for k in keys)
+                self.assertGreaterEqual(hours + 1e-9, dur)
+                self.assertLess(hours - self.ds.slot_dur[keys[-1]], dur - 1e-9)
+                self.assertEqual(ex, int(any(k in timetable.excluded for k in keys)))
+
+    def test_units_are_shared_where_sections_meet(self):
+        units, halves = cpsat.build_units(self.ds, self.secs)
+        self.assertEqual(len(halves), 24)
+        by_key = {u.key: u for u in units}
+        combined = by_key[("combined", "MA161", "1")]
+        self.assertEqual([m[0] for m in combined.members], ["CSEA I First Half", "CSEB I First Half"])
+        basket = by_key[("elective", "sem1", "Elective1", "1")]
+        self.assertEqual(len(basket.members), 4)
+        self.assertGreater(len(basket.fac_keys), 1)
+        full = by_key[("regular", "CSEA I", "CS161", "0")]
+        self.assertEqual(full.layers, 0b11)
+        self.assertEqual([m[0] for m in full.members], ["CSEA I First Half", "CSEA I Second Half"])
+        self.assertTrue(full.rooms and full.labs)
+
+    def test_full_semester_chunks_share_one_placement(self):
+        units, halves = cpsat.build_units(self.ds, self.secs)
+        full = next(u for u in units if u.key == ("regular", "CSEA I", "CS161", "0"))
+        out, grids = cpsat.collect(self.ds, self.secs, halves, [(full, 1.5, "L", True, 1, 1, "C101")])
+        first, second = (grids[f"CSEA I {h} Half"].placements for h in ("First", "Second"))
+        self.assertEqual(len(first), 1)
+        self.assertIs(first[0], second[0])
+        self.assertEqual(first[0].text, timetable.cell_text("CS161", "L", "C101"))
+
+    @unittest.skipIf(HAVE_ORTOOLS, "OR-Tools is installed")
+    def test_missing_ortools_is_explained(self):
+        with self.assertRaises(ImportError) as cm:
+            timetable.run(1, render=False, ds=self.ds, engine="cpsat")
+        self.assertIn("pip install ortools", str(cm.exception))
+        # The seed search solves each seed with the engine it renders.
+        with self.assertRaises(ImportError):
+            timetable.solve_seed(1, engine="cpsat")
+
+
+@unittest.skipUnless(HAVE_ORTOOLS, "needs OR-Tools")
+class TestSolve(unittest.TestCase):
+
+    def test_two_sections_place_everything_without_clashes(self):
+        ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+        with open(ds.manifest_path) as f:
+            first_sheet = json.load(f)["sheets"][:1]
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "sections.json")
+            with open(path, "w") as f:
+                json.dump({"sheets": first_sheet}, f)
+            _, failed, grids, schedule = timetable.run(1, render=False, ds=ds, manifest_path=path, engine="cpsat", cpsat_seconds=60, cpsat_workers=4)
+        self.assertEqual(failed, [])
+        self.assertEqual(len(grids), 4)
+        rooms, course_rooms = {}, {}
+        for sec, half in schedule.halves():
+            for p in half["placements"]:
+                if p.room and p.room != "C004":
+                    course_rooms.setdefault((sec["label"], half["half"], p.code, p.type), set()).add(p.room)
+                for i in range(p.start, p.end):
+                    if p.room and p.room != "C004":
+                        rooms.setdefault((p.room, half["half"], p.day, i), set()).add((p.code, p.type, p.start))
+        self.assertEqual([k for k, v in rooms.items() if len(v) > 1], [])
+        # Like greedy, a course keeps one room per chunk type.
+        self.assertEqual([k for k, v in course_rooms.items() if len(v) > 1], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+import timetable
+from occupancy import FacultyLedger
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# import timetable measured ~25ms once pandas and openpyxl were deferred; the two cost ~0.7s together.
+IMPORT_BUDGET_SECONDS = 0.2
+
+PROBE = """
+import sys, time
+sys.path.insert(0, %r)
+t = time.perf_counter()
+import timetable
+print(time.perf_counter() - t)
+print(",".join(m for m in ("pandas", "openpyxl") if m in sys.modules))
+"""
+
+
+class TestImport(unittest.TestCase):
+
+    def test_import_budget(self):
+        # Fresh interpreter outside the repo, so nothing is cached and nothing resolves against the CWD.
+        with tempfile.TemporaryDirectory() as cwd:
+            best = None
+            for _ in range(3):
+                out = subprocess.run([sys.executable, "-c", PROBE % ROOT], cwd=cwd, capture_output=True, text=True, check=True).stdout.split("\n")
+                self.assertEqual(out[1], "")
+                best = min(best or 1e9, float(out[0]))
+        self.assertLess(best, IMPORT_BUDGET_SECONDS)
+
+
+class TestDataset(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+
+    def test_load_dataset(self):
+        self.assertEqual(len(self.ds.slot_keys), len(self.ds.slot_dur))
+        self.assertTrue(self.ds.room_catalog.classrooms)
+        self.assertIs(self.ds.courses("coursesCSE-V.csv"), self.ds.courses("coursesCSE-V.csv"))
+
+    def test_generate_without_workbook(self):
+        first, _ = timetable.split(self.ds.courses("coursesCSE-V.csv"))
+        grids = {}
+        placed, failed, _ = timetable.generate(self.ds, first, None, "CSE-V First Half", 1, {}, room_prefix="C3",
+                                            faculty_busy_global=FacultyLedger(), grids=grids, half="1")
+        self.assertTrue(placed)
+        self.assertEqual(failed, [])
+        tt = grids["CSE-V First Half"]
+        self.assertTrue(any(tt.busy[d] for d in timetable.days))
+
+    def test_unpinned_full_semester_holds_one_half(self):
+        full = {"Semester_Half": "0"}
+        self.assertEqual([timetable.course_layers(full, h) for h in ("1", "2")], [0b01, 0b10])
+        self.assertEqual(timetable.course_layers(full, "1", pinned=True), 0b11)
+        self.assertEqual(timetable.course_layers({"Semester_Half": "2"}, "2", pinned=True), 0b10)
+        first, _ = timetable.split(self.ds.courses("coursesCSE-V.csv"))
+        busy = FacultyLedger()
+        timetable.generate(self.ds, first, None, "CSE-V First Half", 1, {}, room_prefix="C3", faculty_busy_global=busy, half="1")
+        second_layer = ((1 << len(self.ds.slot_keys)) - 1) << len(self.ds.slot_keys)
+        self.assertEqual([m for d in busy.busy.values() for m in d.values() if m & second_layer], [])
+
+
+if __name__ == "__main__":
+    unittest.main()
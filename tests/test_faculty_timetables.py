@@ -0,0 +1,102 @@
+import os
+import tempfile
+import time
+import unittest
+
+import faculty
+import timetable
+from occupancy import Placement
+from schedule import Schedule
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestBuildFacultyTimetables(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+        _, _, _, cls.schedule = timetable.run(1, render=False, ds=ds)
+
+    def test_every_placement_lands_on_its_faculty(self):
+        slots = faculty.build_faculty_timetables(self.schedule)
+        keys = self.schedule.slot_keys
+        for sec, half in self.schedule.halves():
+            name = faculty.HALF_NAMES[half["half"]]
+            for p in half["placements"]:
+                if p.code.startswith("Elective"):
+                    continue
+                for fac in faculty.split_faculty(p.faculty):
+                    self.assertTrue(all(slots[fac][name][p.day][k] for k in keys[p.start:p.end]), (fac, p))
+
+    def test_basket_goes_to_its_members(self):
+        sc = Schedule(1, faculty.days, ["09:00-10:00", "10:00-11:00"])
+        legend = [["CS501", "A", "3-0-0-0-3", "Dr. A", "Full Sem", "Yes", "1", "C101"],
+                  ["CS502", "B", "3-0-0-0-3", "Dr. B / Dr. C", "Full Sem", "Yes", "1", "C102"],
+                  ["CS503", "C", "3-0-0-0-3", "Dr. D", "Full Sem", "Yes", "2", "C103"]]
+        half = {"label": "X First Half", "half": "1", "codes": ["Elective1"],
+                "placements": [Placement("Monday", 0, 2, "Elective1", "L", None, "Dr. A", "Elective1")]}
+        sc.sheets.append({"title": "X", "sections": [{"label": "X", "legend_title": "X", "courses": "x.csv", "legend": legend, "halves": [half]}]})
+        slots = faculty.build_faculty_timetables(sc)
+        self.assertEqual(sorted(slots), ["Dr. A", "Dr. B", "Dr. C"])
+        self.assertEqual(slots["Dr. B"]["First Half"]["Monday"], {"09:00-10:00": "Elective1", "10:00-11:00": "Elective1"})
+        self.assertEqual(slots["Dr. B"]["Second Half"]["Monday"]["09:00-10:00"], "")
+
+    def test_500_faculty_under_a_second(self):
+        keys = [f"{h:02d}:00-{h + 1:02d}:00" for h in range(8, 18)]
+        sc = Schedule(1, faculty.days, keys)
+        sections = []
+        for i in range(200):
+            halves = []
+            for h in ("1", "2"):
+                ps = [Placement(d, k, k + 1, f"C{i}{j}", "L", "C101", f"Dr. F{(i * 8 + j) % 500}", f"C{i}{j} (C101)")
+                      for j, (d, k) in enumerate((d, k) for d in faculty.days for k in range(0, 10, 3))]
+                halves.append({"label": f"S{i} {h}", "half": h, "codes": [], "placements": ps})
+            sections.append({"label": f"S{i}", "legend_title": "", "courses": "", "legend": [], "halves": halves})
+        sc.sheets.append({"title": "All", "sections": sections})
+        t = time.perf_counter()
+        slots = faculty.build_faculty_timetables(sc)
+        self.assertLess(time.perf_counter() - t, 1.0)
+        self.assertEqual(len(slots), 500)
+
+
+class TestParseTimetableXlsx(unittest.TestCase):
+
+    def test_streams_halves_and_header(self):
+        from openpyxl import Workbook
+        keys = ["09:00-10:00", "10:00-11:00"]
+        wb = Workbook()
+        ws = wb.active
+        ws.append(["Monday", "CS101 (C101)", ""])
+        for label in ("CSE-V First Half", "CSE-V Second Half"):
+            ws.append([""]); ws.append([label]); ws.append(["Day"] + keys)
+            ws.append(["Monday", "CS101 (C101)", "Elective1"])
+            for d in faculty.days[1:]:
+                ws.append([d])
+        ws.append(["CS101", "Intro", "3-0-0-0-3", "Dr. A"])
+        wb.create_sheet("Empty")
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "t.xlsx")
+            wb.save(path)
+            slots = faculty.parse_timetable_xlsx(path, keys, {"CS101": ["Dr. A"], "CS501": ["Dr. B"]}, {"1": ["CS501"]})
+        self.assertEqual(sorted(slots), ["Dr. A", "Dr. B"])
+        for half in faculty.HALVES:
+            self.assertEqual(slots["Dr. A"][half]["Monday"], {"09:00-10:00": "CS101 (C101)", "10:00-11:00": ""})
+            self.assertEqual(slots["Dr. B"][half]["Monday"]["10:00-11:00"], "Elective1")
+
+
+    def test_workbook_matches_schedule(self):
+        ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+        wb, _, _, schedule = timetable.run(1, ds=ds)
+        want = faculty.build_faculty_timetables(schedule)
+        with tempfile.TemporaryDirectory() as d:
+            for writer in ("openpyxl", "fast"):
+                path = os.path.join(d, f"{writer}.xlsx")
+                (wb if writer == "openpyxl" else timetable.render_with(writer, ds, schedule)).save(path)
+                got = faculty.parse_timetable_xlsx(path, schedule.slot_keys, {}, {})
+                self.assertEqual(list(got), list(want), writer)
+                self.assertEqual(got, want, writer)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import os
+import tempfile
+import unittest
+
+import timetable
+from fastxlsx import StyleCache, widths_of
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cells(path):
+    from openpyxl import load_workbook
+    wb = load_workbook(path)
+    out = {}
+    for ws in wb.worksheets:
+        rows = []
+        for row in ws.iter_rows():
+            for c in row:
+                b = c.border
+                rows.append((c.coordinate, c.value if c.value != "" else None, bool(c.font.bold), c.font.sz, c.alignment.horizontal,
+                             bool(c.alignment.wrap_text), b.left.style, b.bottom.style, c.fill.start_color.rgb if c.fill.fill_type else None))
+        out[ws.title] = (rows, sorted(map(str, ws.merged_cells.ranges)),
+                         sorted((k, d.width) for k, d in ws.column_dimensions.items() if d.width))
+    return out
+
+
+class TestFastWriter(unittest.TestCase):
+
+    def test_same_sheets_as_openpyxl_writer(self):
+        ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+        _, _, _, schedule = timetable.run(2, render=False, ds=ds)
+        with tempfile.TemporaryDirectory() as d:
+            paths = {}
+            for writer in ("openpyxl", "fast"):
+                paths[writer] = os.path.join(d, writer + ".xlsx")
+                timetable.render_with(writer, ds, schedule).save(paths[writer])
+            slow, fast = cells(paths["openpyxl"]), cells(paths["fast"])
+        self.assertEqual(list(fast), list(slow))
+        for title in slow:
+            self.assertEqual(fast[title][1], slow[title][1], title)
+            self.assertEqual(fast[title][2], slow[title][2], title)
+            self.assertEqual(fast[title][0], slow[title][0], title)
+
+    def test_style_cache_shares_styles(self):
+        from openpyxl import Workbook
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet("x")
+        cache = StyleCache()
+        a = cache.cell(ws, "A", {"font": "bold", "border": "thin"})
+        b = cache.cell(ws, "B", {"border": "thin", "font": "bold"})
+        self.assertEqual(len(cache.styles), 1)
+        for c in (a, b):
+            self.assertTrue(c.font.bold)
+            self.assertEqual(c.border.left.style, "thin")
+
+    def test_widths(self):
+        self.assertEqual(widths_of([(["abc", None], [None, None]), ([""], [None])]), [5, 8])
+
+
+if __name__ == "__main__":
+    unittest.main()
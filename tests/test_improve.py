@@ -0,0 +1,86 @@
+import json
+import os
+import unittest
+
+import improve
+import timetable
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestImprove(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+        cls.secs = [sec for sh in timetable.load_manifest(cls.ds.manifest_path) for sec in sh["sections"]]
+
+    def improved(self, seed=6, **kw):
+        _, _, grids, schedule = timetable.run(seed, render=False, ds=self.ds, **kw)
+        before = sum(r["Hours_Remaining"] for r in schedule.failed)
+        stats = improve.improve(self.ds, schedule, grids, self.secs, 60, seed, pin_full=kw.get("pin_full", False), max_moves=20000)
+        return before, stats, grids, schedule
+
+    def test_places_leftovers_and_lowers_the_objective(self):
+        before, stats, grids, schedule = self.improved()
+        self.assertGreater(before, 0)
+        self.assertLess(sum(r["Hours_Remaining"] for r in schedule.failed), before)
+        self.assertLess(stats["after"], stats["before"])
+        self.assertEqual(stats["moves"], 20000)
+
+    def test_grids_match_placements(self):
+        _, _, grids, schedule = self.improved(pin_full=True)
+        for _, half in schedule.halves():
+            tt = grids[half["label"]]
+            for d in timetable.days:
+                taken = [i for p in half["placements"] if p.day == d for i in range(p.start, p.end)]
+                self.assertEqual(len(taken), len(set(taken)))
+                self.assertEqual(sum(1 << i for i in taken), tt.busy[d])
+                self.assertEqual(timetable.grid_row(half["placements"], d, len(tt.slot_keys)), tt.labels[d])
+
+    def test_pinned_chunks_stay_in_both_halves(self):
+        _, _, _, schedule = self.improved(pin_full=True)
+        for sec in (sec for sh in schedule.sheets for sec in sh["sections"]):
+            full = {timetable.s(c.get("Course_Code")) for c in self.ds.courses(sec["courses"]) if timetable.s(c.get("Semester_Half")) == "0"}
+            first, second = ({(p.code, p.type, p.day, p.start, p.room) for p in h["placements"] if p.code in full} for h in sec["halves"])
+            self.assertEqual(first, second)
+
+    def test_rooms_are_never_double_booked(self):
+        _, _, _, schedule = self.improved(seed=2)
+        held = {}
+        for sec, half in schedule.halves():
+            layers = {timetable.s(c.get("Course_Code")): timetable.course_layers(c, half["half"]) for c in self.ds.courses(sec["courses"])}
+            for p in half["placements"]:
+                if p.room and p.room != "C004":
+                    for layer in (0, 1):
+                        if layers.get(p.code, 0b11) >> layer & 1:
+                            for i in range(p.start, p.end):
+                                held.setdefault((p.room, p.day, i, layer), set()).add((sec["label"], p.code, p.type, p.start))
+        self.assertEqual([k for k, v in held.items() if len(v) > 1], [])
+
+    def test_ledgers_match_the_final_state(self):
+        # The run ends by restoring its best snapshot, so the ledgers must follow the placements back.
+        _, _, grids, schedule = timetable.run(3, render=False, ds=self.ds)
+        imp = improve.Improver(self.ds, schedule, grids, self.secs, rng=improve.random.Random(3))
+        # Hot enough that the last state is worse than the best one, so the run has to restore.
+        imp.run(60, max_moves=5000, t0=100.0, t1=100.0)
+        fresh = improve.Improver(self.ds, schedule, grids, self.secs)
+        nonzero = lambda d: {k: v for k, v in d.items() if v}
+        self.assertEqual({k: nonzero(v) for k, v in imp.fac.items() if any(v.values())}, fresh.fac)
+        self.assertEqual({d: nonzero(v) for d, v in imp.rooms.items()}, fresh.rooms)
+        self.assertEqual(nonzero(imp.usage), fresh.usage)
+        self.assertEqual(nonzero(imp.labs), fresh.labs)
+        self.assertEqual(sorted(id(u.p) for u in imp.units), sorted(id(u.p) for u in fresh.units))
+
+    def test_same_seed_same_result(self):
+        out = [json.dumps(self.improved()[3].to_dict()) for _ in range(2)]
+        self.assertEqual(out[0], out[1])
+
+    def test_run_hook(self):
+        _, failed, _, _ = timetable.run(6, render=False, ds=self.ds, improve_seconds=1)
+        _, plain, _, _ = timetable.run(6, render=False, ds=self.ds)
+        self.assertLess(sum(r["Hours_Remaining"] for r in failed), sum(r["Hours_Remaining"] for r in plain))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,41 @@
+import json
+import os
+import tempfile
+import unittest
+
+from manifest import load_manifest, course_files, DEFAULT_MANIFEST
+
+
+class TestManifest(unittest.TestCase):
+
+    def write(self, data):
+        fd, path = tempfile.mkstemp(suffix=".json")
+        with os.fdopen(fd, "w") as f:
+            json.dump(data, f)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_default_manifest(self):
+        sheets = load_manifest(DEFAULT_MANIFEST)
+        self.assertEqual(len(sheets), 10)
+        self.assertEqual(len(course_files(sheets)), 12)
+        cse1 = sheets[0]["sections"]
+        self.assertEqual([s["label"] for s in cse1], ["CSEA I", "CSEB I"])
+        self.assertTrue(all(s["hide_c004"] for s in cse1))
+        self.assertEqual(sheets[-1]["sections"][0]["legend"], "7TH SEM")
+
+    def test_defaults(self):
+        path = self.write({"sheets": [{"title": "X", "sections": [{"label": "A", "courses": "a.csv"}, {"label": "B", "courses": "b.csv", "sync": "sem1"}]}]})
+        a, b = load_manifest(path)[0]["sections"]
+        self.assertEqual((a["legend"], a["sync"], a["seed_offset"], a["room_prefix"], a["hide_c004"]), ("A", "A", 0, None, False))
+        self.assertEqual((b["sync"], b["seed_offset"]), ("sem1", 2))
+
+    def test_invalid(self):
+        with self.assertRaises(ValueError):
+            load_manifest(self.write({"sheets": [{"title": "X", "sections": [{"label": "A"}]}]}))
+        with self.assertRaises(ValueError):
+            load_manifest(self.write({"sheets": [{"title": "X", "sections": [{"label": "A", "courses": "a.csv"}] * 2}]}))
+
+
+if __name__ == "__main__":
+    unittest.main()
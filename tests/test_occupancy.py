@@ -0,0 +1,111 @@
+import unittest
+
+from occupancy import SectionGrid, RoomCatalog, FacultyLedger, Placement, split_faculty
+
+DAYS = ["Monday", "Tuesday"]
+SLOTS = ["07:30-09:00", "09:00-10:00", "10:00-10:30", "10:30-10:45", "10:45-11:00", "11:00-12:00"]
+EXCLUDED = ["07:30-09:00", "10:30-10:45"]
+DUR = {"07:30-09:00": 1.5, "09:00-10:00": 1.0, "10:00-10:30": 0.5, "10:30-10:45": 0.25, "10:45-11:00": 0.25, "11:00-12:00": 1.0}
+
+
+class TestSectionGrid(unittest.TestCase):
+
+    def test_empty_grid_blocks(self):
+        g = SectionGrid(DAYS, SLOTS, EXCLUDED)
+        self.assertEqual(g.blocks("Monday"), [["09:00-10:00", "10:00-10:30"], ["10:45-11:00", "11:00-12:00"]])
+        self.assertEqual(g.blocks("Monday", ex=True), [SLOTS])
+
+    def test_put_splits_blocks(self):
+        g = SectionGrid(DAYS, SLOTS, EXCLUDED)
+        g.put("Monday", ["10:00-10:30"], "CS101 (C101)")
+        self.assertEqual(g.get("Monday", "10:00-10:30"), "CS101 (C101)")
+        self.assertEqual(g.blocks("Monday", ex=True), [["07:30-09:00", "09:00-10:00"], ["10:30-10:45", "10:45-11:00", "11:00-12:00"]])
+        self.assertEqual(g.blocks("Tuesday", ex=True), [SLOTS])
+
+    def test_release_undoes_put(self):
+        g = SectionGrid(DAYS, SLOTS, EXCLUDED)
+        g.put("Monday", ["07:30-09:00"], "PH101")
+        g.put("Monday", ["10:00-10:30", "10:30-10:45"], "CS101 (C101)")
+        g.release("Monday", g.mask_of(["10:00-10:30", "10:30-10:45"]))
+        fresh = SectionGrid(DAYS, SLOTS, EXCLUDED)
+        fresh.put("Monday", ["07:30-09:00"], "PH101")
+        self.assertEqual((g.busy, g.labels, g.free_runs), (fresh.busy, fresh.labels, fresh.free_runs))
+
+    def test_is_free(self):
+        g = SectionGrid(DAYS, SLOTS, EXCLUDED)
+        g.put("Monday", ["09:00-10:00"], "MA101")
+        self.assertFalse(g.is_free("Monday", g.mask_of(["09:00-10:00", "10:00-10:30"])))
+        self.assertTrue(g.is_free("Monday", g.mask_of(["10:00-10:30"])))
+        self.assertEqual(g.row("Monday"), ["", "MA101", "", "", "", ""])
+
+    def test_record_splits_runs(self):
+        g = SectionGrid(DAYS, SLOTS, EXCLUDED)
+        g.record("Monday", ["11:00-12:00", "09:00-10:00", "10:00-10:30"], "CS101 (C101)", "CS101", "L", "C101", "Dr. A")
+        self.assertEqual(g.placements, [Placement("Monday", 1, 3, "CS101", "L", "C101", "Dr. A", "CS101 (C101)"),
+                                        Placement("Monday", 5, 6, "CS101", "L", "C101", "Dr. A", "CS101 (C101)")])
+
+    def test_blocks_at_least(self):
+        g = SectionGrid(DAYS, SLOTS, EXCLUDED, DUR)
+        self.assertEqual(list(g.blocks_at_least("Monday", 1.5)), [["09:00-10:00", "10:00-10:30"]])
+        g.put("Monday", ["10:00-10:30"], "CS101")
+        self.assertEqual(list(g.blocks_at_least("Monday", 1.5)), [])
+        self.assertEqual(list(g.blocks_at_least("Monday", 1.5, ex=True)), [["07:30-09:00", "09:00-10:00"], ["10:30-10:45", "10:45-11:00", "11:00-12:00"]])
+
+    def test_index_matches_mask(self):
+        g = SectionGrid(DAYS, SLOTS, EXCLUDED, DUR)
+        for keys in (["11:00-12:00"], ["07:30-09:00", "09:00-10:00"], ["10:45-11:00"]):
+            g.put("Tuesday", keys, "X")
+            for ex in (False, True):
+                runs = [g.keys_of(m) for m in [sum(1 << g.index[k] for k in blk) for blk in g.blocks("Tuesday", ex)]]
+                self.assertEqual(sum(len(r) for r in runs), bin(g.free_mask("Tuesday", ex)).count("1"))
+
+    def test_layered(self):
+        g = SectionGrid(DAYS, SLOTS, EXCLUDED)
+        m = g.mask_of(["09:00-10:00"])
+        self.assertEqual(g.layered(m, 0b01), 0b10)
+        self.assertEqual(g.layered(m, 0b10), 0b10 << len(SLOTS))
+        self.assertEqual(g.layered(m), g.layered(m, 0b01) | g.layered(m, 0b10))
+
+
+class TestRoomCatalog(unittest.TestCase):
+
+    def setUp(self):
+        self.cat = RoomCatalog(["C101", "C102", "L105", "C201", "L206", "C004"])
+
+    def test_candidates(self):
+        self.assertEqual(self.cat.candidates(prefix="C1"), ["C101", "C102"])
+        self.assertEqual(self.cat.candidates(prefix="C9"), ["C101", "C102", "C201", "C004"])
+        self.assertEqual(self.cat.candidates(lab=True, lab_prefix="L2"), ["L206"])
+        self.assertEqual(self.cat.candidates(lab=True, lab_prefix="L9"), ["L105", "L206"])
+        self.assertIs(self.cat.candidates(prefix="C1"), self.cat.candidates(prefix="C1"))
+
+    def test_first_free_round_robin(self):
+        cand = ["C101", "C102"]
+        rr = {}
+        self.assertEqual(self.cat.first_free(cand, {}, 0b11, "C1", rr), "C101")
+        self.assertEqual(self.cat.first_free(cand, {}, 0b11, "C1", rr), "C102")
+        self.assertEqual(self.cat.first_free(cand, {"C101": 0b01}, 0b11, "C1", rr), "C102")
+        self.assertIsNone(self.cat.first_free(cand, {"C101": 0b10, "C102": 0b01}, 0b11, "C1", rr))
+        self.assertEqual(self.cat.first_free(cand, {"C101": 0b10}, 0b01), "C101")
+        self.assertEqual(self.cat.first_free_at(cand, {"C101": 0b01}, 0b01), ("C102", 1))
+        self.assertEqual(self.cat.first_free_at(cand, {"C101": 0b01, "C102": 0b01}, 0b01), (None, 2))
+
+
+class TestFacultyLedger(unittest.TestCase):
+
+    def test_split_faculty(self):
+        self.assertEqual(split_faculty("Dr. A/Dr. B"), ["Dr. A", "Dr. B"])
+        self.assertEqual(split_faculty("Dr. A and Dr. B; Dr. C"), ["Dr. A", "Dr. B", "Dr. C"])
+        self.assertEqual(split_faculty(None), [])
+
+    def test_joint_faculty_reserves_everyone(self):
+        led = FacultyLedger()
+        led.reserve("Dr. Sunil C K/Dr. Sunil Kumar P V", "Monday", 0b0110)
+        self.assertFalse(led.is_free("Dr. Sunil Kumar P V", "Monday", 0b0010))
+        self.assertFalse(led.is_free("Dr Sunil C K", "Monday", 0b0100))
+        self.assertTrue(led.is_free("Dr. Sunil C K", "Monday", 0b1001))
+        self.assertTrue(led.is_free("Dr. Sunil C K", "Tuesday", 0b0110))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+import json
+import os
+import random
+import tempfile
+import unittest
+
+import timetable
+from counters import Counters
+from manifest import load_manifest
+from synth import make_dataset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def sections_of(ds):
+    return [sec for sh in load_manifest(ds.manifest_path) for sec in sh["sections"]]
+
+
+class TestSectionGroups(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp = tempfile.TemporaryDirectory()
+        make_dataset(cls.tmp.name, sections=8, semester_faculty=True)
+        cls.ds = timetable.load_dataset(cls.tmp.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_shipped_data_is_one_group(self):
+        ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+        secs = sections_of(ds)
+        self.assertEqual(timetable.section_groups(ds, secs), [secs])
+
+    def test_semesters_split_into_groups(self):
+        groups = timetable.section_groups(self.ds, sections_of(self.ds))
+        self.assertEqual([[sec["label"] for sec in g] for g in groups],
+                         [["SEM1-A", "SEM1-B"], ["SEM3-A", "SEM3-B"], ["SEM5-A", "SEM5-B"], ["SEM7-A", "SEM7-B"]])
+
+    def test_same_schedule_for_any_worker_count(self):
+        out = []
+        for workers in (1, 3):
+            counters = Counters()
+            _, _, grids, schedule = timetable.run(1, render=False, ds=self.ds, counters=counters, workers=workers)
+            out.append((json.dumps(schedule.to_dict()), list(grids), json.dumps(counters.to_dict())))
+        self.assertEqual(out[0], out[1])
+        self.assertEqual(out[0][1][:2], ["SEM1-A First Half", "SEM1-A Second Half"])
+
+
+class TestStreams(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+
+    def test_global_random_state_is_not_used(self):
+        out = []
+        for s in (1, 2):
+            random.seed(s)
+            wb, _, _, schedule = timetable.run(1, ds=self.ds)
+            out.append((json.dumps(schedule.to_dict()), [[c.fill.start_color.rgb for row in ws.iter_rows() for c in row] for ws in wb]))
+        self.assertEqual(out[0], out[1])
+
+    def test_section_legend_alone(self):
+        _, _, _, schedule = timetable.run(3, render=False, ds=self.ds)
+        sec = schedule.sheets[0]["sections"][0]
+        alone = timetable.legend_rows(self.ds, sec["courses"], {}, timetable.section_rng(3, sec["label"]))
+        self.assertEqual(alone, sec["legend"])
+
+    def test_colors_per_picker(self):
+        a, b = timetable.color_picker(), timetable.color_picker()
+        self.assertEqual([a(c) for c in ("CS101", "MA101", "cs101 ")], [b(c) for c in ("CS101", "MA101", "CS101")])
+        self.assertIsNone(a(""))
+
+
+class TestSeedSearch(unittest.TestCase):
+
+    def test_every_seed_is_a_different_timetable(self):
+        import pandas as pd
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "seeds.csv")
+            best = timetable.search_seeds(1, 2 * len(timetable.days), workers=2, summary_path=path, data_dir=os.path.join(ROOT, "data"))
+            rows = pd.read_csv(path)
+        self.assertEqual(len(rows), 2 * len(timetable.days))
+        self.assertEqual(rows["Timetable"].nunique(), len(rows))
+        self.assertEqual(rows.loc[rows["Best"], "Seed"].tolist(), [best])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import os
+import random
+import unittest
+
+import numpy as np
+
+import improve
+import quality
+import timetable
+from occupancy import Placement
+from schedule import Schedule
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SLOTS = ["07:30-09:00", "09:00-10:00", "10:00-10:30", "10:30-10:45", "10:45-11:00", "11:00-12:00"]
+DUR = {"07:30-09:00": 1.5, "09:00-10:00": 1.0, "10:00-10:30": 0.5, "10:30-10:45": 0.25, "10:45-11:00": 0.25, "11:00-12:00": 1.0}
+
+
+def tiny(placements, failed=()):
+    sc = Schedule(1, ["Monday", "Tuesday"], SLOTS)
+    sc.sheets = [{"title": "S", "sections": [{"label": "A", "halves": [{"label": "A First Half", "half": "1", "codes": [], "placements": placements}]}]}]
+    sc.failed = list(failed)
+    return sc
+
+
+class TestMetrics(unittest.TestCase):
+
+    def test_hand_counted(self):
+        ps = [Placement("Monday", 1, 2, "CS101", "L", "C101", "Dr. A", "CS101 (C101)"),
+              Placement("Monday", 5, 6, "CS102", "P", "L101", "Dr. A/Dr. B", "CS102 (Lab-L101)"),
+              Placement("Tuesday", 0, 2, "CS103", "P", "L101", "Dr. B", "CS103 (Lab-L101)"),
+              Placement("Tuesday", 4, 6, "CS104", "P", "L102", "Dr. A", "CS104 (Lab-L102)")]
+        m = quality.Scorer(tiny(ps, [{"Hours_Remaining": 1.5}]), DUR, ["07:30-09:00", "10:30-10:45"]).metrics()
+        # Idle: Monday 10:00-10:30 and 10:45-11:00, Tuesday 10:00-10:30; the excluded 10:30-10:45 never counts.
+        self.assertEqual(m["idle_hours"], 0.75 + 0.5)
+        self.assertEqual(m["excluded_hours"], 1.5)
+        self.assertEqual(m["lab_crowding"], 1)
+        self.assertEqual(m["lab_days"], 2)
+        self.assertEqual(m["unplaced_hours"], 1.5)
+        # Dr. B on Tuesday: 07:30-10:00.
+        self.assertEqual(m["faculty_peak"], 2.5)
+
+    def test_shipped_data_agrees_with_score_run_and_improve(self):
+        ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+        _, failed, grids, schedule = timetable.run(1, render=False, ds=ds)
+        m = quality.Scorer.of(ds, schedule).metrics()
+        self.assertEqual(m["excluded_hours"], timetable.score_run(ds, failed, grids)["Excluded_Hours"])
+        self.assertEqual(m["unplaced_hours"], timetable.score_run(ds, failed, grids)["Hours_Remaining"])
+        secs = [sec for sh in timetable.load_manifest(ds.manifest_path) for sec in sh["sections"]]
+        self.assertAlmostEqual(quality.Scorer.of(ds, schedule).objective(), improve.Improver(ds, schedule, grids, secs).total())
+        self.assertGreater(m["room_utilization"], 0)
+
+
+class TestDeltas(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+        _, _, _, cls.schedule = timetable.run(6, render=False, ds=cls.ds)
+
+    def test_delta_matches_rescoring(self):
+        rng = random.Random(0)
+        halves = [h for _, h in self.schedule.halves()]
+        for _ in range(50):
+            sc = quality.Scorer.of(self.ds, self.schedule)
+            half = rng.choice(halves)
+            p = rng.choice(half["placements"])
+            d = rng.choice(self.schedule.days)
+            q = p._replace(day=d, start=rng.randrange(len(self.schedule.slot_keys) - 1))
+            q = q._replace(end=q.start + 1)
+            changes = [(half["label"], p, -1), (half["label"], q, 1)]
+            delta = sc.delta(changes, unplaced=-1.0)
+            before = sc.objective()
+            sc.apply(changes, unplaced=-1.0)
+            self.assertAlmostEqual(sc.objective() - before, delta)
+            # The moved schedule scored from scratch.
+            moved = Schedule(self.schedule.seed, self.schedule.days, self.schedule.slot_keys)
+            moved.failed = self.schedule.failed
+            moved.sheets = [dict(sh, sections=[dict(sec, halves=[dict(h, placements=[x for x in h["placements"] if x is not p] + [q]) if h is half else h
+                                                                 for h in sec["halves"]]) for sec in sh["sections"]]) for sh in self.schedule.sheets]
+            fresh = quality.Scorer.of(self.ds, moved)
+            self.assertAlmostEqual(sc.objective(), fresh.objective() - quality.WEIGHTS["unplaced_hours"])
+            np.testing.assert_array_equal(sc.faculty, fresh.faculty)
+
+    def test_batch_matches_single(self):
+        sc = quality.Scorer.of(self.ds, self.schedule)
+        rng = np.random.default_rng(0)
+        occ = rng.random((64,) + sc.occ.shape) < 0.4
+        labs = rng.integers(0, 3, (64,) + sc.labs.shape)
+        batch = sc.score_batch(occ, labs)
+        for i in (0, 17, 63):
+            sc.occ[:], sc.labs[:] = occ[i], labs[i]
+            sc.idle, sc.excluded, sc.crowding = quality.section_terms(sc.occ, sc.labs, sc.excl, sc.dur)
+            self.assertAlmostEqual(batch[i], sc.objective())
+
+    def test_report_sheet_lists_the_metrics(self):
+        wb = timetable.render_workbook(self.ds, self.schedule)
+        rows = [r for r in wb["Report"].iter_rows(values_only=True)]
+        self.assertEqual(rows[0][0], "Quality")
+        shown = {r[0]: r[1] for r in rows[2:2 + len(quality.METRICS)]}
+        m = quality.Scorer.of(self.ds, self.schedule).metrics()
+        self.assertEqual(shown, {label: m[key] for key, label in quality.METRICS})
+        self.assertIn(("Unplaced/Partial Courses",), [r[:1] for r in rows])
+
+
+if __name__ == "__main__":
+    unittest.main()
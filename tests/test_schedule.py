@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+import timetable
+from occupancy import Placement
+from schedule import grid_row, load_schedule
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestSchedule(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        cls.ds = timetable.load_dataset(os.path.join(ROOT, "data"))
+
+    def assert_matches_grids(self, schedule, grids):
+        n = 0
+        for _, half in schedule.halves():
+            tt = grids[half["label"]]
+            for d in timetable.days:
+                self.assertEqual(grid_row(half["placements"], d, len(schedule.slot_keys)), tt.row(d), (half["label"], d))
+            n += 1
+        self.assertEqual(n, len(grids))
+
+    def test_placements_reproduce_grids(self):
+        _, reports, grids, schedule = timetable.run(1, render=False, ds=self.ds)
+        self.assertIs(schedule.failed, reports)
+        self.assert_matches_grids(schedule, grids)
+
+    def test_pinned_halves_carry_placements(self):
+        _, _, grids, schedule = timetable.run(1, render=False, pin_full=True, ds=self.ds)
+        self.assert_matches_grids(schedule, grids)
+
+    def test_json_round_trip_renders_the_same(self):
+        wb, _, _, schedule = timetable.run(1, ds=self.ds)
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "s.schedule.json")
+            schedule.save_json(path)
+            loaded = load_schedule(path)
+        self.assertEqual(loaded.to_dict(), schedule.to_dict())
+        again = timetable.render_workbook(self.ds, loaded)
+        self.assertEqual(again.sheetnames, wb.sheetnames)
+        for name in wb.sheetnames:
+            self.assertEqual(list(again[name].values), list(wb[name].values), name)
+            self.assertEqual(sorted(map(str, again[name].merged_cells.ranges)), sorted(map(str, wb[name].merged_cells.ranges)), name)
+
+    def test_merges_follow_placement_spans(self):
+        from openpyxl import Workbook
+        ws = Workbook().active
+        # Four short slots holding one tutorial: the old text rule stopped merging after an hour's worth.
+        half = {"label": "X First Half", "half": "1", "codes": ["CS307"], "placements": [
+            Placement("Monday", 11, 15, "CS307", "T", "C402", "Dr. A", "CS307T (C402)"),
+            Placement("Monday", 15, 16, "CS308", "L", "C402", "Dr. B", "CS307T (C402)")]}
+        top = timetable.write_half(self.ds, ws, half)
+        timetable.merge_and_color(self.ds, ws, [(top, half)])
+        self.assertEqual([str(r) for r in ws.merged_cells.ranges], ["M4:P4"])
+        self.assertEqual(ws["M4"].value, "CS307T (C402)")
+        self.assertNotEqual(ws["M4"].fill.start_color.rgb, ws["Q4"].fill.start_color.rgb)
+        self.assertTrue(ws["B4"].border.left.style)
+
+
+if __name__ == "__main__":
+    unittest.main()
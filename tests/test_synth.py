@@ -0,0 +1,47 @@
+import os
+import tempfile
+import unittest
+
+import timetable
+from manifest import load_manifest
+from synth import make_dataset, letters
+
+
+class TestSynth(unittest.TestCase):
+
+    def make(self, **kw):
+        d = tempfile.TemporaryDirectory()
+        self.addCleanup(d.cleanup)
+        return d.name, make_dataset(d.name, **kw)
+
+    def test_letters(self):
+        self.assertEqual([letters(i) for i in (0, 25, 26, 27, 701, 702)], ["A", "Z", "AA", "AB", "ZZ", "AAA"])
+
+    def test_same_seed_same_files(self):
+        a, _ = self.make(sections=5, seed=3)
+        b, _ = self.make(sections=5, seed=3)
+        for name in sorted(os.listdir(a)):
+            with open(os.path.join(a, name)) as fa, open(os.path.join(b, name)) as fb:
+                self.assertEqual(fa.read(), fb.read(), name)
+
+    def test_knobs(self):
+        d, summary = self.make(sections=6, courses_per_section=5, baskets=1, basket_size=2, students=61, faculty_load=2)
+        self.assertEqual(summary["sections"], 6)
+        self.assertEqual(summary["students"], 61)
+        self.assertEqual(summary["courses"], 6 * (5 + 2))
+        sheets = load_manifest(os.path.join(d, "sections.json"))
+        self.assertEqual(sum(len(sh["sections"]) for sh in sheets), 6)
+
+    def test_timetable_runs_on_it(self):
+        d, _ = self.make(sections=4)
+        ds = timetable.load_dataset(d)
+        for sh in load_manifest(ds.manifest_path):
+            for sec in sh["sections"]:
+                first, second = timetable.split(ds.courses(sec["courses"]))
+                self.assertEqual(timetable.valid(first) + timetable.valid(second), [])
+        _, _, grids, _ = timetable.run(1, render=False, ds=ds)
+        self.assertEqual(len(grids), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
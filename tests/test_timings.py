@@ -0,0 +1,44 @@
+import unittest
+
+from timings import Timings, phase
+
+
+class TestTimings(unittest.TestCase):
+
+    def test_records_phases(self):
+        t = Timings()
+        with phase(t, "CSE-V First Half", "regular"):
+            pass
+        with phase(t, "CSE-V Second Half", "regular"):
+            pass
+        with phase(t, "CSE-V Timetable", "merge_and_color"):
+            pass
+        self.assertEqual([(s, p) for s, p, _ in t.rows], [("CSE-V First Half", "regular"), ("CSE-V Second Half", "regular"), ("CSE-V Timetable", "merge_and_color")])
+        d = t.to_dict()
+        self.assertEqual(sorted(d["totals"]), ["merge_and_color", "regular"])
+        self.assertEqual(len(d["phases"]), 3)
+
+    def test_off_records_nothing(self):
+        with phase(None, "x", "y") as p:
+            self.assertIsNone(p)
+
+    def test_exception_still_recorded(self):
+        t = Timings()
+        with self.assertRaises(ValueError):
+            with phase(t, "x", "y"):
+                raise ValueError
+        self.assertEqual(len(t.rows), 1)
+
+    def test_write_sheet(self):
+        from openpyxl import Workbook
+        t = Timings()
+        with phase(t, "A", "legend"):
+            pass
+        ws = t.write_sheet(Workbook())
+        rows = list(ws.values)
+        self.assertEqual(rows[0], ("Section", "Phase", "Seconds"))
+        self.assertEqual(rows[1][:2], ("A", "legend"))
+
+
+if __name__ == "__main__":
+    unittest.main()
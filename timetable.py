@@ -1,13 +1,21 @@
-import pandas as pd
 import json
+import math
+import os
 import random
 import re
 import time
 import argparse
-from openpyxl import Workbook
-from openpyxl.styles import Alignment, Font, PatternFill, Border, Side
+from functools import partial
+from occupancy import SectionGrid, RoomCatalog, FacultyLedger, faculty_key, split_faculty
+from manifest import load_manifest
+from timings import Timings, phase
+from counters import Counters
+from schedule import Schedule, LEGEND_HEADERS, grid_row, load_schedule
 
-random.seed(42)
+# pandas and openpyxl are imported inside the functions that read CSVs or render a workbook, so importing
+# this module stays cheap for callers that only want the solver helpers.
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
 
 days = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday"]
 excluded = ["07:30-09:00", "10:30-10:45", "13:15-14:00","17:30-18:30"]
@@ -19,62 +27,89 @@ colors = [
     "E8BAFF","BAFFD6","FFF2BA","DAD7FF","BFFFE1","FFDAB8","E2FFBA","BAF7FF"
 ]
 
-thin = Border(left=Side(style='thin'), right=Side(style='thin'),
-              top=Side(style='thin'), bottom=Side(style='thin'))
-
-with open("data/time_slots.json") as f:
-    slots = json.load(f)["time_slots"]
+def thin_border():
+    from openpyxl.styles import Border, Side
+    return Border(left=Side(style='thin'), right=Side(style='thin'),
+                  top=Side(style='thin'), bottom=Side(style='thin'))
 
 def t2m(t):
     h, m = map(int, t.split(":"))
     return h*60 + m
 
-slots_norm = [
-    {
-        "key": f"{s['start']}-{s['end']}",
-        "start": s['start'],
-        "end": s['end'],
-        "dur": (t2m(s["end"]) - t2m(s["start"])) / 60.0
-    }
-    for s in slots
-]
-slots_norm.sort(key=lambda x: t2m(x["start"]))
-slot_keys = [s["key"] for s in slots_norm]
-slot_dur = {s["key"]: s["dur"] for s in slots_norm}
-
-coursesAI = pd.read_csv("data/coursesCSEA-I.csv").to_dict(orient="records")
-coursesBI = pd.read_csv("data/coursesCSEB-I.csv").to_dict(orient="records")
-coursesA  = pd.read_csv("data/coursesCSEA-III.csv").to_dict(orient="records")
-coursesB  = pd.read_csv("data/coursesCSEB-III.csv").to_dict(orient="records")
-coursesV  = pd.read_csv("data/coursesCSE-V.csv").to_dict(orient="records")
-coursesDSAI = pd.read_csv("data/coursesDSAI-III.csv").to_dict(orient="records")
-coursesECE  = pd.read_csv("data/coursesECE-III.csv").to_dict(orient="records")
-coursesVII  = pd.read_csv("data/courses7.csv").to_dict(orient="records")
-coursesDSAI_I = pd.read_csv("data/coursesDSAI-I.csv").to_dict(orient="records")
-coursesDSAI_V = pd.read_csv("data/coursesDSAI-V.csv").to_dict(orient="records")
-coursesECE_I  = pd.read_csv("data/coursesECE-I.csv").to_dict(orient="records")
-coursesECE_V  = pd.read_csv("data/coursesECE-V.csv").to_dict(orient="records")
-
-rooms = pd.read_csv("data/rooms.csv")
-rooms["Room_ID"] = rooms["Room_ID"].astype(str).str.strip()
-cls = rooms[rooms["Room_ID"].str.startswith('C')].copy()
-labs = rooms[rooms["Room_ID"].str.startswith('L')].copy()
-
-try:
-    reg = pd.read_csv("registrations.csv")
-    reg.set_index("Course_Code", inplace=True)
-except Exception:
-    reg = None
-
-def regd(c):
+class Dataset:
+    """Inputs of one institute: the slot grid, rooms, optional registrations and the course CSVs.
+
+    Course records are read on first use and cached, so repeated runs on one dataset share the same dicts.
+    """
+
+    def __init__(self, data_dir, slot_keys, slot_dur, room_catalog, reg=None):
+        self.data_dir = data_dir
+        self.slot_keys = slot_keys
+        self.slot_dur = slot_dur
+        self.room_catalog = room_catalog
+        self.reg = reg
+        self.manifest_path = os.path.join(data_dir, "sections.json")
+        self.course_tables = {}
+
+    def course_csv(self, fname):
+        return os.path.join(self.data_dir, fname)
+
+    def courses(self, fname):
+        if fname not in self.course_tables:
+            import pandas as pd
+            self.course_tables[fname] = pd.read_csv(self.course_csv(fname)).to_dict(orient="records")
+        return self.course_tables[fname]
+
+    def new_grid(self):
+        return SectionGrid(days, self.slot_keys, excluded, self.slot_dur)
+
+def load_dataset(data_dir=DATA_DIR, registrations=None):
+    import pandas as pd
+    with open(os.path.join(data_dir, "time_slots.json")) as f:
+        slots = json.load(f)["time_slots"]
+    slots_norm = [
+        {
+            "key": f"{s['start']}-{s['end']}",
+            "start": s['start'],
+            "end": s['end'],
+            "dur": (t2m(s["end"]) - t2m(s["start"])) / 60.0
+        }
+        for s in slots
+    ]
+    slots_norm.sort(key=lambda x: t2m(x["start"]))
+    slot_keys = [s["key"] for s in slots_norm]
+    slot_dur = {s["key"]: s["dur"] for s in slots_norm}
+
+    rooms = pd.read_csv(os.path.join(data_dir, "rooms.csv"))
+    rooms["Room_ID"] = rooms["Room_ID"].astype(str).str.strip()
+
+    # registrations.csv lives next to the data directory, where the scripts have always looked for it.
+    if registrations is None:
+        registrations = os.path.join(os.path.dirname(os.path.abspath(data_dir)), "registrations.csv")
     try:
-        return int(reg.at[c, "Registered"])
+        reg = pd.read_csv(registrations)
+        reg.set_index("Course_Code", inplace=True)
+    except Exception:
+        reg = None
+    return Dataset(data_dir, slot_keys, slot_dur, RoomCatalog(rooms["Room_ID"]), reg)
+
+datasets = {}
+
+def cached_dataset(data_dir=DATA_DIR):
+    # One load per process and data directory; seed-search workers reuse it across seeds.
+    if data_dir not in datasets:
+        datasets[data_dir] = load_dataset(data_dir)
+    return datasets[data_dir]
+
+def regd(ds, c):
+    try:
+        return int(ds.reg.at[c, "Registered"])
     except Exception:
         return 0
 
 def s(v):
     if v is None: return ""
-    if isinstance(v, float) and pd.isna(v): return ""
+    if isinstance(v, float) and math.isnan(v): return ""
     return str(v).strip()
 
 def ltp(sv):
@@ -86,6 +121,18 @@ def ltp(sv):
         p.append("0")
     return list(map(int, p[:5]))
 
+def chunks(L, T, P):
+    # (hours, type) chunks of a course, as every placer splits them: 1.5h lectures, 1h tutorials, labs of 2h
+    # where possible; a remainder below a chunk still gets a whole chunk.
+    out = []
+    for h, typ, sizes in ((L, "L", (1.5,)), (T, "T", ()), (P, "P", (2.0, 1.5))):
+        rem = float(h)
+        while rem > 1e-9:
+            a = next((x for x in sizes if rem >= x), 1.0)
+            out.append((a, typ))
+            rem -= a
+    return out
+
 pat = re.compile(r"^[A-Z]{1,5}\d{0,3}([+/\\-][A-Z]{1,5}\d{0,3})*$", re.I)
 def valid(c):
     codes_all, codes_core, err = [], [], []
@@ -117,59 +164,57 @@ lab_prefix_for_class_prefix = {
     "C4": "L4",
 }
 
-def room_candidates(lab=False, prefix=None, lab_prefix=None):
-    df = labs if lab else cls
-    if df.empty:
-        return []
-    cand = df.copy()
-    if prefix:
-        c = cand[cand['Room_ID'].str.upper().str.startswith(prefix.upper())]
-        if not c.empty:
-            cand = c
-        else:
-            cand = df.copy()
-    if lab and lab_prefix:
-        c = cand[cand['Room_ID'].str.upper().str.startswith(lab_prefix.upper())]
-        if not c.empty:
-            cand = c
-    return cand["Room_ID"].tolist()
-
-def pick_room_for_slots(candidates, day, slots_to_use, room_busy, rr_state_key=None, rr_state=None):
-    if not candidates:
-        return None
-    ordered = candidates
-    if rr_state is not None and rr_state_key is not None and len(candidates) > 0:
-        idx = rr_state.get(rr_state_key, 0) % len(candidates)
-        ordered = candidates[idx:] + candidates[:idx]
-    for cand in ordered:
-        used = room_busy.get(day, {}).get(cand, set())
-        if not (set(slots_to_use) & used):
-            if rr_state is not None and rr_state_key is not None and len(candidates) > 0:
-                rr_state[rr_state_key] = (rr_state.get(rr_state_key, 0) + 1) % len(candidates)
-            return cand
-    return None
+def room_candidates(ds, lab=False, prefix=None, lab_prefix=None):
+    return ds.room_catalog.candidates(lab, prefix, lab_prefix)
+
+def pick_room_for_slots(candidates, day, slot_mask, room_busy, rr_state_key=None, rr_state=None, stats=None):
+    if stats is None:
+        return RoomCatalog.first_free(candidates, room_busy.get(day, {}), slot_mask, rr_state_key, rr_state)
+    r, k = RoomCatalog.first_free_at(candidates, room_busy.get(day, {}), slot_mask, rr_state_key, rr_state)
+    stats.calls["pick_room_for_slots"] += 1
+    # Candidates probed and found busy before the pick; all of them when nothing was free.
+    stats.calls["room_probe_failures"] += k
+    return r
+
+def reserve_room(room_busy, day, r, slot_mask):
+    day_busy = room_busy.setdefault(day, {})
+    day_busy[r] = day_busy.get(r, 0) | slot_mask
+
+def new_grid(ds):
+    return ds.new_grid()
 
 def free(tt, d, ex=False):
-    fb, b = [], []
-    for s_ in slot_keys:
-        if not ex and s_ in excluded:
-            if b:
-                fb.append(b); b = []
-            continue
-        if tt.at[d, s_] == "":
-            b.append(s_)
-        else:
-            if b:
-                fb.append(b); b = []
-    if b: fb.append(b)
-    return fb
+    return tt.blocks(d, ex)
 
-def alloc_specific(tt, busy, rm, room_busy, day, slots_to_use, f, code, typ, elec, labsd, course_usage,
-                   class_prefix=None, rr_state=None,hide_c004=False):
+def cell_text(code, typ, r=None, elec=False, combined=False, hide_c004=False):
+    # What a grid cell shows for a chunk: the code, a T for tutorials, and the room (C004 for a combined course
+    # unless hide_c004) except for electives and labs of combined courses.
+    if combined:
+        if typ == "P":
+            return f"{code} (Lab)"
+        if hide_c004:
+            return f"{code}T" if typ == "T" else code
+        return f"{code}T (C004)" if typ == "T" else f"{code} (C004)"
+    if r and not elec:
+        return {"L": f"{code} ({r})", "T": f"{code}T ({r})", "P": f"{code} (Lab-{r})"}[typ]
+    if elec and typ == "P":
+        return f"{code}(Lab)"
+    return f"{code}T" if typ == "T" else code
+
+def alloc_specific(ds, tt, busy, rm, room_busy, day, slots_to_use, f, code, typ, elec, labsd, course_usage,
+                   class_prefix=None, rr_state=None,hide_c004=False, layers=0b11, stats=None):
+    if stats is not None:
+        stats.calls["alloc_specific"] += 1
     for s_ in slots_to_use:
-        if s_ not in slot_keys or tt.at[day, s_] != "":
+        if s_ not in tt.index:
+            if stats is not None: stats.reject("unknown_slot", code)
             return False
-            
+    m = tt.mask_of(slots_to_use)
+    if not tt.is_free(day, m):
+        if stats is not None: stats.reject("section_busy", code)
+        return False
+    om = tt.layered(m, layers)
+
     if code not in course_usage[day]:
         course_usage[day][code] = {"L":0,"T":0,"P":0}
 
@@ -179,9 +224,11 @@ def alloc_specific(tt, busy, rm, room_busy, day, slots_to_use, f, code, typ, ele
     else:
         if typ == "P":
             if usage["P"] >= 1:
+                if stats is not None: stats.reject("usage_cap", code)
                 return False
         else:
             if (usage["L"] + usage["T"]) >= 1:
+                if stats is not None: stats.reject("usage_cap", code)
                 return False
     r = None
     if not elec:
@@ -189,8 +236,8 @@ def alloc_specific(tt, busy, rm, room_busy, day, slots_to_use, f, code, typ, ele
         if key in rm:
             candidate = rm[key]
             if candidate != "C004": 
-                used = room_busy.get(day, {}).get(candidate, set())
-                if set(slots_to_use) & used:
+                if room_busy.get(day, {}).get(candidate, 0) & om:
+                    if stats is not None: stats.reject("room_busy", code)
                     return False
             r = candidate
         else:
@@ -198,60 +245,32 @@ def alloc_specific(tt, busy, rm, room_busy, day, slots_to_use, f, code, typ, ele
                 r = None
             elif typ == "P":
                 lab_pref = lab_prefix_for_class_prefix.get(class_prefix, None)
-                candidates = room_candidates(lab=True, prefix=None, lab_prefix=lab_pref)
+                candidates = room_candidates(ds, lab=True, prefix=None, lab_prefix=lab_pref)
             else:
-                candidates = room_candidates(lab=False, prefix=class_prefix, lab_prefix=None)
-            r = pick_room_for_slots(candidates, day, slots_to_use, room_busy, rr_state_key=class_prefix, rr_state=rr_state)
+                candidates = room_candidates(ds, lab=False, prefix=class_prefix, lab_prefix=None)
+            r = pick_room_for_slots(candidates, day, om, room_busy, rr_state_key=class_prefix, rr_state=rr_state, stats=stats)
             if r is None:
+                if stats is not None: stats.reject("room_busy", code)
                 return False
             rm[key] = r
 
-    for s_ in slots_to_use:
-        if is_combined_course(code, rm):
-            if hide_c004:
-                if typ == "P":
-                    v = f"{code} (Lab)"
-                elif typ == "T":
-                    v = f"{code}T"
-                else:
-                    v = f"{code}"
-            else:
-                if typ == "P":
-                    v = f"{code} (Lab)"
-                elif typ == "T":
-                    v = f"{code}T (C004)"
-                else:
-                    v = f"{code} (C004)"
-        else:
-            if r and not elec:
-                if elec and typ == "P":
-                    v = f"{code}(Lab)"
-                elif typ == "T": 
-                    v = f"{code}T ({r})"
-                elif typ == "P": 
-                    v = f"{code} (Lab-{r})"
-                else: 
-                    v = f"{code} ({r})"
-            else:
-                if elec and typ == "P":
-                    v = f"{code}(Lab)"
-                elif typ == "T":
-                    v = f"{code}T"
-                else:
-                    v = code
-        tt.at[day, s_] = v
+    v = cell_text(code, typ, r, elec, is_combined_course(code, rm), hide_c004)
+    tt.put(day, slots_to_use, v)
+    tt.record(day, slots_to_use, v, code, typ, r, f or None)
 
     if f:
-        busy[day].setdefault(f, set()).update(slots_to_use)
+        busy.reserve(f, day, om)
     if r:
-        room_busy.setdefault(day, {}).setdefault(r, set()).update(slots_to_use)
+        reserve_room(room_busy, day, r, om)
     if typ == "P":
         labsd.add(day)
     course_usage[day][code][typ] += 1
     return True
 
-def alloc(tt, busy, rm, room_busy, d, f, code, h, typ="L", elec=False, labsd=set(), ex=False,
-          preferred_slots=None, course_usage=None, class_prefix=None, rr_state=None,hide_c004=False):
+def alloc(ds, tt, busy, rm, room_busy, d, f, code, h, typ="L", elec=False, labsd=set(), ex=False,
+          preferred_slots=None, course_usage=None, class_prefix=None, rr_state=None,hide_c004=False, layers=0b11, stats=None):
+    if stats is not None:
+        stats.calls["alloc"] += 1
     if course_usage is None:
         course_usage = {dd:{} for dd in days}
     if code not in course_usage[d]:
@@ -262,91 +281,67 @@ def alloc(tt, busy, rm, room_busy, d, f, code, h, typ="L", elec=False, labsd=set
     if typ == "P":
 
         if usage["P"] >= 1: 
+            if stats is not None: stats.reject("usage_cap", code)
             return False
     else:
         if (usage["L"] + usage["T"]) >= 1: 
+            if stats is not None: stats.reject("usage_cap", code)
             return False
 
     if preferred_slots:
         pref_day, pref_slots = preferred_slots
         if pref_day == d:
-            total = sum(slot_dur[s] for s in pref_slots)
+            total = sum(ds.slot_dur[s] for s in pref_slots)
             if total + 1e-9 >= h:
-                if alloc_specific(tt, busy, rm, room_busy, pref_day, pref_slots, f, code, typ, elec, labsd, course_usage, class_prefix=class_prefix, rr_state=rr_state,hide_c004=hide_c004):
+                if alloc_specific(ds, tt, busy, rm, room_busy, pref_day, pref_slots, f, code, typ, elec, labsd, course_usage, class_prefix=class_prefix, rr_state=rr_state,hide_c004=hide_c004, layers=layers, stats=stats):
                     return True
 
-    for blk in free(tt, d, ex):
-        if sum(slot_dur[s] for s in blk) + 1e-9 < h: continue
+    for blk in tt.blocks_at_least(d, h, ex):
+        if stats is not None:
+            stats.calls["free_blocks_scanned"] += 1
         use = []; dur = 0.0
         for s_ in blk:
-            use.append(s_); dur += slot_dur[s_]
+            use.append(s_); dur += ds.slot_dur[s_]
             if dur + 1e-9 >= h: break
-        if not ex and any(s_ in excluded for s_ in use): continue
-        if f and f in busy[d] and (set(use) & busy[d][f]): continue
+        m = tt.mask_of(use)
+        om = tt.layered(m, layers)
+        if f and not busy.is_free(f, d, om):
+            if stats is not None: stats.reject("faculty_busy", code)
+            continue
 
         if not elec:
             key = (code, typ)
             if key in rm:
                 r = rm[key]
                 if r != "C004":
-                    used = room_busy.get(d, {}).get(r, set())
-                    if set(use) & used:
+                    if room_busy.get(d, {}).get(r, 0) & om:
+                        if stats is not None: stats.reject("room_busy", code)
                         continue
             else:
                 if typ == "P" and elec:
                     r = None
                 elif typ == "P":
                     lab_pref = lab_prefix_for_class_prefix.get(class_prefix, None)
-                    candidates = room_candidates(lab=True, prefix=None, lab_prefix=lab_pref)
-                    r = pick_room_for_slots(candidates, d, use, room_busy, rr_state_key=lab_pref, rr_state=rr_state)
+                    candidates = room_candidates(ds, lab=True, prefix=None, lab_prefix=lab_pref)
+                    r = pick_room_for_slots(candidates, d, om, room_busy, rr_state_key=lab_pref, rr_state=rr_state, stats=stats)
                 else:
-                    candidates = room_candidates(lab=False, prefix=class_prefix, lab_prefix=None)
-                    r = pick_room_for_slots(candidates, d, use, room_busy, rr_state_key=class_prefix, rr_state=rr_state)
+                    candidates = room_candidates(ds, lab=False, prefix=class_prefix, lab_prefix=None)
+                    r = pick_room_for_slots(candidates, d, om, room_busy, rr_state_key=class_prefix, rr_state=rr_state, stats=stats)
                 
                 if r is None:
+                    if stats is not None: stats.reject("room_busy", code)
                     continue
                 rm[(code, typ)] = r
         else:
             r = None
 
-        for s_ in use:
-            if is_combined_course(code, rm):
-                if hide_c004:
-                    if typ == "P":
-                        v = f"{code}(Lab)"
-                    elif typ == "T":
-                        v = f"{code}T"
-                    else:
-                        v = f"{code}"
-                else:
-                    if typ == "P":
-                        v = f"{code} (Lab)"
-                    elif typ == "T":
-                        v = f"{code}T (C004)"
-                    else:
-                        v = f"{code} (C004)"
-            else:
-                if r and not elec:
-                    if elec and typ == "P":
-                        v = f"{code}(Lab)"
-                    elif typ == "T": 
-                        v = f"{code}T ({r})"
-                    elif typ == "P": 
-                        v = f"{code} (Lab-{r})"
-                    else: 
-                        v = f"{code} ({r})"
-                else:
-                    if elec and typ == "P":
-                        v = f"{code}(Lab)"
-                    elif typ == "T":
-                        v = f"{code}T"
-                    else:
-                        v = code
-            tt.at[d, s_] = v
+        v = cell_text(code, typ, r, elec, is_combined_course(code, rm), hide_c004)
+        tt.put(d, use, v)
+        tt.record(d, use, v, code, typ, r, f or None)
         if f:
-            busy[d].setdefault(f, set()).update(use)
+            busy.reserve(f, d, om)
         if r:
-            room_busy.setdefault(d, {}).setdefault(r, set()).update(use)
+            reserve_room(room_busy, d, r, om)
         if typ == "P":
             labsd.add(d)
         course_usage[d][code][typ] += 1
@@ -357,17 +352,15 @@ def alloc(tt, busy, rm, room_busy, d, f, code, h, typ="L", elec=False, labsd=set
 def get_all_valid_free_slots(tt):
     valid = []
     for d in reversed(days):
-        for s_ in reversed(slot_keys):
-            if s_ in excluded: continue
-            if tt.at[d, s_] == "": valid.append((d, s_))
+        for s_ in reversed(tt.keys_of(tt.free_mask(d))):
+            valid.append((d, s_))
     return valid
 
 def get_all_excluded_free_slots(tt):
     exs = []
     for d in reversed(days):
-        for s_ in reversed(slot_keys):
-            if s_ not in excluded: continue
-            if tt.at[d, s_] == "": exs.append((d, s_))
+        for s_ in reversed(tt.keys_of(tt.free_mask(d, True) & tt.excluded_mask)):
+            exs.append((d, s_))
     return exs
 
 def extract_contiguous_blocks(slot_list):
@@ -383,25 +376,27 @@ def extract_contiguous_blocks(slot_list):
         blocks.append((cur_day, cur_slots))
     return blocks
 
-def try_allocate_chunk_from_block(tt, busy, rm, room_busy, labsd, course_usage,
-                                  code, faculty, typ, need, day, slots, class_prefix=None, rr_state=None,hide_c004=False):
+def try_allocate_chunk_from_block(ds, tt, busy, rm, room_busy, labsd, course_usage,
+                                  code, faculty, typ, need, day, slots, class_prefix=None, rr_state=None,hide_c004=False, layers=0b11, stats=None):
+    if stats is not None:
+        stats.calls["try_allocate_chunk_from_block"] += 1
     n = len(slots)
     for i in range(n):
         accum = 0.0; sub = []
         for j in range(i, n):
-            sub.append(slots[j]); accum += slot_dur[slots[j]]
+            sub.append(slots[j]); accum += ds.slot_dur[slots[j]]
             if accum + 1e-9 >= need:
-                for s_ in sub:
-                    if tt.at[day, s_] != "": break
-                else:
-                    ok = alloc_specific(tt, busy, rm, room_busy, day, sub, faculty, code, typ, False, labsd, course_usage, class_prefix=class_prefix, rr_state=rr_state,hide_c004=hide_c004)
+                if tt.is_free(day, tt.mask_of(sub)):
+                    ok = alloc_specific(ds, tt, busy, rm, room_busy, day, sub, faculty, code, typ, False, labsd, course_usage, class_prefix=class_prefix, rr_state=rr_state,hide_c004=hide_c004, layers=layers, stats=stats)
                     if ok:
                         new_slots = slots[:i] + slots[j+1:]
                         return new_slots
+                elif stats is not None:
+                    stats.reject("section_busy", code)
                 break
     return None
 
-def assign_combined_precise_durations(tt, busy, rm, room_busy, labsd, course_usage, combined_core, rr_state=None,hide_c004=False):
+def assign_combined_precise_durations(ds, tt, busy, rm, room_busy, labsd, course_usage, combined_core, rr_state=None,hide_c004=False, half=None, spans=None, stats=None, pinned=False):
     if not combined_core:
         return []
     combined_list = []
@@ -413,25 +408,7 @@ def assign_combined_precise_durations(tt, busy, rm, room_busy, labsd, course_usa
         rm[(code, "T")] = "C004"
         rm[(code, "P")] = "C004"
         L, T, P, _, _ = ltp(c.get("L-T-P-S-C", "0-0-0-0-0"))
-        ch = []
-        rem = float(L)
-        while rem > 1e-9:
-            if rem >= 1.5:
-                ch.append((1.5, "L")); rem -= 1.5
-            else:
-                ch.append((1.0, "L")); rem -= 1.0
-        rem = float(T)
-        while rem > 1e-9:
-            ch.append((1.0, "T")); rem -= 1.0
-        rem = float(P)
-        while rem > 1e-9:
-            if rem >= 2.0:
-                ch.append((2.0, "P")); rem -= 2.0
-            elif rem >= 1.5:
-                ch.append((1.5, "P")); rem -= 1.5
-            else:
-                ch.append((1.0, "P")); rem -= 1.0
-        chunks_map[code] = sorted(ch, key=lambda x: -x[0])
+        chunks_map[code] = sorted(chunks(L, T, P), key=lambda x: -x[0])
         combined_list.append((code, c))
     valid_slots = get_all_valid_free_slots(tt)
     valid_blocks = extract_contiguous_blocks(valid_slots)
@@ -440,88 +417,117 @@ def assign_combined_precise_durations(tt, busy, rm, room_busy, labsd, course_usa
     placed = []
 
     for code, c in combined_list:
-        chunks = chunks_map[code]; faculty = s(c.get("Faculty", ""))
-        days_used = set()
-        for need, typ in chunks:
+        faculty = s(c.get("Faculty", "")); layers = course_layers(c, half, pinned)
+        days_used = set(); before = dict(tt.busy)
+        for need, typ in chunks_map[code]:
+            if stats is not None:
+                stats.attempts[code] += 1
             allocated = False
             for idx, (day, slots) in enumerate(valid_blocks):
                 if day in days_used: continue
-                new_slots = try_allocate_chunk_from_block(tt, busy, rm, room_busy, labsd, course_usage,
+                new_slots = try_allocate_chunk_from_block(ds, tt, busy, rm, room_busy, labsd, course_usage,
                                                           code, faculty, typ, need, day, slots,
-                                                          class_prefix="C0", rr_state=rr_state,hide_c004=hide_c004)
+                                                          class_prefix="C0", rr_state=rr_state,hide_c004=hide_c004, layers=layers, stats=stats)
                 if new_slots is not None:
                     valid_blocks[idx] = (day, new_slots); days_used.add(day); allocated = True; break
             if not allocated:
                 for idx, (day, slots) in enumerate(excluded_blocks):
                     if day in days_used: continue
-                    new_slots = try_allocate_chunk_from_block(tt, busy, rm, room_busy, labsd, course_usage,
+                    new_slots = try_allocate_chunk_from_block(ds, tt, busy, rm, room_busy, labsd, course_usage,
                                                               code, faculty, typ, need, day, slots,
-                                                              class_prefix="C0", rr_state=rr_state,hide_c004=hide_c004)
+                                                              class_prefix="C0", rr_state=rr_state,hide_c004=hide_c004, layers=layers, stats=stats)
                     if new_slots is not None:
                         excluded_blocks[idx] = (day, new_slots); days_used.add(day); allocated = True; break
+        if spans is not None:
+            spans[code] = grown(tt, before)
         placed.append(code)
     return placed
 
-color_avail = colors.copy(); random.shuffle(color_avail); color_map = {}
-def get_color_for_course(course_code):
-    k = course_code.strip().upper()
-    if k == "": return None
-    if k not in color_map:
-        if color_avail: color_map[k] = color_avail.pop()
-        else: color_map[k] = "CCCCCC"
-    return color_map[k]
-
-def merge_and_color(ws, courses):
-    sc = 2; mc = ws.max_column; mr = ws.max_row
-    valid_course_codes = {s(x.get("Course_Code","")).replace("T","").strip().upper() for x in courses if s(x.get("Course_Code",""))}
-    valid_course_codes |= {f"ELECTIVE{i}" for i in range(1,60)}
-    for col in range(2, mc+1):
-        cell = ws.cell(2, col)
-        cell.font = Font(bold=True)
-        cell.alignment = Alignment(horizontal="center", vertical="center")
-        cell.border = thin
-    for r in range(3, mr+1):
-        c = sc
-        while c <= mc:
-            raw = ws.cell(r, c).value
-            if raw is None or str(raw).strip() == "":
-                ws.cell(r, c).border = thin; c += 1; continue
-            val = str(raw).strip(); merge_cols = [c]
-            if "(" in val:
-                if "Lab" in val: expected = 2.0
-                elif val.endswith("T") or "T " in val or "T(" in val: expected = 1.0
-                else: expected = 1.5
-            else: expected = 1.5
-            slot_index = c - sc; total = 0.0
-            if 0 <= slot_index < len(slot_keys):
-                total = slot_dur[slot_keys[slot_index]]
-            next_col = c + 1
-            while next_col <= mc:
-                next_raw = ws.cell(r, next_col).value
-                next_val = str(next_raw).strip() if next_raw is not None else ""
-                if next_val == val:
-                    sn_idx = next_col - sc
-                    if 0 <= sn_idx < len(slot_keys):
-                        total += slot_dur[slot_keys[sn_idx]]
-                    merge_cols.append(next_col)
-                    if total + 1e-9 >= expected: break
-                    next_col += 1
-                else: break
-            if len(merge_cols) > 1:
-                ws.merge_cells(start_row=r, start_column=merge_cols[0], end_row=r, end_column=merge_cols[-1])
-            cell = ws.cell(r, merge_cols[0])
-            cell.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-            cell.font = Font(bold=True)
-            raw_course_name = val.split()[0] if val.split() else val
-            raw_course_name = raw_course_name.replace("T","").replace("(","").strip().upper()
-            fill_color = get_color_for_course(raw_course_name) if (raw_course_name in valid_course_codes or raw_course_name.startswith("ELECTIVE")) else None
-            for cc_ in merge_cols:
-                cell_ref = ws.cell(r, cc_)
-                cell_ref.border = thin
-                cell_ref.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
-                cell_ref.font = Font(bold=True)
-                if fill_color: cell_ref.fill = PatternFill(start_color=fill_color, end_color=fill_color, fill_type="solid")
-            c = merge_cols[-1] + 1
+def grown(tt, before):
+    # Slots taken on each day since the busy snapshot `before`.
+    return {d: tt.busy[d] & ~before[d] for d in days if tt.busy[d] & ~before[d]}
+
+# Runs without --seed solve this fixed seed, the one earlier versions drew after random.seed(42), so they stay reproducible.
+DEFAULT_SEED = 732052
+COLOR_SEED = 42
+
+def section_rng(seed, label):
+    # One stream per (run seed, section), so a section draws the same numbers however sections are ordered or split.
+    return random.Random(f"{seed}/{label}")
+
+def color_picker(rng=None):
+    # Course code -> fill colour, popped from a shuffled palette in the order codes are first asked for; one
+    # picker per workbook keeps a course's colour the same on every sheet.
+    avail = list(colors)
+    (rng or random.Random(COLOR_SEED)).shuffle(avail)
+    picked = {}
+    def color_of(course_code):
+        k = course_code.strip().upper()
+        if k == "": return None
+        if k not in picked:
+            picked[k] = avail.pop() if avail else "CCCCCC"
+        return picked[k]
+    return color_of
+
+def write_half(ds, ws, half):
+    # Returns the row of the "Day" header; the day rows follow it in `days` order.
+    from openpyxl.styles import Font
+    ws.append([""]); ws.append([half["label"]])
+    ws.cell(row=ws.max_row, column=1).font = Font(bold=True, size=12)
+    ws.append(["Day"] + ds.slot_keys)
+    top = ws.max_row
+    for d in days:
+        ws.append([d] + grid_row(half["placements"], d, len(ds.slot_keys)))
+    ws.append([""])
+    return top
+
+def named_style(wb, name, fill=None, header=False):
+    # Cells take a registered named style in one assignment, instead of separate font/alignment/border/fill
+    # objects that openpyxl has to hash and intern per cell.
+    from openpyxl.styles import Alignment, Font, NamedStyle, PatternFill
+    from openpyxl.styles.fonts import DEFAULT_FONT
+    if name not in wb.named_styles:
+        st = NamedStyle(name=name, font=DEFAULT_FONT, border=thin_border())
+        if fill or header:
+            st.font = Font(bold=True)
+            st.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True)
+        if fill:
+            st.fill = PatternFill(start_color=fill, end_color=fill, fill_type="solid")
+        wb.add_named_style(st)
+    return name
+
+def merge_and_color(ds, ws, grids, color_of=None):
+    # grids is [(header_row, half)] as returned by write_half. Merges and fills come from the placements'
+    # slot spans, so the cost follows the number of placements rather than a scan of every cell's neighbours.
+    if ws is None:
+        return
+    wb = ws.parent
+    color_of = color_of or color_picker()
+    day_row = {d: i + 1 for i, d in enumerate(days)}
+    placed = []
+    for top, half in grids:
+        for p in sorted(half["placements"], key=lambda p: (day_row[p.day], p.start)):
+            r = top + day_row[p.day]
+            # Merge while the cells are still unstyled: openpyxl re-borders the whole range of a merge whose
+            # first cell already has a border.
+            if p.end - p.start > 1:
+                ws.merge_cells(start_row=r, start_column=p.start + 2, end_row=r, end_column=p.end + 1)
+            placed.append((r, p))
+    for r, p in placed:
+        color = color_of(p.code)
+        name = named_style(wb, f"Timetable {color}", fill=color) if color else named_style(wb, "Timetable Header", header=True)
+        for col in range(p.start + 2, p.end + 2):
+            ws.cell(r, col).style = name
+    header = named_style(wb, "Timetable Header", header=True)
+    for top, _ in grids:
+        for cell in ws[top][1:len(ds.slot_keys) + 1]:
+            cell.style = header
+    grid = named_style(wb, "Timetable Grid")
+    mc = ws.max_column
+    for row in ws.iter_rows(min_row=2, min_col=2, max_col=mc):
+        for cell in row:
+            if not cell.has_style:
+                cell.style = grid
     for col in ws.columns:
         maxl = 0; cl = col[0].column_letter
         for cell in col:
@@ -530,16 +536,16 @@ def merge_and_color(ws, courses):
             maxl = max(maxl, len(str(v)))
         ws.column_dimensions[cl].width = min(maxl + 2 if maxl else 8, 60)
 
-def add_csv_legend_block(ws, csv_path, legend_title, room_prefix=None, elective_room_map=None):
+def legend_rows(ds, fname, elective_room_map=None, rng=None):
+    # Also picks a room for every elective not yet in elective_room_map, which later sections' electives reuse.
+    # The pick order is shuffled with rng, by default a stream of its own for the course CSV.
+    import pandas as pd
     if elective_room_map is None:
         elective_room_map = {}
+    if rng is None:
+        rng = section_rng(0, fname)
 
-    ws.append([""]); ws.append([""]); ws.append([f"Legend - {legend_title}"])
-    title_cell = ws.cell(row=ws.max_row, column=1)
-    title_cell.font = Font(bold=True, size=13)
-    title_cell.alignment = Alignment(horizontal="left", vertical="center")
-
-    df = pd.read_csv(csv_path)
+    df = pd.read_csv(ds.course_csv(fname))
     expect_cols = ["Course_Code", "Course_Title", "L-T-P-S-C", "Faculty", "Semester_Half", "Elective", "ElectiveBasket"]
     for ec in expect_cols:
         if ec not in df.columns:
@@ -569,10 +575,10 @@ def add_csv_legend_block(ws, csv_path, legend_title, room_prefix=None, elective_
     df["Semester_Half"] = df["Semester_Half"].apply(map_sem)
     df["Elective"] = df["Elective"].apply(map_elec)
 
-    all_classrooms = cls["Room_ID"].tolist()
+    all_classrooms = ds.room_catalog.classrooms
 
     master_pool = sorted(list(set(all_classrooms)))
-    random.shuffle(master_pool)
+    rng.shuffle(master_pool)
 
     elective_rooms = []
     for _, row in df.iterrows():
@@ -593,7 +599,7 @@ def add_csv_legend_block(ws, csv_path, legend_title, room_prefix=None, elective_
                 if candidates:
                     chosen = candidates[0]
                 else:
-                    chosen = random.choice(master_pool)
+                    chosen = rng.choice(master_pool)
                 
                 elective_room_map[sync_name] = chosen
 
@@ -602,40 +608,43 @@ def add_csv_legend_block(ws, csv_path, legend_title, room_prefix=None, elective_
             elective_rooms.append("")
 
     df["Elective Room"] = elective_rooms
+    return [[s(row["Course_Code"]), s(row["Course_Title"]), s(row["L-T-P-S-C"]), s(row["Faculty"]), s(row["Semester_Half"]),
+             s(row["Elective"]), s(row["ElectiveBasket"]), row["Elective Room"]] for _, row in df.iterrows()]
+
+def write_legend(ws, legend_title, rows):
+    from openpyxl.styles import Alignment, Font, PatternFill
+    thin = thin_border()
+
+    ws.append([""]); ws.append([""]); ws.append([f"Legend - {legend_title}"])
+    title_cell = ws.cell(row=ws.max_row, column=1)
+    title_cell.font = Font(bold=True, size=13)
+    title_cell.alignment = Alignment(horizontal="left", vertical="center")
+
+    ws.append(LEGEND_HEADERS); header_row = ws.max_row
+    for i, _h in enumerate(LEGEND_HEADERS, start=1):
+        c = ws.cell(header_row, i); c.font = Font(bold=True); c.alignment = Alignment(horizontal="center", vertical="center", wrap_text=i > 1); c.border = thin; c.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
 
-    headers = ["Course Code","Course Title","L-T-P-S-C","Faculty","Semester Half","Elective","Elective Basket","Elective Room"]
-
-    ws.append(headers); header_row = ws.max_row
-    for i, _h in enumerate(headers, start=1):
-        c = ws.cell(header_row, i); c.font = Font(bold=True); c.alignment = Alignment(horizontal="center", vertical="center"); c.border = thin; c.fill = PatternFill(start_color="D9D9D9", end_color="D9D9D9", fill_type="solid")
-
-    for idx, row in df.iterrows():
-        rowvals = [
-            s(row["Course_Code"]),
-            s(row["Course_Title"]),
-            s(row["L-T-P-S-C"]),
-            s(row["Faculty"]),
-            s(row["Semester_Half"]),
-            s(row["Elective"]),
-            s(row["ElectiveBasket"]),
-            row["Elective Room"]
-        ]
+    bold = Font(bold=True)
+    center = Alignment(horizontal="center", vertical="center", wrap_text=True)
+    for rowvals in rows:
         ws.append(rowvals)
-        for i in range(1, 8):
-            cc = ws.cell(ws.max_row, i); cc.alignment = Alignment(horizontal="center", vertical="center", wrap_text=True); cc.border = thin
+        for i, v in enumerate(rowvals, start=1):
+            cc = ws.cell(ws.max_row, i)
+            cc.border = thin
+            if i < 8 or v:
+                cc.alignment = center
+            if i > 1 and v:
+                cc.font = bold
     ws.append([""])
 
-def generate(courses, ws, label, seed, elective_sync, room_prefix=None, elective_room_map=None, room_busy_global=None,hide_c004=False):
+def generate(ds, courses, ws, label, seed, elective_sync, room_prefix=None, elective_room_map=None, room_busy_global=None, faculty_busy_global=None,hide_c004=False, grids=None, half=None, pinned=None, timings=None, counters=None, search="greedy", node_budget=None, deadline=None):
     if elective_room_map is None:
         elective_room_map = {}
     if valid(courses):
-        return ([], [])
-    
-    ws.append([""]); ws.append([label])
-    ws.cell(row=ws.max_row, column=1).font = Font(bold=True, size=12)
-    
-    tt = pd.DataFrame("", index=days, columns=slot_keys)
-    busy = {d:{} for d in days}
+        return ([], [], None)
+
+    tt = new_grid(ds)
+    busy = faculty_busy_global if faculty_busy_global is not None else FacultyLedger()
     
     if room_busy_global is not None:
         room_busy = room_busy_global
@@ -646,6 +655,7 @@ def generate(courses, ws, label, seed, elective_sync, room_prefix=None, elective
     labsd = set()
     course_usage = {d:{} for d in days}
     rr_state = {}
+    stats = counters.section(label) if counters is not None else None
 
     elec = [x for x in courses if s(x.get("Elective","")) == "1"]
     combined_core = [x for x in courses if s(x.get("Elective","")) != "1" and s(x.get("Is_Combined","0")) == "1"]
@@ -667,6 +677,7 @@ def generate(courses, ws, label, seed, elective_sync, room_prefix=None, elective
             "L-T-P-S-C": chosen.get("L-T-P-S-C","0-0-0-0-0"),
             "Elective": "1",
             "ElectiveBasket": b,
+            "Semester_Half": basket_half(group),
             "_sync_name": sync_identifier
         })
 
@@ -685,20 +696,43 @@ def generate(courses, ws, label, seed, elective_sync, room_prefix=None, elective
 
     failed = []
 
+    # pinned is shared by the two halves of one section: the first half records where its full-semester
+    # courses went, the second half copies those slots instead of searching for them again.
+    spans = {}
+    pinned_codes = set()
+    if pinned is not None and "grid" in pinned:
+        src = pinned["grid"]
+        for code, day_masks in pinned["spans"].items():
+            for d, m in day_masks.items():
+                for k in tt.keys_of(m):
+                    tt.put(d, [k], src.get(d, k))
+            pinned_codes.add(code)
+        tt.placements.extend(p for p in src.placements if p.code in pinned_codes)
+        failed.extend(dict(r, Label=label) for r in pinned["failed"])
+
     def place_course_list(course_list, start_idx_ref):
         placed_list = []
         for c in course_list:
             f = s(c.get("Faculty",""))
             code = s(c.get("Course_Code","UNKNOWN"))
+            if code in pinned_codes:
+                placed_list.append(c)
+                continue
+            before = dict(tt.busy)
             is_elec_flag = (code.startswith("Elective") or s(c.get("Elective","")) == "1")
+            layers = course_layers(c, half, pinned is not None)
             L, T, P, S, Cc = ltp(c.get("L-T-P-S-C","0-0-0-0-0"))
+            parts = chunks(L, T, P)
             for h, typ in [(L,"L"), (T,"T"), (P,"P")]:
+                sizes = [a for a, t in parts if t == typ]
                 attempts = 0
-                while h > 1e-9 and attempts < 400:
-                    if typ == "P":
-                        a = 2.0 if h >= 2 else (1.5 if h >= 1.5 else 1.0)
-                    else:
-                        a = 1.5 if h >= 1.5 else 1.0
+                while sizes and attempts < 400:
+                    # Past the deadline every chunk still gets one try; what is left goes to the report.
+                    if deadline is not None and attempts and time.time() > deadline:
+                        break
+                    if stats is not None:
+                        stats.attempts[code] += 1
+                    a = sizes[0]
                     placed = False
                     sync_name = c.get("_sync_name", None)
 
@@ -708,8 +742,8 @@ def generate(courses, ws, label, seed, elective_sync, room_prefix=None, elective
 
                     if sync_name and sync_name in elective_sync:
                         pref = elective_sync[sync_name]
-                        if alloc(tt, busy, rm, room_busy, pref["day"], f, code, a, typ, is_elec_flag, labsd, False, preferred_slots=(pref["day"], pref["slots"]), course_usage=course_usage, class_prefix=room_prefix, rr_state=rr_state,hide_c004=hide_c004):
-                            h -= a; placed = True
+                        if alloc(ds, tt, busy, rm, room_busy, pref["day"], f, code, a, typ, is_elec_flag, labsd, False, preferred_slots=(pref["day"], pref["slots"]), course_usage=course_usage, class_prefix=room_prefix, rr_state=rr_state,hide_c004=hide_c004, layers=layers, stats=stats):
+                            placed = True
 
                     if not placed:
                         for i in range(5):
@@ -720,22 +754,25 @@ def generate(courses, ws, label, seed, elective_sync, room_prefix=None, elective
                                 d_order = days[start_idx:] + days[:start_idx]
                                 start_idx_ref[0] = (start_idx_ref[0] + 1) % len(days)
                             for d in d_order:
-                                if alloc(tt, busy, rm, room_busy, d, f, code, a, typ, is_elec_flag, labsd, False, course_usage=course_usage, class_prefix=room_prefix, rr_state=rr_state,hide_c004=hide_c004):
-                                    h -= a; placed = True; break
+                                if alloc(ds, tt, busy, rm, room_busy, d, f, code, a, typ, is_elec_flag, labsd, False, course_usage=course_usage, class_prefix=room_prefix, rr_state=rr_state,hide_c004=hide_c004, layers=layers, stats=stats):
+                                    placed = True; break
                             if placed:
                                 break
                     if not placed:
                         for d in days:
-                            if alloc(tt, busy, rm, room_busy, d, f, code, a, typ, is_elec_flag, labsd, True, course_usage=course_usage, class_prefix=room_prefix, rr_state=rr_state,hide_c004=hide_c004):
-                                h -= a; placed = True; break
+                            if alloc(ds, tt, busy, rm, room_busy, d, f, code, a, typ, is_elec_flag, labsd, True, course_usage=course_usage, class_prefix=room_prefix, rr_state=rr_state,hide_c004=hide_c004, layers=layers, stats=stats):
+                                placed = True; break
+
+                    if placed:
+                        h -= a; del sizes[0]
 
                     if placed and sync_name and sync_name not in elective_sync:
                         for dcheck in days:
-                            slots_used = [s_ for s_ in slot_keys if tt.at[dcheck, s_].startswith(code)]
+                            slots_used = [s_ for s_, v in zip(ds.slot_keys, tt.labels[dcheck]) if v.startswith(code)]
                             if slots_used:
                                 accum = []; acc_dur = 0.0
                                 for s_ in slots_used:
-                                    accum.append(s_); acc_dur += slot_dur[s_]
+                                    accum.append(s_); acc_dur += ds.slot_dur[s_]
                                     if acc_dur + 1e-9 >= a:
                                         elective_sync[sync_name] = {"day": dcheck, "slots": accum.copy()}
                                         break
@@ -750,173 +787,380 @@ def generate(courses, ws, label, seed, elective_sync, room_prefix=None, elective
                         "Hours_Remaining": round(h, 2),
                         "Faculty": f
                     })
+            spans[code] = grown(tt, before)
             placed_list.append(c)
         return placed_list
 
-    start_idx_ref = [seed % len(days)]
+    def place_backtracking(course_list, start_idx_ref):
+        # Regular courses only: electives follow their sync group and combined courses their fixed hall.
+        import backtrack
+        todo = [c for c in course_list if s(c.get("Course_Code", "UNKNOWN")) not in pinned_codes]
+        bt = backtrack.Backtracker(ds, tt, busy, rm, room_busy, labsd, course_usage, room_prefix=room_prefix, rr_state=rr_state, hide_c004=hide_c004,
+                                   half=half, start_idx=start_idx_ref[0], node_budget=node_budget or backtrack.DEFAULT_NODE_BUDGET, stats=stats,
+                                   deadline=deadline, pinned=pinned is not None)
+        missing = {}
+        for ch in bt.place(todo):
+            row = missing.setdefault((ch.code, ch.typ), {"Label": label, "Course_Code": ch.code, "Type": ch.typ, "Hours_Remaining": 0.0, "Faculty": ch.faculty})
+            row["Hours_Remaining"] = round(row["Hours_Remaining"] + ch.hours, 2)
+        failed.extend(missing.values())
+        start_idx_ref[0] = (start_idx_ref[0] + len(todo)) % len(days)
+        own = {s(c.get("Course_Code", "UNKNOWN")): {} for c in todo}
+        spans.update(own)
+        for p in tt.placements:
+            if p.code in own:
+                by_day = own[p.code]
+                by_day[p.day] = by_day.get(p.day, 0) | ((1 << p.end) - (1 << p.start))
+        return list(course_list)
+
+    # The seed picks the half's first day and the order its regular courses are placed in, from a stream of the
+    # half's own, so every seed is a different search rather than one of len(days) day rotations.
+    order = section_rng(seed, label)
+    start_idx_ref = [order.randrange(len(days))]
+    regular_core = order.sample(regular_core, len(regular_core))
     elec_final.sort(key=lambda x: 0 if x.get("_sync_name") in elective_sync else 1)
     
-    priority_placed = place_course_list(elec_final, start_idx_ref)
+    with phase(timings, label, "electives"):
+        priority_placed = place_course_list(elec_final, start_idx_ref)
 
-    combined_placed = assign_combined_precise_durations(tt, busy, rm, room_busy, labsd, course_usage, combined_core, rr_state=rr_state, hide_c004=hide_c004)
+    combined_todo = [c for c in combined_core if s(c.get("Course_Code", "")) not in pinned_codes]
+    with phase(timings, label, "combined"):
+        combined_placed = assign_combined_precise_durations(ds, tt, busy, rm, room_busy, labsd, course_usage, combined_todo, rr_state=rr_state, hide_c004=hide_c004, half=half, spans=spans, stats=stats, pinned=pinned is not None)
 
-    regular_placed = place_course_list(regular_core, start_idx_ref)
-
-    ws.append(["Day"] + slot_keys)
-    for d in days:
-        ws.append([d] + [tt.at[d, s] for s in slot_keys])
-    ws.append([""])
-    return (priority_placed + regular_placed + combined_core), failed
+    with phase(timings, label, "regular"):
+        if search == "backtrack":
+            regular_placed = place_backtracking(regular_core, start_idx_ref)
+        else:
+            regular_placed = place_course_list(regular_core, start_idx_ref)
+
+    if pinned is not None and "grid" not in pinned:
+        full = {s(c.get("Course_Code", "")) for c in elec_final + combined_core + regular_core if s(c.get("Semester_Half", "")) == "0"}
+        pinned["grid"] = tt
+        pinned["spans"] = {code: m for code, m in spans.items() if code in full}
+        pinned["failed"] = [r for r in failed if r["Course_Code"] in full]
+    if grids is not None:
+        grids[label] = tt
+    placed = priority_placed + regular_placed + combined_core
+    section = {"label": label, "half": half, "codes": [s(c.get("Course_Code", "")) for c in placed], "placements": tt.placements}
+    if ws is not None:
+        with phase(timings, label, "grid_rows"):
+            write_half(ds, ws, section)
+    return placed, failed, section
 def split(c):
     f = [x for x in c if s(x.get("Semester_Half","")) in ["1","0"]]
     s2 = [x for x in c if s(x.get("Semester_Half","")) in ["2","0"]]
     return f, s2
 
+half_layers = {"1": 0b01, "2": 0b10}
+
+def course_layers(c, half=None, pinned=False):
+    # Occupancy layers a course holds in the shared room/faculty maps: its own half, or both for a full-semester
+    # course whose slots are pinned across the halves. Without a half every course holds both.
+    if half is None:
+        return 0b11
+    own = half_layers.get(s(c.get("Semester_Half", "")))
+    if own is not None:
+        return own
+    return 0b11 if pinned else half_layers.get(half, 0b11)
+
+def basket_half(group):
+    halves = {s(x.get("Semester_Half", "0")) for x in group}
+    return halves.pop() if len(halves) == 1 else "0"
+
+def section_resources(ds, sec):
+    # Everything generate() can contend for across sections: rooms it may pick, faculty it may book, its
+    # elective sync group and its combined courses. Elective rooms are never reserved, so they are left out.
+    res = {("sync", sec["sync"])}
+    lab_pref = lab_prefix_for_class_prefix.get(sec["room_prefix"], None)
+    for r in room_candidates(ds, lab=False, prefix=sec["room_prefix"]) + room_candidates(ds, lab=True, lab_prefix=lab_pref):
+        res.add(("room", r))
+    for c in ds.courses(sec["courses"]):
+        res.update(("faculty", faculty_key(x)) for x in split_faculty(s(c.get("Faculty", ""))))
+        if s(c.get("Is_Combined", "0")) == "1":
+            res.add(("combined", s(c.get("Course_Code", "")).upper()))
+    return res
+
+def section_groups(ds, secs):
+    """Split sections into groups that share no room, faculty, sync group or combined course.
+
+    Groups come out ordered by their first section and keep manifest order inside, so solving each group on
+    its own ledgers gives exactly what one pass over all sections gives.
+    """
+    parent = list(range(len(secs)))
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]; i = parent[i]
+        return i
+    owner = {}
+    for i, sec in enumerate(secs):
+        for res in section_resources(ds, sec):
+            j = owner.setdefault(res, i)
+            a, b = find(i), find(j)
+            if a != b:
+                parent[max(a, b)] = min(a, b)
+    groups = {}
+    for i, sec in enumerate(secs):
+        groups.setdefault(find(i), []).append(sec)
+    return list(groups.values())
+
+def solve_group(ds, secs, seed, pin_full=False, room_maps=None, profile=False, count=False, search="greedy", node_budget=None, deadline=None):
+    # One independent group on its own room and faculty ledgers; runs in a worker process when sections are
+    # solved in parallel, so it returns plain results instead of filling the caller's dicts.
+    timings = Timings() if profile else None
+    counters = Counters() if count else None
+    grids = {}
+    room_busy = {d: {} for d in days}
+    faculty_busy = FacultyLedger()
+    syncs = {}
+    out = {}
+    for sec in secs:
+        first, second = split(ds.courses(sec["courses"]))
+        pinned = {} if pin_full else None
+        opts = dict(room_prefix=sec["room_prefix"], elective_room_map=(room_maps or {}).get(sec["label"]), room_busy_global=room_busy,
+                    faculty_busy_global=faculty_busy, hide_c004=sec["hide_c004"], grids=grids, pinned=pinned, timings=timings, counters=counters,
+                    search=search, node_budget=node_budget, deadline=deadline)
+        sync = syncs.setdefault(sec["sync"], {})
+        _, failed1, half1 = generate(ds, first, None, f"{sec['label']} First Half", seed + sec["seed_offset"], sync, half="1", **opts)
+        _, failed2, half2 = generate(ds, second, None, f"{sec['label']} Second Half", seed + sec["seed_offset"] + 1, sync, half="2", **opts)
+        out[sec["label"]] = (failed1 + failed2, [h for h in (half1, half2) if h is not None])
+    return out, grids, timings.rows if profile else None, counters.sections if count else None
+
+def solve_groups(ds, secs, seed, pin_full, room_maps, timings, counters, workers, search="greedy", node_budget=None, deadline=None):
+    groups = section_groups(ds, secs)
+    solve = partial(solve_group, ds, seed=seed, pin_full=pin_full, room_maps=room_maps, profile=timings is not None, count=counters is not None,
+                    search=search, node_budget=node_budget, deadline=deadline)
+    if workers > 1 and len(groups) > 1:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=min(workers, len(groups))) as ex:
+            results = list(ex.map(solve, groups))
+    else:
+        results = [solve(g) for g in groups]
+    return results
+
+def run(seed, render=True, pin_full=False, manifest_path=None, ds=None, timings=None, counters=None, writer="openpyxl", workers=1,
+        engine="greedy", cpsat_seconds=60.0, cpsat_workers=8, search="greedy", node_budget=None, improve_seconds=0, deadline=None):
+    if ds is None:
+        ds = cached_dataset()
+    schedule = Schedule(seed, days, ds.slot_keys)
+    sheets = load_manifest(manifest_path or ds.manifest_path)
+    secs = [sec for sheet in sheets for sec in sheet["sections"]]
+
+    # Legends first, in manifest order: they share the elective room map, and each section's generate() gets the
+    # map as it stood before its own legend. Their room shuffles draw from per-section streams.
+    legends, room_maps = {}, {}
+    for sec in secs:
+        room_maps[sec["label"]] = dict(schedule.elective_rooms)
+        with phase(timings, sec["label"], "legend"):
+            legends[sec["label"]] = legend_rows(ds, sec["courses"], schedule.elective_rooms, section_rng(seed, sec["label"]))
+
+    if engine == "cpsat":
+        # One model for the whole institute; it always keeps full-semester courses in the same slots in both halves.
+        import cpsat
+        with phase(timings, "", "cpsat"):
+            out, grids = cpsat.solve(ds, secs, seed, cpsat_seconds if deadline is None else max(1.0, min(cpsat_seconds, deadline - time.time())), cpsat_workers)
+        results = [(out, grids, [], {})]
+    else:
+        results = solve_groups(ds, secs, seed, pin_full, room_maps, timings, counters, workers, search, node_budget, deadline)
+
+    # Merged back in manifest order whichever worker solved what.
+    done, grids_of, counted = {}, {}, {}
+    for out, grids, rows, sections in results:
+        done.update(out)
+        grids_of.update(grids)
+        if timings is not None:
+            timings.rows.extend(rows)
+        if counters is not None:
+            counted.update(sections)
+    grids = {}
+    for sec in secs:
+        for label in (f"{sec['label']} First Half", f"{sec['label']} Second Half"):
+            if label in grids_of:
+                grids[label] = grids_of[label]
+            if label in counted:
+                counters.sections[label] = counted[label]
+    for sheet in sheets:
+        sections = []
+        for sec in sheet["sections"]:
+            failed, halves = done[sec["label"]]
+            schedule.failed.extend(failed)
+            sections.append({"label": sec["label"], "legend_title": sec["legend"], "courses": sec["courses"], "legend": legends[sec["label"]],
+                             "halves": halves})
+        schedule.sheets.append({"title": sheet["title"], "sections": sections})
+
+    if deadline is not None:
+        improve_seconds = min(improve_seconds, deadline - time.time())
+    if improve_seconds > 0:
+        import improve
+        with phase(timings, "", "improve"):
+            # CP-SAT keeps full-semester courses in the same slots in both halves, as pinning does.
+            improve.improve(ds, schedule, grids, secs, improve_seconds, seed, pin_full=pin_full or engine == "cpsat")
+
+    wb = render_with(writer, ds, schedule, timings) if render else None
+    if timings is not None and wb is not None:
+        timings.write_sheet(wb)
+    if counters is not None and wb is not None:
+        counters.write_sheet(wb)
+    return wb, schedule.failed, grids, schedule
+
+def render_with(writer, ds, schedule, timings=None):
+    if writer == "fast":
+        import fastxlsx
+        return fastxlsx.render_workbook(ds, schedule, color_picker(), timings)
+    return render_workbook(ds, schedule, timings)
+
+def render_workbook(ds, schedule, timings=None, color_of=None):
+    from openpyxl import Workbook
+    wb = Workbook()
+    wb.remove(wb.active)
+    color_of = color_of or color_picker()
+    for sheet in schedule.sheets:
+        ws = wb.create_sheet(sheet["title"])
+        grids = []
+        for sec in sheet["sections"]:
+            for half in sec["halves"]:
+                with phase(timings, half["label"], "grid_rows"):
+                    grids.append((write_half(ds, ws, half), half))
+            with phase(timings, sec["label"], "write_legend"):
+                write_legend(ws, sec["legend_title"], sec["legend"])
+        with phase(timings, sheet["title"], "merge_and_color"):
+            merge_and_color(ds, ws, grids, color_of)
+
+    wsr = wb.create_sheet("Report")
+    for row in report_rows(ds, schedule, timings):
+        wsr.append(row)
+    for col in wsr.columns:
+        maxl = 0; cl = col[0].column_letter
+        for cell in col:
+            v = cell.value
+            if v is None: continue
+            maxl = max(maxl, len(str(v)))
+        wsr.column_dimensions[cl].width = min(maxl + 2 if maxl else 8, 60)
+    return wb
+
+def report_rows(ds, schedule, timings=None):
+    # Rows of the Report sheet, which both writers emit: the quality block, then any unplaced or partial courses.
+    import quality
+    with phase(timings, "", "quality"):
+        rows = quality.Scorer.of(ds, schedule).report_rows()
+    if schedule.failed:
+        rows += [[""], ["Unplaced/Partial Courses"], ["Label", "Course Code", "Type", "Hours Remaining", "Faculty"]]
+        for r in schedule.failed:
+            rows.append([r.get("Label",""), r.get("Course_Code",""), r.get("Type",""), r.get("Hours_Remaining",""), r.get("Faculty","")])
+    return rows
+
+def score_run(ds, reports, grids):
+    excluded_hours = 0.0
+    for tt in grids.values():
+        for d in days:
+            excluded_hours += sum(ds.slot_dur[k] for k in tt.keys_of(tt.busy[d] & tt.excluded_mask))
+    return {
+        "Hours_Remaining": round(sum(r.get("Hours_Remaining", 0) for r in reports), 2),
+        "Failed": len(reports),
+        "Excluded_Hours": round(excluded_hours, 2),
+    }
+
+def solve_seed(seed, pin_full=False, manifest_path=None, data_dir=DATA_DIR, search="greedy", node_budget=None, improve_seconds=0, engine="greedy",
+               cpsat_seconds=60.0, cpsat_workers=8):
+    start = time.time()
+    ds = cached_dataset(data_dir)
+    _, reports, grids, schedule = run(seed, render=False, pin_full=pin_full, manifest_path=manifest_path, ds=ds, search=search, node_budget=node_budget,
+                                      improve_seconds=improve_seconds, engine=engine, cpsat_seconds=cpsat_seconds, cpsat_workers=cpsat_workers)
+    row = {"Seed": seed}
+    row.update(score_run(ds, reports, grids))
+    import quality
+    m = quality.Scorer.of(ds, schedule).metrics()
+    row["Idle_Hours"], row["Lab_Crowding"] = m["idle_hours"], m["lab_crowding"]
+    # Fingerprint of the placements, so seeds that gave the same timetable show up in the summary.
+    import hashlib
+    placed = [[list(p) for p in half["placements"]] for _, half in schedule.halves()]
+    row["Timetable"] = hashlib.sha1(json.dumps(placed).encode()).hexdigest()[:10]
+    row["Seconds"] = round(time.time() - start, 3)
+    return row
+
+def search_seeds(first_seed, n, workers=None, summary_path="Balanced_Timetable_seeds.csv", pin_full=False, manifest_path=None, data_dir=DATA_DIR,
+                 search="greedy", node_budget=None, improve_seconds=0, engine="greedy", cpsat_seconds=60.0, cpsat_workers=8):
+    import pandas as pd
+    from concurrent.futures import ProcessPoolExecutor
+    seeds = [first_seed + i for i in range(n)]
+    with ProcessPoolExecutor(max_workers=workers) as ex:
+        rows = list(ex.map(partial(solve_seed, pin_full=pin_full, manifest_path=manifest_path, data_dir=data_dir, search=search, node_budget=node_budget,
+                                   improve_seconds=improve_seconds, engine=engine, cpsat_seconds=cpsat_seconds, cpsat_workers=cpsat_workers), seeds))
+    # Fewest unplaced hours, then fewest failed chunks, then least use of the excluded slots, then fewest idle hours;
+    # ties keep the earlier seed.
+    best = min(rows, key=lambda r: (r["Hours_Remaining"], r["Failed"], r["Excluded_Hours"], r["Idle_Hours"]))
+    for r in rows:
+        r["Best"] = r is best
+    pd.DataFrame(rows).to_csv(summary_path, index=False)
+    distinct = len({r["Timetable"] for r in rows})
+    print(f"Tried {n} seeds ({distinct} distinct timetables), best seed {best['Seed']} ({best['Hours_Remaining']}h unplaced); summary in {summary_path}")
+    return best["Seed"]
+
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Timetable generator")
     parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--seeds", type=int, default=1, help="try this many consecutive seeds from --seed and keep the best")
+    parser.add_argument("--pin-full-semester", action="store_true", help="place full-semester courses once per section and reuse them in the second half")
+    parser.add_argument("--manifest", default=None, help="section manifest JSON (default: data/sections.json)")
+    parser.add_argument("--data-dir", default=DATA_DIR, help="directory with time_slots.json, rooms.csv and the course CSVs")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes for --seeds (default: CPU count)")
+    parser.add_argument("--section-workers", type=int, default=1, help="solve independent section groups (no shared rooms, faculty, sync group or combined course) in this many processes")
+    parser.add_argument("--engine", choices=["greedy", "cpsat"], default="greedy", help="cpsat solves every section in one OR-Tools CP-SAT model (pip install ortools)")
+    parser.add_argument("--cpsat-seconds", type=float, default=60.0, help="time limit for --engine cpsat")
+    parser.add_argument("--cpsat-workers", type=int, default=8, help="search workers for --engine cpsat")
+    parser.add_argument("--search", choices=["greedy", "backtrack"], default="greedy", help="backtrack places each half's regular courses depth-first, backjumping to the placement that blocked a chunk")
+    parser.add_argument("--node-budget", type=int, default=None, help="placements --search backtrack may try per half before it stops backtracking (default: 20000)")
+    parser.add_argument("--improve-seconds", type=float, default=0, help="after generation, improve the timetable by simulated annealing for this many seconds")
+    parser.add_argument("--time-limit", type=float, default=None, help="solve consecutive seeds from --seed for this many seconds, checkpointing the best timetable to Balanced_Timetable_latest.checkpoint.json, then render it")
+    parser.add_argument("--resume", action="store_true", help="with --time-limit, continue from the checkpoint an earlier (killed) run left")
+    parser.add_argument("--profile", action="store_true", help="time every section and phase; adds a Timings sheet and writes a .timings.json sidecar")
+    parser.add_argument("--counters", action="store_true", help="count solver calls and rejections per section and course; adds a Counters sheet and writes a .counters.json sidecar")
+    parser.add_argument("--from-schedule", default=None, help="re-render the workbook from a saved .schedule.json instead of solving")
+    parser.add_argument("--writer", choices=["openpyxl", "fast"], default="openpyxl", help="fast streams the workbook out in openpyxl write-only mode with cached styles")
+    parser.add_argument("--pstats", default=None, help="with --profile, also run under cProfile and write the stats to this file")
     args = parser.parse_args()
 
-    wb = Workbook()
-    seed = args.seed if args.seed is not None else random.randint(0, 999999)
-
-    elective_room_map = {}
-    global_room_busy = {d: {} for d in days}
-
-    sync_sem1 = {}
-    sync_sem3 = {}
-    sync_sem5 = {}
-    sync_sem7 = {}
-
-    reports = []
-
-    ws1 = wb.active
-    ws1.title = "CSE-I Timetable"
-    cAf, cAs = split(coursesAI)
-    cBf, cBs = split(coursesBI)
-    
-    csea_block, csea_failed = generate(cAf, ws1, "CSEA I First Half", seed+0, sync_sem1, room_prefix='C1', elective_room_map=elective_room_map, room_busy_global=global_room_busy,hide_c004=True)
-    csea_block2, csea_failed2 = generate(cAs, ws1, "CSEA I Second Half", seed+1, sync_sem1, room_prefix='C1', elective_room_map=elective_room_map, room_busy_global=global_room_busy,hide_c004=True)
-    reports.extend(csea_failed + csea_failed2)
-    add_csv_legend_block(ws1, "data/coursesCSEA-I.csv", "CSEA I", room_prefix="C1", elective_room_map=elective_room_map)
-    
-    cseb_block, cseb_failed = generate(cBf, ws1, "CSEB I First Half", seed+2, sync_sem1, room_prefix='C1', elective_room_map=elective_room_map, room_busy_global=global_room_busy,hide_c004=True)
-    cseb_block2, cseb_failed2 = generate(cBs, ws1, "CSEB I Second Half", seed+3, sync_sem1, room_prefix='C1', elective_room_map=elective_room_map, room_busy_global=global_room_busy,hide_c004=True)
-    reports.extend(cseb_failed + cseb_failed2)
-    add_csv_legend_block(ws1, "data/coursesCSEB-I.csv", "CSEB I", room_prefix="C1", elective_room_map=elective_room_map)
-    
-    combined_i_courses = (csea_block or []) + (csea_block2 or []) + (cseb_block or []) + (cseb_block2 or [])
-    merge_and_color(ws1, combined_i_courses)
-
-    # --- DSAI-I ---
-    ws7 = wb.create_sheet("DSAI-I Timetable")
-    d1f_i, d1s_i = split(coursesDSAI_I)
-    dsai1_block1, dsai1_failed1 = generate(d1f_i, ws7, "DSAI-I First Half", seed+16, sync_sem1, room_prefix='C1', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    dsai1_block2, dsai1_failed2 = generate(d1s_i, ws7, "DSAI-I Second Half", seed+17, sync_sem1, room_prefix='C1', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    reports.extend(dsai1_failed1 + dsai1_failed2)
-    add_csv_legend_block(ws7, "data/coursesDSAI-I.csv", "DSAI I", room_prefix="C1", elective_room_map=elective_room_map)
-    combined_dsai1_courses = (dsai1_block1 or []) + (dsai1_block2 or [])
-    merge_and_color(ws7, combined_dsai1_courses)
-
-    # --- ECE-I ---
-    ws9 = wb.create_sheet("ECE-I Timetable")
-    e1f_i, e1s_i = split(coursesECE_I)
-    ece1_block1, ece1_failed1 = generate(e1f_i, ws9, "ECE-I First Half", seed+20, sync_sem1, room_prefix='C4', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    ece1_block2, ece1_failed2 = generate(e1s_i, ws9, "ECE-I Second Half", seed+21, sync_sem1, room_prefix='C4', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    reports.extend(ece1_failed1 + ece1_failed2)
-    add_csv_legend_block(ws9, "data/coursesECE-I.csv", "ECE I", room_prefix="C4", elective_room_map=elective_room_map)
-    combined_ece1_courses = (ece1_block1 or []) + (ece1_block2 or [])
-    merge_and_color(ws9, combined_ece1_courses)
-    # --- CSE-III (Sections A & B) ---
-    ws2 = wb.create_sheet("CSE-III Timetable")
-    c1f, c1s = split(coursesA); c2f, c2s = split(coursesB)
-    
-    csea3_block1, csea3_failed1 = generate(c1f, ws2, "CSEA III First Half", seed+4, sync_sem3, room_prefix='C2', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    csea3_block2, csea3_failed2 = generate(c1s, ws2, "CSEA III Second Half", seed+5, sync_sem3, room_prefix='C2', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    reports.extend(csea3_failed1 + csea3_failed2)
-    add_csv_legend_block(ws2, "data/coursesCSEA-III.csv", "CSEA III", room_prefix="C2", elective_room_map=elective_room_map)
-    
-    cseb3_block1, cseb3_failed1 = generate(c2f, ws2, "CSEB III First Half", seed+6, sync_sem3, room_prefix='C2', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    cseb3_block2, cseb3_failed2 = generate(c2s, ws2, "CSEB III Second Half", seed+7, sync_sem3, room_prefix='C2', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    reports.extend(cseb3_failed1 + cseb3_failed2)
-    add_csv_legend_block(ws2, "data/coursesCSEB-III.csv", "CSEB III", room_prefix="C2", elective_room_map=elective_room_map)
-    
-    combined_iii_courses = (csea3_block1 or []) + (csea3_block2 or []) + (cseb3_block1 or []) + (cseb3_block2 or [])
-    merge_and_color(ws2, combined_iii_courses)
-
-    # --- DSAI-III ---
-    ws4 = wb.create_sheet("DSAI-III Timetable")
-    d1f, d1s = split(coursesDSAI)
-    dsa_block1, dsa_failed1 = generate(d1f, ws4, "DSAI-III First Half", seed+10, sync_sem3, room_prefix='C4', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    dsa_block2, dsa_failed2 = generate(d1s, ws4, "DSAI-III Second Half", seed+11, sync_sem3, room_prefix='C4', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    reports.extend(dsa_failed1 + dsa_failed2)
-    add_csv_legend_block(ws4, "data/coursesDSAI-III.csv", "DSAI", room_prefix="C4", elective_room_map=elective_room_map)
-    combined_dsa_courses = (dsa_block1 or []) + (dsa_block2 or [])
-    merge_and_color(ws4, combined_dsa_courses)
-
-    # --- ECE-III ---
-    ws5 = wb.create_sheet("ECE-III Timetable")
-    e1f, e1s = split(coursesECE)
-    ece_block1, ece_failed1 = generate(e1f, ws5, "ECE-III First Half", seed+12, sync_sem3, room_prefix='C4', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    ece_block2, ece_failed2 = generate(e1s, ws5, "ECE-III Second Half", seed+13, sync_sem3, room_prefix='C4', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    reports.extend(ece_failed1 + ece_failed2)
-    add_csv_legend_block(ws5, "data/coursesECE-III.csv", "ECE", room_prefix="C4", elective_room_map=elective_room_map)
-    combined_ece_courses = (ece_block1 or []) + (ece_block2 or [])
-    merge_and_color(ws5, combined_ece_courses)
-
-    # --- CSE-V ---
-    ws3 = wb.create_sheet("CSE-V Timetable")
-    c5f, c5s = split(coursesV)
-    c5_block1, c5_failed1 = generate(c5f, ws3, "CSE-V First Half", seed+8, sync_sem5, room_prefix='C3', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    c5_block2, c5_failed2 = generate(c5s, ws3, "CSE-V Second Half", seed+9, sync_sem5, room_prefix='C3', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    reports.extend(c5_failed1 + c5_failed2)
-    add_csv_legend_block(ws3, "data/coursesCSE-V.csv", "CSE V", room_prefix="C3", elective_room_map=elective_room_map)
-    combined_v_courses = (c5_block1 or []) + (c5_block2 or [])
-    merge_and_color(ws3, combined_v_courses)
-
-    # --- DSAI-V ---
-    ws8 = wb.create_sheet("DSAI-V Timetable")
-    d5f_v, d5s_v = split(coursesDSAI_V)
-    dsai5_block1, dsai5_failed1 = generate(d5f_v, ws8, "DSAI-V First Half", seed+18, sync_sem5, room_prefix='C4', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    dsai5_block2, dsai5_failed2 = generate(d5s_v, ws8, "DSAI-V Second Half", seed+19, sync_sem5, room_prefix='C4', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    reports.extend(dsai5_failed1 + dsai5_failed2)
-    add_csv_legend_block(ws8, "data/coursesDSAI-V.csv", "DSAI V", room_prefix="C4", elective_room_map=elective_room_map)
-    combined_dsai5_courses = (dsai5_block1 or []) + (dsai5_block2 or [])
-    merge_and_color(ws8, combined_dsai5_courses)
-
-    # --- ECE-V ---
-    ws10 = wb.create_sheet("ECE-V Timetable")
-    e5f_v, e5s_v = split(coursesECE_V)
-    ece5_block1, ece5_failed1 = generate(e5f_v, ws10, "ECE-V First Half", seed+22, sync_sem5, room_prefix='C4', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    ece5_block2, ece5_failed2 = generate(e5s_v, ws10, "ECE-V Second Half", seed+23, sync_sem5, room_prefix='C4', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    reports.extend(ece5_failed1 + ece5_failed2)
-    add_csv_legend_block(ws10, "data/coursesECE-V.csv", "ECE V", room_prefix="C4", elective_room_map=elective_room_map)
-    combined_ece5_courses = (ece5_block1 or []) + (ece5_block2 or [])
-    merge_and_color(ws10, combined_ece5_courses)
-    # --- DSAI 7th Sem ---
-    ws6 = wb.create_sheet("7TH-SEM Timetable")
-    s7f, s7s = split(coursesVII)
-    s7_block1, s7_failed1 = generate(s7f, ws6, "7TH-SEM First Half", seed+14, sync_sem7, room_prefix='C3', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    s7_block2, s7_failed2 = generate(s7s, ws6, "7TH-SEM Second Half", seed+15, sync_sem7, room_prefix='C3', elective_room_map=elective_room_map, room_busy_global=global_room_busy)
-    reports.extend(s7_failed1 + s7_failed2)
-    add_csv_legend_block(ws6, "data/courses7.csv", "7TH SEM", room_prefix="C3", elective_room_map=elective_room_map)
-    combined_7_courses = (s7_block1 or []) + (s7_block2 or [])
-    merge_and_color(ws6, combined_7_courses)
-
-    if reports:
-        wsr = wb.create_sheet("Report")
-        wsr.append(["Unplaced/Partial Courses"])
-        wsr.append(["Label", "Course Code", "Type", "Hours Remaining", "Faculty"])
-        for r in reports:
-            wsr.append([r.get("Label",""), r.get("Course_Code",""), r.get("Type",""), r.get("Hours_Remaining",""), r.get("Faculty","")])
-        for col in wsr.columns:
-            maxl = 0; cl = col[0].column_letter
-            for cell in col:
-                v = cell.value
-                if v is None: continue
-                maxl = max(maxl, len(str(v)))
-            wsr.column_dimensions[cl].width = min(maxl + 2 if maxl else 8, 60)
-
-    name = f"Balanced_Timetable_latest.xlsx"
-    wb.save(name)
+    name = "Balanced_Timetable_latest.xlsx"
+    if args.from_schedule:
+        # Only time_slots.json is needed from the data directory; nothing is solved.
+        render_with(args.writer, cached_dataset(args.data_dir), load_schedule(args.from_schedule)).save(name)
+        print("OK: timetable re-rendered from", args.from_schedule, "into", name)
+        raise SystemExit
+    seed = args.seed if args.seed is not None else DEFAULT_SEED
+    if args.time_limit is not None:
+        import anytime
+        ds = cached_dataset(args.data_dir)
+        schedule, state = anytime.solve(ds, args.time_limit, seed, name.replace(".xlsx", ".checkpoint.json"), resume=args.resume, manifest_path=args.manifest,
+                                        improve_seconds=args.improve_seconds, workers=args.section_workers, pin_full=args.pin_full_semester, engine=args.engine,
+                                        cpsat_seconds=args.cpsat_seconds, cpsat_workers=args.cpsat_workers, search=args.search, node_budget=args.node_budget)
+        render_with(args.writer, ds, schedule).save(name)
+        schedule.save_json(name.replace(".xlsx", ".schedule.json"))
+        print(f"OK: best of {state['tried']} seeds (seed {state['best_seed']}, score {state['score']}) saved in", name)
+        raise SystemExit
+    if args.seeds > 1:
+        seed = search_seeds(seed, args.seeds, args.workers, pin_full=args.pin_full_semester, manifest_path=args.manifest, data_dir=args.data_dir,
+                            search=args.search, node_budget=args.node_budget, improve_seconds=args.improve_seconds, engine=args.engine,
+                            cpsat_seconds=args.cpsat_seconds, cpsat_workers=args.cpsat_workers)
+    timings = Timings() if args.profile else None
+    counters = Counters() if args.counters else None
+    profiler = None
+    if args.profile and args.pstats:
+        import cProfile
+        profiler = cProfile.Profile()
+        profiler.enable()
+    with phase(timings, "", "load_dataset"):
+        ds = cached_dataset(args.data_dir)
+    with phase(timings, "", "run"):
+        wb, reports, _, schedule = run(seed, pin_full=args.pin_full_semester, manifest_path=args.manifest, ds=ds, timings=timings, counters=counters, writer=args.writer, workers=args.section_workers,
+                                        engine=args.engine, cpsat_seconds=args.cpsat_seconds, cpsat_workers=args.cpsat_workers,
+                                        search=args.search, node_budget=args.node_budget, improve_seconds=args.improve_seconds)
+    # The Timings sheet is already in the workbook, so the save itself only shows up in the JSON sidecar.
+    with phase(timings, "", "save"):
+        wb.save(name)
+        schedule.save_json(name.replace(".xlsx", ".schedule.json"))
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(args.pstats)
+    if timings is not None:
+        timings.save_json(name.replace(".xlsx", ".timings.json"))
+    if counters is not None:
+        counters.save_json(name.replace(".xlsx", ".counters.json"))
     print("OK: Evenly balanced timetable saved in", name)
\ No newline at end of file
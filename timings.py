@@ -0,0 +1,65 @@
+import json
+import time
+from contextlib import nullcontext
+
+
+class Timings:
+    """Wall-clock time per (section, phase), in the order the phases finished."""
+
+    def __init__(self):
+        self.rows = []
+
+    def phase(self, section, name):
+        return _Phase(self, section, name)
+
+    def totals(self):
+        out = {}
+        for _, name, sec in self.rows:
+            out[name] = out.get(name, 0.0) + sec
+        return out
+
+    def to_dict(self):
+        return {
+            "phases": [{"Section": s, "Phase": p, "Seconds": round(t, 6)} for s, p, t in self.rows],
+            "totals": {p: round(t, 6) for p, t in self.totals().items()},
+        }
+
+    def save_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    def write_sheet(self, wb, title="Timings"):
+        ws = wb.create_sheet(title)
+        for col, w in zip("ABC", (28, 22, 12)):
+            ws.column_dimensions[col].width = w
+        ws.append(["Section", "Phase", "Seconds"])
+        for s, p, t in self.rows:
+            ws.append([s, p, round(t, 6)])
+        ws.append([])
+        ws.append(["Total", "Phase", "Seconds"])
+        for p, t in sorted(self.totals().items(), key=lambda x: -x[1]):
+            ws.append(["", p, round(t, 6)])
+        return ws
+
+
+class _Phase:
+    __slots__ = ("timings", "section", "name", "start")
+
+    def __init__(self, timings, section, name):
+        self.timings, self.section, self.name = timings, section, name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.timings.rows.append((self.section, self.name, time.perf_counter() - self.start))
+        return False
+
+
+_off = nullcontext()
+
+
+def phase(timings, section, name):
+    # With profiling off this is a shared no-op context, so instrumented code pays one call per phase.
+    return _off if timings is None else timings.phase(section, name)